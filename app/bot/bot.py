@@ -13,8 +13,10 @@ from app.bot.handlers.start_handler import StartHandler
 from app.bot.handlers.category_handler import CategoryHandler
 from app.bot.handlers.generation_handler import GenerationHandler
 from app.bot.handlers.session_handler import SessionHandler
+from app.bot.handlers.admin_handler import AdminHandler
 
 from app.services import MPStatsService
+from app.utils.loop_monitor import EventLoopLagMonitor
 
 
 class ContentGeneratorBot:
@@ -27,6 +29,8 @@ class ContentGeneratorBot:
         self.handlers = []
         self.services = {}
         self.repositories = {}
+        self.loop_monitor = None
+        self.worker_supervisor = None
         self.logger = logging.getLogger(__name__)
 
     async def initialize(self):
@@ -119,15 +123,25 @@ class ContentGeneratorBot:
         from app.services.openai_service import OpenAIService
         from app.services.content_service import ContentService
         from app.services.prompt_service import PromptService
-        from app.services.mpstats_scraper_service import MPStatsScraperService
-        from app.services.data_collection_service import DataCollectionService
 
         try:
             openai_service = OpenAIService()
             mpstats_service = MPStatsService()
             content_service = ContentService(mpstats_service, openai_service)
             prompt_service = PromptService()
+
+            if self.config.scraper.worker_processes > 0:
+                self._initialize_scraper_workers(openai_service, mpstats_service, content_service, prompt_service)
+                return
+
+            # Selenium и pandas загружаются, только если скрапинг идет в процессе бота
+            from app.services.mpstats_scraper_service import MPStatsScraperService
+            from app.services.data_collection_service import DataCollectionService
+            from app.services.keyword_prewarm_service import KeywordPrewarmService
+
             scraper_service = MPStatsScraperService(self.config)
+            # Прогрев пула авторизованных драйверов в фоне (если включен)
+            scraper_service.start_driver_pool()
 
             # Создаем data_collection_service с services в kwargs
             data_collection_service = DataCollectionService(
@@ -140,6 +154,14 @@ class ContentGeneratorBot:
                 }
             )
 
+            # Ночной прогрев кэша ключевых слов
+            prewarm_service = KeywordPrewarmService(
+                config=self.config,
+                data_collection=data_collection_service,
+                category_repo=self.repositories['category_repo'],
+                snapshot_repo=self.repositories['snapshot_repo']
+            )
+
             self.services = {
                 'openai': openai_service,
                 'mpstats': mpstats_service,
@@ -147,6 +169,7 @@ class ContentGeneratorBot:
                 'prompt': prompt_service,
                 'scraper': scraper_service,
                 'data_collection': data_collection_service,
+                'prewarm': prewarm_service,
             }
 
             self.logger.info("Все сервисы инициализированы")
@@ -159,6 +182,37 @@ class ContentGeneratorBot:
                 'content': ContentService(None, OpenAIService())
             }
 
+    def _initialize_scraper_workers(self, openai_service, mpstats_service, content_service, prompt_service):
+        """
+        Скрапинг в отдельных процессах: вместо DataCollectionService - клиент
+        процессов скрапера с тем же интерфейсом. Прогрев кэша идет в первом процессе,
+        /prewarm управляет им через ScraperWorkerPrewarm.
+        """
+        from app.services.scraper_worker import worker_socket_path
+        from app.services.scraper_worker_client import (
+            ScraperWorkerClient, ScraperWorkerPrewarm, ScraperWorkerSupervisor
+        )
+
+        socket_paths = [worker_socket_path(self.config, index)
+                        for index in range(self.config.scraper.worker_processes)]
+        if self.config.scraper.worker_autostart:
+            self.worker_supervisor = ScraperWorkerSupervisor(socket_paths)
+            self.worker_supervisor.start()
+        worker_client = ScraperWorkerClient(socket_paths, connect_timeout=self.config.scraper.worker_connect_timeout)
+        worker_client.start(stats_interval=self.config.scraper.worker_stats_interval)
+
+        self.services = {
+            'openai': openai_service,
+            'mpstats': mpstats_service,
+            'content': content_service,
+            'prompt': prompt_service,
+            'scraper': None,
+            'data_collection': worker_client,
+            'scraper_workers': worker_client,
+            'prewarm': ScraperWorkerPrewarm(worker_client, socket_paths[0]),
+        }
+        self.logger.info(f"🧵 Скрапинг в {len(socket_paths)} процессах: {', '.join(socket_paths)}")
+
     async def _initialize_aiogram(self):
         """Инициализация aiogram"""
         try:
@@ -181,7 +235,8 @@ class ContentGeneratorBot:
             GenerationHandler(self.config, self.services, self.repositories),
             SessionHandler(self.config, self.services, self.repositories),
             ContentGenerationHandler(self.config, self.services, self.repositories),
-            SnapshotHandler(self.config, self.services, self.repositories)
+            SnapshotHandler(self.config, self.services, self.repositories),
+            AdminHandler(self.config, self.services, self.repositories)
         ]
 
         for handler in self.handlers:
@@ -194,6 +249,19 @@ class ContentGeneratorBot:
     async def run(self):
         """Запуск бота"""
         self.logger.info("Starting bot polling...")
+
+        # Мониторинг отзывчивости event loop (блокирующие вызовы видны как задержка)
+        self.loop_monitor = EventLoopLagMonitor(
+            interval=self.config.scraper.loop_lag_interval,
+            warn_threshold=self.config.scraper.loop_lag_warn_threshold
+        )
+        self.loop_monitor.start()
+        self.services['loop_monitor'] = self.loop_monitor
+
+        prewarm_service = self.services.get('prewarm')
+        if prewarm_service:
+            prewarm_service.start()
+
         try:
             await self.dp.start_polling(self.bot)
         except Exception as e:
@@ -205,6 +273,33 @@ class ContentGeneratorBot:
         self.logger.info("Shutting down bot...")
 
         try:
+            if self.loop_monitor:
+                await self.loop_monitor.stop()
+                self.logger.info(f"Event loop lag stats: {self.loop_monitor.get_stats()}")
+
+            # В режиме процессов скрапера прогрев останавливается вместе с процессом 0
+            prewarm_service = self.services.get('prewarm')
+            if prewarm_service and not self.services.get('scraper_workers'):
+                await prewarm_service.shutdown()
+                self.logger.info(f"Prewarm stats: {prewarm_service.get_stats()}")
+
+            data_collection_service = self.services.get('data_collection')
+            if data_collection_service:
+                await data_collection_service.close()
+                self.logger.info(f"Data collection stats: {data_collection_service.get_runtime_stats()}")
+
+            scraper_service = self.services.get('scraper')
+            if scraper_service:
+                scraper_service.shutdown()
+                self.logger.info("Scraper executor stopped")
+
+            worker_client = self.services.get('scraper_workers')
+            if worker_client:
+                await worker_client.close()
+            if self.worker_supervisor:
+                await self.worker_supervisor.shutdown()
+                self.logger.info(f"Scraper workers stopped: {self.worker_supervisor.get_stats()}")
+
             if self.bot:
                 await self.bot.session.close()
                 self.logger.info("Bot session closed")
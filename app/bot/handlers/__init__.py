@@ -6,11 +6,12 @@ from app.bot.handlers.base_handler import BaseMessageHandler
 from app.bot.handlers.start_handler import StartHandler
 from app.bot.handlers.category_handler import CategoryHandler
 # from app.bot.handlers.generation_handler import GenerationHandler
-# from app.bot.handlers.admin_handler import AdminHandler
+from app.bot.handlers.admin_handler import AdminHandler
 
 __all__ = [
     'BaseMessageHandler',
     'StartHandler',
     'CategoryHandler',
+    'AdminHandler',
     # 'GenerationHandler',
 ]
\ No newline at end of file
@@ -0,0 +1,153 @@
+# app/bot/handlers/admin_handler.py
+import asyncio
+import html
+import inspect
+import logging
+from aiogram import Router
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+from app.bot.handlers.base_handler import BaseMessageHandler
+from app.utils.job_timing import timings
+
+
+class AdminHandler(BaseMessageHandler):
+    """Служебные команды администраторов"""
+
+    def __init__(self, config, services, repositories):
+        super().__init__(config, services, repositories)
+        self.router = Router()
+        self.logger = logging.getLogger(__name__)
+        self._prewarm_task = None
+
+    async def register(self, dp):
+        """Регистрация обработчиков"""
+        dp.include_router(self.router)
+        self.router.message.register(self.show_timings, Command(commands=["timings"]))
+        self.router.message.register(self.manage_prewarm, Command(commands=["prewarm"]))
+
+    async def show_timings(self, message: Message, command: CommandObject):
+        """
+        /timings [N] - гистограммы фаз сбора данных и N последних задач (по умолчанию 3)
+        """
+        if message.from_user.id not in self.config.telegram.admin_ids:
+            await message.answer("⛔ У вас нет доступа к этой команде.")
+            return
+
+        try:
+            limit = max(1, min(10, int(command.args))) if command.args else 3
+        except ValueError:
+            limit = 3
+
+        # В режиме процессов скрапера замеры ведутся в процессах (первый отвечающий)
+        workers = self.services.get('scraper_workers')
+        histograms = timings.get_histograms() or (workers.get_timing_histograms() if workers else {})
+        if not histograms:
+            await message.answer("⏱️ Замеров пока нет - запустите сбор данных.")
+            return
+
+        lines = ["⏱️ <b>Фазы сбора данных</b> (сек)", "<pre>",
+                 f"{'фаза':<20}{'n':>5}{'p50':>7}{'p95':>7}{'max':>7}{'ош':>4}"]
+        for name, h in histograms.items():
+            lines.append(f"{name[:20]:<20}{h['count']:>5}{h['p50']:>7.2f}{h['p95']:>7.2f}"
+                         f"{h['max']:>7.1f}{h['errors']:>4}")
+        lines.append("</pre>")
+
+        scraper = self.services.get('scraper')
+        scraper_stats = scraper.get_runtime_stats() if scraper else workers.get_scraper_stats() if workers else {}
+        memory = scraper_stats.get("memory", {})
+        if memory.get("jobs"):
+            lines.append(f"🧠 Пик памяти Chrome за задачу: p50 {memory['p50_mb']:.0f} MB, "
+                         f"p95 {memory['p95_mb']:.0f} MB, max {memory['max_mb']:.0f} MB "
+                         f"({memory['jobs']} задач)")
+
+        # Селекторы, которые промахиваются или держатся на запасном варианте - пора обновить конфиг
+        for key, selector in scraper_stats.get("selectors", {}).items():
+            if selector["misses"] or selector["fallback_hits"]:
+                lines.append(f"🎯 {html.escape(key)}: промахи {selector['miss_rate']:.0%} "
+                             f"из {selector['lookups']}, запасной вариант {selector['fallback_hits']} раз")
+
+        data_collection = self.services.get('data_collection')
+        breaker = (data_collection.get_runtime_stats().get("scrape_breaker") if data_collection else None) or {}
+        if breaker.get("state", "closed") != "closed":
+            lines.append(f"🔌 Автомат скрапинга: {breaker['state']}, пробный вызов через {breaker['retry_after']}с "
+                         f"(размыканий {breaker['trips']}, отклонено {breaker['rejected']})")
+
+        for record in timings.get_recent_jobs(limit):
+            status_icon = "✅" if record["status"] == "success" else "❌"
+            category = html.escape(str(record["meta"].get("category") or ""))
+            peak_mb = record.get("metrics", {}).get("chrome_peak_rss_mb")
+            lines.append(f"{status_icon} <b>#{record['job_id']}</b> {record['started_at']} "
+                         f"{category} - {record['total']:.1f}с"
+                         f"{f', Chrome {peak_mb} MB' if peak_mb else ''}")
+            for span in record["spans"]:
+                mark = "" if span["ok"] else " ⚠️"
+                lines.append(f"  +{span['offset']:.1f}с {span['name']}: {span['duration']:.2f}с{mark}")
+
+        # Лимит сообщения Telegram: отбрасываем последние строки, не разрывая HTML теги
+        while len("\n".join(lines)) > 4000:
+            lines.pop()
+        await message.answer("\n".join(lines))
+
+    async def manage_prewarm(self, message: Message, command: CommandObject):
+        """
+        /prewarm [status|on|off|run] - ночной прогрев кэша ключевых слов.
+        off - выключатель: останавливает и текущий прогон.
+        """
+        if message.from_user.id not in self.config.telegram.admin_ids:
+            await message.answer("⛔ У вас нет доступа к этой команде.")
+            return
+
+        prewarm_service = self.services.get('prewarm')
+        if not prewarm_service:
+            await message.answer("❌ Сервис прогрева не инициализирован")
+            return
+
+        action = (command.args or "status").strip().lower()
+        try:
+            await self._manage_prewarm(message, prewarm_service, action)
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка управления прогревом: {e}")
+            await message.answer(f"❌ Прогрев кэша недоступен: {html.escape(str(e))}")
+
+    async def _manage_prewarm(self, message: Message, prewarm_service, action: str):
+        # В режиме процессов скрапера prewarm_service - ScraperWorkerPrewarm, его методы - корутины
+        if action == "on":
+            await self._resolve(prewarm_service.resume())
+            await message.answer("🔥 Прогрев кэша включен (запустится в тихие часы)")
+        elif action == "off":
+            await self._resolve(prewarm_service.stop())
+            await message.answer("⏹️ Прогрев кэша выключен")
+        elif action == "run":
+            # Прогон занимает десятки минут - не держим обработчик
+            self._prewarm_task = asyncio.create_task(self._run_prewarm(message, prewarm_service))
+            await message.answer("🔥 Прогрев кэша запущен вне тихих часов")
+        else:
+            stats = await self._resolve(prewarm_service.get_stats())
+            cache = self.services['data_collection'].get_runtime_stats().get("keyword_cache") or {}
+            await message.answer(
+                f"🔥 <b>Прогрев кэша</b>\n\n"
+                f"Состояние: {'включен' if stats['enabled'] else 'выключен'}"
+                f"{' (выполняется)' if stats['running'] else ''}\n"
+                f"Тихие часы: {stats['quiet_hours']}\n"
+                f"Последний прогон: {stats['last_run_date'] or '-'}\n"
+                f"Прогонов: {stats['runs']}, сохранено: {stats['stored']}, ошибок: {stats['failed']}, "
+                f"свежих пропущено: {stats['skipped_fresh']}\n"
+                f"Попадания в кэш: {cache.get('hit_rate', 0.0):.0%}"
+            )
+
+    @staticmethod
+    async def _resolve(value):
+        return await value if inspect.isawaitable(value) else value
+
+    async def _run_prewarm(self, message: Message, prewarm_service):
+        try:
+            result = await prewarm_service.run_once(force=True)
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка ручного прогрева: {e}", exc_info=True)
+            result = {"status": "error", "message": str(e)}
+
+        if result["status"] == "success":
+            await message.answer(f"✅ Прогрев завершен: сохранено {result['stored']} из {result['planned']}, "
+                                 f"ошибок {result['failed']}")
+        else:
+            await message.answer(f"❌ Прогрев не выполнен: {html.escape(result['message'])}")
@@ -21,7 +21,8 @@ class CategoryHandler(BaseMessageHandler):
 
     async def register(self, dp):
         """Регистрация обработчиков"""
-        if not self.scraper_service:
+        # В режиме процессов скрапера браузер в процессе бота не нужен
+        if not self.scraper_service and not self.config.scraper.worker_processes:
             self.logger.error("Scraper service not found!")
             # Можно создать его здесь, если нужно
             from app.services.mpstats_scraper_service import MPStatsScraperService
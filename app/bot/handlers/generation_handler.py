@@ -2,11 +2,14 @@
 import asyncio
 import json
 import logging
+import math
 from aiogram.filters import Command
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from app.bot.handlers.base_handler import BaseMessageHandler
+from app.services.scrape_job_scheduler import JobOwner
+from app.utils.purpose_names import translate_purposes
 
 
 class GenerationHandler(BaseMessageHandler):
@@ -88,27 +91,55 @@ class GenerationHandler(BaseMessageHandler):
                 purposes = session.purposes
 
                 # ПЕРЕВОДИМ НА РУССКИЙ ПЕРЕД ПЕРЕДАЧЕЙ В MPStats
-                purpose_map = {
-                    "wood": "под дерево", "with_pattern": "с рисунком", "kitchen": "кухня",
-                    "tile": "плитка", "3d": "3D", "in_roll": "в рулоне",
-                    "self_adhesive": "самоклеящиеся", "stone": "под камень", "bathroom": "ванная",
-                    "bedroom": "спальня", "brick": "под кирпич", "marble": "под мрамор",
-                    "living_room": "гостиная", "white": "белый"
-                }
-
-                translated_purposes = []
-                for p in purposes:
-                    translated = purpose_map.get(str(p).lower(), str(p))
-                    translated_purposes.append(translated)
+                # (тот же перевод использует ночной прогрев кэша)
+                purposes = translate_purposes(purposes)
+
+            # Пока задача ждет свободный браузер, показываем позицию в очереди
+            async def on_queue_position(position: int, eta: float):
+                if position == 0:
+                    text = "🔍 <b>Начинаю сбор данных с MPStats...</b>\n\n⏳ Это может занять 1-2 минуты..."
+                else:
+                    text = (
+                        f"🕒 <b>Запрос в очереди на сбор данных</b>\n\n"
+                        f"📍 Позиция в очереди: <b>{position}</b>\n"
+                        f"⏳ Примерное ожидание: ~{max(1, math.ceil(eta / 60))} мин"
+                    )
+                await status_message.edit_text(text)
+
+            # Данные были из устаревшего кэша и фоновое обновление их заметно изменило:
+            # обновляем сообщение, если пользователь еще не пошел дальше и не менял ключи
+            shown = {"keywords": None}
+
+            async def on_refreshed_data(fresh_result: dict):
+                current = session_repo.get_by_id(session.id)
+                if not current or current.current_step != "data_collected" \
+                        or list(current.keywords or []) != shown["keywords"]:
+                    return
+                fresh_keywords = fresh_result.get("keywords", [])
+                session_repo.update(session.id, keywords=fresh_keywords)
+                shown["keywords"] = list(fresh_keywords)
+                self.logger.info(f"♻️ Ключевые слова сессии {session.id} обновлены: {fresh_keywords}")
+
+                text, markup = self._build_collected_message(fresh_result, fresh_keywords, session.id)
+                await status_message.edit_text(
+                    text + "\n♻️ <i>Данные обновлены с MPStats</i>", reply_markup=markup
+                )
 
-                purposes = translated_purposes
+            user_id = callback.from_user.id
+            owner = JobOwner(
+                user_id=user_id,
+                is_admin=user_id in self.config.telegram.admin_ids,
+                on_position=on_queue_position,
+                on_refresh=on_refreshed_data
+            )
 
             # Запускаем сбор данных с GPT-фильтрацией
             result = await data_collection_service.collect_keywords_data(
                 category=category.name,
                 purpose=purposes,
                 additional_params=session.additional_params or [],
-                category_description=category_description
+                category_description=category_description,
+                owner=owner
             )
 
             # В методе handle_collect_data, после получения filtered_keywords
@@ -143,43 +174,13 @@ class GenerationHandler(BaseMessageHandler):
                     current_step="data_collected"
                 )
 
+                shown["keywords"] = list(filtered_keywords)
+
                 self.logger.info(f"✅ Сохранено keywords: {filtered_keywords} (тип: {type(filtered_keywords)})")
                 self.logger.info(f"✅ Сохранено purposes: {purposes} (тип: {type(purposes)})")
 
-                # Формируем сообщение с результатами
-                message_text = (
-                    f"✅ <b>Данные собраны и обработаны GPT!</b>\n\n"
-                    f"📁 <b>Категория:</b> {result['category']}\n"
-                )
-
-                # Показываем назначения
-                if result.get('purposes'):
-                    purposes_list = result['purposes']
-                    if isinstance(purposes_list, list) and purposes_list:
-                        message_text += f"🎯 <b>Назначения:</b> {', '.join(purposes_list)}\n"
-                    elif purposes_list:
-                        message_text += f"🎯 <b>Назначение:</b> {purposes_list}\n"
-
-                # Показываем отфильтрованные ключевые слова
-                if filtered_keywords:
-                    message_text += (
-                        f"🔑 <b>Топ-{len(filtered_keywords)} ключевых слов (отфильтрованы GPT):</b>\n"
-                    )
-                    for i, keyword in enumerate(filtered_keywords, 1):
-                        message_text += f"{i}. {keyword}\n"
-
-                # Кнопки для продолжения
-                builder = InlineKeyboardBuilder()
-                builder.button(text="🎯 Меню генерации контента", callback_data=f"show_generation_menu_{session.id}")
-                builder.button(
-                    text="✏️ Ручная фильтрация ключей",
-                    callback_data=f"manual_filter_{session.id}"
-                )
-                builder.button(text="📊 Показать все ключевые слова", callback_data=f"show_all_keywords_{session.id}")
-                builder.button(text="↩️ Изменить параметры", callback_data="change_params")
-                builder.adjust(1)
-
-                await status_message.edit_text(message_text, reply_markup=builder.as_markup())
+                message_text, markup = self._build_collected_message(result, filtered_keywords, session.id)
+                await status_message.edit_text(message_text, reply_markup=markup)
 
             else:
                 # Ошибка
@@ -191,6 +192,41 @@ class GenerationHandler(BaseMessageHandler):
             await status_message.edit_text(f"❌ <b>Ошибка при сборе данных:</b>\n{str(e)[:200]}")
             self.logger.error(f"Ошибка сбора данных: {e}", exc_info=True)
 
+    def _build_collected_message(self, result: dict, filtered_keywords: list, session_id):
+        """Сообщение с собранными данными и кнопки для продолжения"""
+        message_text = (
+            f"✅ <b>Данные собраны и обработаны GPT!</b>\n\n"
+            f"📁 <b>Категория:</b> {result['category']}\n"
+        )
+
+        # Показываем назначения
+        if result.get('purposes'):
+            purposes_list = result['purposes']
+            if isinstance(purposes_list, list) and purposes_list:
+                message_text += f"🎯 <b>Назначения:</b> {', '.join(purposes_list)}\n"
+            elif purposes_list:
+                message_text += f"🎯 <b>Назначение:</b> {purposes_list}\n"
+
+        # Показываем отфильтрованные ключевые слова
+        if filtered_keywords:
+            message_text += (
+                f"🔑 <b>Топ-{len(filtered_keywords)} ключевых слов (отфильтрованы GPT):</b>\n"
+            )
+            for i, keyword in enumerate(filtered_keywords, 1):
+                message_text += f"{i}. {keyword}\n"
+
+        # Кнопки для продолжения
+        builder = InlineKeyboardBuilder()
+        builder.button(text="🎯 Меню генерации контента", callback_data=f"show_generation_menu_{session_id}")
+        builder.button(
+            text="✏️ Ручная фильтрация ключей",
+            callback_data=f"manual_filter_{session_id}"
+        )
+        builder.button(text="📊 Показать все ключевые слова", callback_data=f"show_all_keywords_{session_id}")
+        builder.button(text="↩️ Изменить параметры", callback_data="change_params")
+        builder.adjust(1)
+        return message_text, builder.as_markup()
+
     async def handle_show_generation_menu(self, callback: CallbackQuery):
         """Показать меню генерации контента"""
         session_id = callback.data.replace("show_generation_menu_", "")
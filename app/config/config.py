@@ -166,6 +166,125 @@ class SeleniumConfig:
     ])
 
 
+@dataclass
+class ScraperConfig:
+    """Конфигурация слоя выполнения скрапинга MPStats"""
+    # Пул потоков, в котором выполняется вся блокирующая работа Selenium
+    executor_workers: int = 2
+    # Мониторинг задержки event loop (секунды)
+    loop_lag_interval: float = 0.5
+    loop_lag_warn_threshold: float = 0.3
+
+    # Пул прогретых авторизованных драйверов
+    driver_pool_enabled: bool = False
+    driver_pool_size: int = 2
+    driver_pool_max_uses: int = 20
+    driver_pool_max_memory_mb: int = 1500
+    driver_pool_acquire_timeout: float = 300
+    # Вкладки одного авторизованного Chrome вместо браузера на запрос (0 - выключено).
+    # Включенные вкладки заменяют пул драйверов; ожидание вкладки - driver_pool_acquire_timeout.
+    # executor_workers должно быть больше tab_workers (проверяется в Config.validate)
+    tab_workers: int = 0
+    tab_browser_max_uses: int = 100
+    tab_browser_max_memory_mb: int = 3000
+
+    # Ожидание готовности страницы по сигналам (потолки в секундах)
+    results_timeout: float = 60
+    step_timeout: float = 10
+    readiness_poll_interval: float = 0.25
+    network_idle_ms: int = 500
+    # Потолок поиска элемента из MPSTATS_UI_CONFIG (если у элемента не задан свой "timeout")
+    selector_timeout: float = 5
+
+    # Чтение таблицы результатов прямо из DOM; при виртуальной прокрутке
+    # или обрезанной таблице - скачивание Excel как раньше
+    grid_extraction_enabled: bool = False
+    # Строки результатов из JSON ответа API страницы (захват CDP Network) - без
+    # таблицы и файла. Задача может выбрать сама: params["network_capture"]
+    network_capture_enabled: bool = False
+    network_capture_urls: List[str] = field(default_factory=lambda: ["*/api/*keyword*"])
+    network_capture_max_mb: int = 8
+    network_capture_timeout: float = 10
+
+    # Быстрый путь без браузера: HTTP запрос с куками сохраненной сессии.
+    # Эндпоинт задается явно - пока он не указан, используется только Selenium
+    http_fast_path_enabled: bool = False
+    keywords_api_url: str = ""
+    keywords_api_method: str = "GET"
+    keywords_api_query_param: str = "query"
+
+    # Кэш результатов скрапинга по тексту запроса
+    keyword_cache_enabled: bool = True
+    keyword_cache_ttl: float = 86400
+    keyword_cache_max_entries: int = 1000
+    keyword_cache_memory_entries: int = 128
+    # Сколько просроченные записи хранятся на случай недоступности MPStats (секунды)
+    keyword_cache_stale_ttl: float = 604800
+    # Stale-while-revalidate: запись старше soft TTL отдается сразу и обновляется в фоне
+    # (0 - отключено; жесткий предел - keyword_cache_ttl)
+    keyword_cache_soft_ttl: float = 21600
+    # Доля изменившихся ключевых слов, при которой обновленный результат показывается пользователю
+    keyword_refresh_min_change: float = 0.2
+
+    # Автомат скрапинга: при частых ошибках/таймаутах MPStats - быстрый отказ или просроченный кэш
+    scrape_breaker_enabled: bool = True
+    scrape_breaker_window: int = 10
+    scrape_breaker_min_calls: int = 4
+    scrape_breaker_failure_rate: float = 0.5
+    scrape_breaker_slow_call: float = 90
+    scrape_breaker_open_seconds: float = 120
+    scrape_breaker_max_open_seconds: float = 1800
+
+    # Сетевой профиль страницы MPStats: default, lean, strict (см. NetworkProfile).
+    # lean и strict включаются явно - по результатам scripts/scraper_benchmark.py
+    network_profile: str = "default"
+    network_allowed_hosts: List[str] = field(default_factory=lambda: ["mpstats.io"])
+
+    # Адрес сайта MPStats для скрапера (для бенчмарков - локальная копия, scripts/mpstats_standin.py)
+    site_url: str = "https://mpstats.io"
+
+    # Быстрая проверка сессии перед логином (куки + легкий HTTP запрос)
+    login_probe_enabled: bool = True
+    login_probe_url: str = ""  # Пусто - страница запросов на site_url
+    login_probe_timeout: float = 5
+    login_probe_cookie_names: List[str] = field(default_factory=list)
+
+    # ChromeDriver: старт из локального кэша, проверка обновлений в фоне
+    driver_background_refresh: bool = True
+
+    # Профиль памяти Chrome: default или lean (меньше процессов рендера, лимит JS heap)
+    memory_profile: str = "default"
+    js_heap_mb: int = 512
+    # Интервал замера RSS процессов драйвера (секунды)
+    memory_sample_interval: float = 1.0
+
+    # Копии эталонного профиля Chrome для каждого драйвера (директорию копий можно вынести на tmpfs)
+    profile_cloning_enabled: bool = True
+    profile_clones_dir: str = ""
+    profile_template_refresh_hours: float = 12
+    profile_clone_stale_minutes: float = 120
+
+    # Ночной прогрев кэша ключевых слов (часы "начало-конец" по локальному времени)
+    prewarm_enabled: bool = False
+    prewarm_quiet_hours: str = "2-6"
+    prewarm_max_queries: int = 60
+    prewarm_batch_size: int = 10
+    prewarm_query_pause: float = 15
+    prewarm_history_days: int = 30
+    prewarm_check_interval: float = 300
+
+    # Отдельные процессы скрапера (0 - скрапинг в процессе бота). Бот общается
+    # с ними по Unix сокетам worker_socket_dir/scraper-<N>.sock; лимит
+    # одновременных браузеров (max_concurrent_requests) действует в каждом процессе
+    worker_processes: int = 0
+    worker_socket_dir: str = ""
+    # Бот сам запускает и перезапускает процессы (иначе они запускаются отдельно:
+    # python -m app.services.scraper_worker --index N)
+    worker_autostart: bool = True
+    worker_connect_timeout: float = 5
+    worker_stats_interval: float = 30
+
+
 class Config:
     """
     Главный класс конфигурации приложения (только PostgreSQL)
@@ -250,6 +369,83 @@ class Config:
             max_concurrent_requests=int(os.getenv('MAX_CONCURRENT_REQUESTS', '5'))
         )
 
+        # Скрапер MPStats
+        self.scraper = ScraperConfig(
+            executor_workers=int(os.getenv('SCRAPER_EXECUTOR_WORKERS', '2')),
+            loop_lag_interval=float(os.getenv('LOOP_LAG_INTERVAL', '0.5')),
+            loop_lag_warn_threshold=float(os.getenv('LOOP_LAG_WARN_THRESHOLD', '0.3')),
+            driver_pool_enabled=self._get_bool('DRIVER_POOL_ENABLED', False),
+            driver_pool_size=int(os.getenv('DRIVER_POOL_SIZE', '2')),
+            driver_pool_max_uses=int(os.getenv('DRIVER_POOL_MAX_USES', '20')),
+            driver_pool_max_memory_mb=int(os.getenv('DRIVER_POOL_MAX_MEMORY_MB', '1500')),
+            driver_pool_acquire_timeout=float(os.getenv('DRIVER_POOL_ACQUIRE_TIMEOUT', '300')),
+            tab_workers=int(os.getenv('SCRAPER_TAB_WORKERS', '0')),
+            tab_browser_max_uses=int(os.getenv('SCRAPER_TAB_BROWSER_MAX_USES', '100')),
+            tab_browser_max_memory_mb=int(os.getenv('SCRAPER_TAB_BROWSER_MAX_MEMORY_MB', '3000')),
+            results_timeout=float(os.getenv('SCRAPER_RESULTS_TIMEOUT', '60')),
+            step_timeout=float(os.getenv('SCRAPER_STEP_TIMEOUT', '10')),
+            readiness_poll_interval=float(os.getenv('SCRAPER_READINESS_POLL_INTERVAL', '0.25')),
+            network_idle_ms=int(os.getenv('SCRAPER_NETWORK_IDLE_MS', '500')),
+            selector_timeout=float(os.getenv('SCRAPER_SELECTOR_TIMEOUT', '5')),
+            grid_extraction_enabled=self._get_bool('SCRAPER_GRID_EXTRACTION', False),
+            network_capture_enabled=self._get_bool('SCRAPER_NETWORK_CAPTURE', False),
+            network_capture_urls=[
+                url.strip() for url in os.getenv('SCRAPER_NETWORK_CAPTURE_URLS', '*/api/*keyword*').split(',')
+                if url.strip()
+            ],
+            network_capture_max_mb=int(os.getenv('SCRAPER_NETWORK_CAPTURE_MAX_MB', '8')),
+            network_capture_timeout=float(os.getenv('SCRAPER_NETWORK_CAPTURE_TIMEOUT', '10')),
+            http_fast_path_enabled=self._get_bool('SCRAPER_HTTP_FAST_PATH', False),
+            keywords_api_url=os.getenv('MPSTATS_KEYWORDS_API_URL', ''),
+            keywords_api_method=os.getenv('MPSTATS_KEYWORDS_API_METHOD', 'GET'),
+            keywords_api_query_param=os.getenv('MPSTATS_KEYWORDS_API_QUERY_PARAM', 'query'),
+            keyword_cache_enabled=self._get_bool('KEYWORD_CACHE_ENABLED', True),
+            keyword_cache_ttl=float(os.getenv('KEYWORD_CACHE_TTL', '86400')),
+            keyword_cache_max_entries=int(os.getenv('KEYWORD_CACHE_MAX_ENTRIES', '1000')),
+            keyword_cache_memory_entries=int(os.getenv('KEYWORD_CACHE_MEMORY_ENTRIES', '128')),
+            keyword_cache_stale_ttl=float(os.getenv('KEYWORD_CACHE_STALE_TTL', '604800')),
+            keyword_cache_soft_ttl=float(os.getenv('KEYWORD_CACHE_SOFT_TTL', '21600')),
+            keyword_refresh_min_change=float(os.getenv('KEYWORD_REFRESH_MIN_CHANGE', '0.2')),
+            scrape_breaker_enabled=self._get_bool('SCRAPE_BREAKER_ENABLED', True),
+            scrape_breaker_window=int(os.getenv('SCRAPE_BREAKER_WINDOW', '10')),
+            scrape_breaker_min_calls=int(os.getenv('SCRAPE_BREAKER_MIN_CALLS', '4')),
+            scrape_breaker_failure_rate=float(os.getenv('SCRAPE_BREAKER_FAILURE_RATE', '0.5')),
+            scrape_breaker_slow_call=float(os.getenv('SCRAPE_BREAKER_SLOW_CALL', '90')),
+            scrape_breaker_open_seconds=float(os.getenv('SCRAPE_BREAKER_OPEN_SECONDS', '120')),
+            scrape_breaker_max_open_seconds=float(os.getenv('SCRAPE_BREAKER_MAX_OPEN_SECONDS', '1800')),
+            network_profile=os.getenv('SCRAPER_NETWORK_PROFILE', 'default'),
+            network_allowed_hosts=[
+                host.strip() for host in os.getenv('SCRAPER_ALLOWED_HOSTS', 'mpstats.io').split(',') if host.strip()
+            ],
+            site_url=os.getenv('MPSTATS_SITE_URL', 'https://mpstats.io').rstrip('/'),
+            login_probe_enabled=self._get_bool('LOGIN_PROBE_ENABLED', True),
+            login_probe_url=os.getenv('LOGIN_PROBE_URL', ''),
+            login_probe_timeout=float(os.getenv('LOGIN_PROBE_TIMEOUT', '5')),
+            login_probe_cookie_names=[
+                name.strip() for name in os.getenv('LOGIN_PROBE_COOKIE_NAMES', '').split(',') if name.strip()
+            ],
+            driver_background_refresh=self._get_bool('CHROMEDRIVER_BACKGROUND_REFRESH', True),
+            memory_profile=os.getenv('SCRAPER_MEMORY_PROFILE', 'default'),
+            js_heap_mb=int(os.getenv('SCRAPER_JS_HEAP_MB', '512')),
+            memory_sample_interval=float(os.getenv('SCRAPER_MEMORY_SAMPLE_INTERVAL', '1.0')),
+            profile_cloning_enabled=self._get_bool('SCRAPER_PROFILE_CLONING', True),
+            profile_clones_dir=os.getenv('SCRAPER_PROFILE_CLONES_DIR', ''),
+            profile_template_refresh_hours=float(os.getenv('SCRAPER_PROFILE_TEMPLATE_REFRESH_HOURS', '12')),
+            profile_clone_stale_minutes=float(os.getenv('SCRAPER_PROFILE_CLONE_STALE_MINUTES', '120')),
+            prewarm_enabled=self._get_bool('PREWARM_ENABLED', False),
+            prewarm_quiet_hours=os.getenv('PREWARM_QUIET_HOURS', '2-6'),
+            prewarm_max_queries=int(os.getenv('PREWARM_MAX_QUERIES', '60')),
+            prewarm_batch_size=int(os.getenv('PREWARM_BATCH_SIZE', '10')),
+            prewarm_query_pause=float(os.getenv('PREWARM_QUERY_PAUSE', '15')),
+            prewarm_history_days=int(os.getenv('PREWARM_HISTORY_DAYS', '30')),
+            prewarm_check_interval=float(os.getenv('PREWARM_CHECK_INTERVAL', '300')),
+            worker_processes=int(os.getenv('SCRAPER_WORKERS', '0')),
+            worker_socket_dir=os.getenv('SCRAPER_WORKER_SOCKET_DIR', ''),
+            worker_autostart=self._get_bool('SCRAPER_WORKER_AUTOSTART', True),
+            worker_connect_timeout=float(os.getenv('SCRAPER_WORKER_CONNECT_TIMEOUT', '5')),
+            worker_stats_interval=float(os.getenv('SCRAPER_WORKER_STATS_INTERVAL', '30'))
+        )
+
         # Выводим информацию о конфигурации
         self._print_config_info()
 
@@ -397,6 +593,13 @@ class Config:
                 print(f"  ❌ MAX_KEYWORDS must be positive: {self.generation.max_keywords}")
                 return False
 
+            # Вкладка задачи занимает поток пула на каждом шаге; без свободного потока
+            # сверх вкладок одни задачи ждут потоки, занятые другими
+            if self.scraper.tab_workers > 0 and self.scraper.executor_workers <= self.scraper.tab_workers:
+                print(f"  ❌ SCRAPER_EXECUTOR_WORKERS ({self.scraper.executor_workers}) must be greater than "
+                      f"SCRAPER_TAB_WORKERS ({self.scraper.tab_workers})")
+                return False
+
             # Проверяем доступность директорий
             required_dirs = [
                 self.paths.data_dir,
@@ -3,25 +3,39 @@
 
 #!!! Классы в DOM динамические !!!
 # или периодически обновлять их тут вручную, или писать тесты)))
+# Элементы ищет SelectorEngine: "fallbacks" - запасные локаторы по порядку
+# (пробуются, если основной перестал находить элемент), "timeout" - потолок поиска в секундах.
+# Запасные варианты должны находить элементы в том же порядке: код кликает по индексу.
 
 MPSTATS_UI_CONFIG = {
     "login": {
-        "email_field": {"by": "NAME", "value": "mpstats-login-form-name"},
-        "password_field": {"by": "NAME", "value": "mpstats-login-form-password"}
+        "email_field": {"by": "NAME", "value": "mpstats-login-form-name", "timeout": 30,
+                        "fallbacks": [{"by": "CSS_SELECTOR", "value": "form input[type='email']"}]},
+        "password_field": {"by": "NAME", "value": "mpstats-login-form-password",
+                           "fallbacks": [{"by": "CSS_SELECTOR", "value": "form input[type='password']"}]}
     },
     # Параметры поиска (3 кнопки) в mpstats_scraper_service используется нажатие на индекс кнопки в списке по классу
     # метод _fill_keywords_form
     "tabs": {
-        "requests": {"by": "XPATH", "value": "//*[contains(@class, 'tYj44tFk')]"},
+        "requests": {"by": "XPATH", "value": "//*[contains(@class, 'tYj44tFk')]", "timeout": 15,
+                     "fallbacks": [{"by": "XPATH", "value": "//*[contains(text(), 'Запросы') or contains(text(), 'Запрос')]"}]},
         "words": {"by": "XPATH", "value": "//*[contains(@class, 'tYj44tFk')]"}
     },
 
     "forms": {
         "textarea": {"by": "TAG_NAME", "value": "textarea"},
-        "find_queries_btn": {"by": "CSS_SELECTOR", "value": ".QfBtWSte.G5Kzc11I"}
+        "find_queries_btn": {"by": "CSS_SELECTOR", "value": ".QfBtWSte.G5Kzc11I",
+                             "fallbacks": [{"by": "XPATH", "value": "//button[contains(., 'Подобрать')]"}]}
     },
     # 2 поочередные кнопки скачать из одного списка класса (сейчас 0 и 2 индексы)
     "download": {
         "download_btn": {"by": "CSS_SELECTOR", "value": ".QfBtWSte.G5Kzc11I"}
+    },
+    # Строки таблицы результатов - сигнал, что MPStats ответил на "Подобрать запросы";
+    # сама таблица - для чтения результатов из DOM без выгрузки Excel
+    "results": {
+        "grid_row": {"by": "CSS_SELECTOR", "value": "[role='grid'] [role='row'], table tbody tr"},
+        "grid": {"by": "CSS_SELECTOR", "value": "[role='grid']", "timeout": 3,
+                 "fallbacks": [{"by": "TAG_NAME", "value": "table"}]}
     }
 }
\ No newline at end of file
@@ -61,6 +61,7 @@ class Database:
             from app.database.models.category import Category
             from app.database.models.session import UserSession
             from app.database.models.content import GeneratedContent
+            from app.database.models.keyword_cache import KeywordCacheEntry
 
             if config.app.debug:  # Только в режиме отладки
                 logger.warning("⚠️ Удаление существующих таблиц...")
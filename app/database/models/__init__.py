@@ -7,6 +7,7 @@ from app.database.models.user import User
 from app.database.models.category import Category
 from app.database.models.session import UserSession
 from app.database.models.content import GeneratedContent
+from app.database.models.keyword_cache import KeywordCacheEntry
 
 # All models for Alembic autogenerate
 __all__ = [
@@ -14,5 +15,6 @@ __all__ = [
     'User',
     'Category',
     'UserSession',
-    'GeneratedContent'
+    'GeneratedContent',
+    'KeywordCacheEntry'
 ]
\ No newline at end of file
@@ -0,0 +1,23 @@
+# app/database/models/keyword_cache.py
+from sqlalchemy import Column, String, Text, JSON, Integer, DateTime
+from app.database.models.base import Base, BaseModel
+
+
+class KeywordCacheEntry(Base, BaseModel):
+    """
+    Кэш результатов скрапинга MPStats: все ключевые слова (до GPT-фильтрации)
+    по нормализованному тексту запроса
+    """
+    __tablename__ = "keyword_cache"
+
+    query_key = Column(String(64), primary_key=True)  # sha256 нормализованного текста запроса
+    query_text = Column(Text, nullable=False)
+    keywords = Column(JSON, nullable=False, default=[])
+    source = Column(String(32), nullable=True)  # http, selenium
+
+    hits = Column(Integer, nullable=False, default=0)
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<KeywordCacheEntry(query_key={self.query_key[:12]}, keywords={len(self.keywords or [])})>"
@@ -7,6 +7,7 @@ from app.database.repositories.user_repo import UserRepository
 from app.database.repositories.category_repo import CategoryRepository
 from app.database.repositories.session_repo import SessionRepository
 from app.database.repositories.snapshot_repo import SnapshotRepository
+from app.database.repositories.keyword_cache_repo import KeywordCacheRepository
 
 __all__ = [
     'BaseRepository',
@@ -14,4 +15,5 @@ __all__ = [
     'CategoryRepository',
     'SessionRepository',
     'SnapshotRepository',
+    'KeywordCacheRepository',
 ]
\ No newline at end of file
@@ -0,0 +1,112 @@
+# app/database/repositories/keyword_cache_repo.py
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any
+
+from app.database.repositories.base import BaseRepository
+from app.database.models.keyword_cache import KeywordCacheEntry
+
+
+class KeywordCacheRepository(BaseRepository[KeywordCacheEntry]):
+    """Репозиторий кэша ключевых слов MPStats"""
+
+    def __init__(self):
+        super().__init__(KeywordCacheEntry)
+
+    def get_fresh(self, query_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Получить непросроченную запись и отметить попадание
+
+        Returns:
+            Dict с полями записи или None
+        """
+        now = datetime.now(timezone.utc)
+        with self.get_session() as session:
+            entry = session.get(KeywordCacheEntry, query_key)
+            if not entry or entry.expires_at <= now:
+                return None
+            entry.hits = (entry.hits or 0) + 1
+            entry.last_hit_at = now
+            session.commit()
+            return entry.to_dict()
+
+    def get_stale(self, query_key: str, max_stale: float) -> Optional[Dict[str, Any]]:
+        """
+        Получить запись, просроченную не больше чем на max_stale секунд (или свежую)
+
+        Returns:
+            Dict с полями записи или None
+        """
+        now = datetime.now(timezone.utc)
+        with self.get_session() as session:
+            entry = session.get(KeywordCacheEntry, query_key)
+            if not entry or entry.expires_at <= now - timedelta(seconds=max_stale):
+                return None
+            entry.hits = (entry.hits or 0) + 1
+            entry.last_hit_at = now
+            session.commit()
+            return entry.to_dict()
+
+    def get_expirations(self, query_keys: List[str]) -> Dict[str, datetime]:
+        """Сроки жизни записей по ключам (без отметки попадания)"""
+        if not query_keys:
+            return {}
+        with self.get_session() as session:
+            rows = session.query(KeywordCacheEntry.query_key, KeywordCacheEntry.expires_at) \
+                .filter(KeywordCacheEntry.query_key.in_(query_keys)) \
+                .all()
+            return {row.query_key: row.expires_at for row in rows}
+
+    def put(self, query_key: str, query_text: str, keywords: List[str], source: str, ttl: float):
+        """Сохранить (или перезаписать) результат скрапинга"""
+        now = datetime.now(timezone.utc)
+        with self.get_session() as session:
+            entry = session.get(KeywordCacheEntry, query_key)
+            if entry is None:
+                entry = KeywordCacheEntry(query_key=query_key, hits=0)
+                session.add(entry)
+            entry.query_text = query_text
+            entry.keywords = keywords
+            entry.source = source
+            entry.last_hit_at = now
+            entry.expires_at = now + timedelta(seconds=ttl)
+            session.commit()
+
+    def evict(self, max_entries: int, keep_stale: float = 0) -> int:
+        """
+        Удаляет записи, просроченные больше чем на keep_stale секунд,
+        и самые давно использованные сверх max_entries
+
+        Returns:
+            Количество удаленных записей
+        """
+        now = datetime.now(timezone.utc)
+        with self.get_session() as session:
+            removed = session.query(KeywordCacheEntry) \
+                .filter(KeywordCacheEntry.expires_at <= now - timedelta(seconds=keep_stale)) \
+                .delete(synchronize_session=False)
+
+            overflow = session.query(KeywordCacheEntry).count() - max_entries
+            if overflow > 0:
+                stale_keys = [
+                    row.query_key for row in session.query(KeywordCacheEntry.query_key)
+                    .order_by(KeywordCacheEntry.last_hit_at.asc().nullsfirst())
+                    .limit(overflow)
+                ]
+                removed += session.query(KeywordCacheEntry) \
+                    .filter(KeywordCacheEntry.query_key.in_(stale_keys)) \
+                    .delete(synchronize_session=False)
+
+            session.commit()
+            return removed
+
+    def clear(self) -> int:
+        """Очистить кэш полностью"""
+        with self.get_session() as session:
+            removed = session.query(KeywordCacheEntry).delete(synchronize_session=False)
+            session.commit()
+            return removed
+
+    def get_total_count(self) -> int:
+        """Количество записей в кэше"""
+        with self.get_session() as session:
+            return session.query(KeywordCacheEntry).count()
@@ -161,6 +161,34 @@ class SnapshotRepository(BaseRepository[ContentSnapshot]):
                 .order_by(ContentSnapshot.created_at.desc()) \
                 .all()
 
+    def get_request_combinations(self, since: datetime) -> List[Dict[str, Any]]:
+        """
+        Параметры сбора данных из снимков за период (без сгенерированного контента).
+        Одна сессия дает несколько снимков - повторы по session_id убраны.
+        """
+        with self.get_session() as session:
+            rows = session.query(
+                ContentSnapshot.session_id,
+                ContentSnapshot.category_name,
+                ContentSnapshot.purposes,
+                ContentSnapshot.additional_params
+            ).filter(ContentSnapshot.created_at >= since).all()
+
+        combinations = []
+        seen_sessions = set()
+        for row in rows:
+            key = (row.session_id, row.category_name, json.dumps(row.purposes, ensure_ascii=False),
+                   json.dumps(row.additional_params, ensure_ascii=False))
+            if row.session_id and key in seen_sessions:
+                continue
+            seen_sessions.add(key)
+            combinations.append({
+                'category_name': row.category_name,
+                'purposes': row.purposes or [],
+                'additional_params': row.additional_params or [],
+            })
+        return combinations
+
     def export_all_to_excel(self, filepath: Optional[str] = None):
         """Экспортирует все снимки в Excel"""
         with self.get_session() as session:
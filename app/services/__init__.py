@@ -7,7 +7,16 @@ from app.services.openai_service import OpenAIService
 from app.services.content_service import ContentService
 # from app.services.session_service import SessionService
 # from app.services.validation_service import ValidationService
-from app.services.mpstats_scraper_service import MPStatsScraperService
+
+
+def __getattr__(name):
+    # Скрапер (Selenium) импортируется по требованию: процессу бота в режиме
+    # процессов скрапера он не нужен
+    if name == 'MPStatsScraperService':
+        from app.services.mpstats_scraper_service import MPStatsScraperService
+        return MPStatsScraperService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'MPStatsService',
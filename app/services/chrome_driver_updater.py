@@ -1,47 +1,171 @@
 # app/utils/chrome_driver_updater.py
+import json
 import os
+import re
+import shutil
+import subprocess
+import threading
 import logging
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service as ChromeService
+from datetime import datetime
+from typing import Optional
+
+from app.config.config import config
 
 logger = logging.getLogger(__name__)
 
 
 class ChromeDriverUpdater:
-    """Сервис для одноразового обновления ChromeDriver"""
+    """
+    Локальный кэш ChromeDriver, привязанный к мажорной версии Chrome.
+
+    Старт работает без сети: драйвер берется из кэша (data/chromedriver/<major>)
+    или из системного chromedriver подходящей версии (он сразу закрепляется
+    в кэше). webdriver_manager вызывается только если локально ничего нет,
+    а обновление кэша выполняется в фоне и не задерживает запуск бота.
+    """
+
+    # Путь общий для всех экземпляров: драйвер создается на каждую задачу
+    _resolved_path: Optional[str] = None
+    _lock = threading.Lock()
+    _refresh_thread: Optional[threading.Thread] = None
 
     def __init__(self):
-        self.driver_path = None
+        self.cache_dir = os.path.join(config.paths.data_dir, "chromedriver")
+        self.chrome_binary = config.selenium.chrome_binary_path
+        self.system_driver = config.selenium.chrome_driver_path
+
+    @property
+    def driver_path(self) -> Optional[str]:
+        return ChromeDriverUpdater._resolved_path
 
     def update_once(self):
-        """Обновляет ChromeDriver один раз при старте приложения"""
-        try:
-            # Проверяем, не обновляли ли уже
+        """Определяет драйвер при старте приложения (без обращения к сети, если есть кэш)"""
+        with ChromeDriverUpdater._lock:
             if self.driver_path and os.path.exists(self.driver_path):
-                logger.info(f"✅ ChromeDriver уже обновлен: {self.driver_path}")
+                logger.info(f"✅ ChromeDriver уже определен: {self.driver_path}")
                 return self.driver_path
 
-            # Отключаем логи WebDriverManager
-            os.environ['WDM_LOG_LEVEL'] = '0'
-            os.environ['WDM_PRINT_FIRST_LINE'] = 'False'
-
-            # Получаем последнюю версию
-            logger.info("🔍 Проверяю версию ChromeDriver...")
+            chrome_major = self.get_chrome_major()
+            driver_path = self._find_local_driver(chrome_major)
 
-            # Используем ChromeDriverManager для получения пути к драйверу
-            driver_path = ChromeDriverManager().install()
-
-            self.driver_path = driver_path
-            logger.info(f"✅ ChromeDriver обновлен: {driver_path}")
+            if not driver_path:
+                # Локально ничего нет - единственный случай, когда старт ждет сеть
+                logger.warning("⚠️ ChromeDriver не найден локально, скачиваю через webdriver_manager...")
+                driver_path = self._pin(self._download_driver(), chrome_major, source="webdriver_manager")
 
+            ChromeDriverUpdater._resolved_path = driver_path
+            logger.info(f"✅ ChromeDriver: {driver_path}")
             return driver_path
 
-        except Exception as e:
-            logger.error(f"❌ Ошибка обновления ChromeDriver: {e}")
-            raise
-
     def get_driver_path(self):
-        """Возвращает путь к обновленному драйверу"""
+        """Возвращает путь к драйверу"""
         if not self.driver_path:
             return self.update_once()
-        return self.driver_path
\ No newline at end of file
+        return self.driver_path
+
+    def start_background_refresh(self):
+        """Проверка новой версии драйвера в фоне (результат будет использован новыми драйверами)"""
+        if ChromeDriverUpdater._refresh_thread and ChromeDriverUpdater._refresh_thread.is_alive():
+            return
+        ChromeDriverUpdater._refresh_thread = threading.Thread(
+            target=self._refresh, name="chromedriver-refresh", daemon=True
+        )
+        ChromeDriverUpdater._refresh_thread.start()
+
+    def _refresh(self):
+        try:
+            chrome_major = self.get_chrome_major()
+            downloaded = self._download_driver()
+            if chrome_major and self._binary_major(downloaded) != chrome_major:
+                logger.warning(f"⚠️ Скачанный ChromeDriver не подходит к Chrome {chrome_major}, кэш не меняю")
+                return
+
+            current = self.driver_path
+            if current and self._binary_version(current) == self._binary_version(downloaded):
+                logger.info("✅ ChromeDriver в кэше актуален")
+                return
+
+            pinned = self._pin(downloaded, chrome_major, source="webdriver_manager")
+            with ChromeDriverUpdater._lock:
+                ChromeDriverUpdater._resolved_path = pinned
+            logger.info(f"🔄 ChromeDriver обновлен в фоне: {pinned}")
+        except Exception as e:
+            logger.warning(f"⚠️ Фоновое обновление ChromeDriver не удалось (работаю с кэшем): {e}")
+
+    # ---------- Поиск локального драйвера ----------
+
+    def _find_local_driver(self, chrome_major: Optional[str]) -> Optional[str]:
+        if chrome_major:
+            cached = os.path.join(self.cache_dir, chrome_major, "chromedriver")
+            if os.access(cached, os.X_OK):
+                logger.info(f"📦 ChromeDriver из кэша для Chrome {chrome_major}")
+                return cached
+
+        system_driver = self.system_driver if os.access(self.system_driver, os.X_OK) else shutil.which("chromedriver")
+        if system_driver:
+            driver_major = self._binary_major(system_driver)
+            if chrome_major is None or driver_major == chrome_major:
+                return self._pin(system_driver, chrome_major or driver_major, source="system")
+            logger.warning(f"⚠️ Системный ChromeDriver {driver_major} не подходит к Chrome {chrome_major}")
+
+        return None
+
+    def _pin(self, driver_path: str, chrome_major: Optional[str], source: str) -> str:
+        """Копирует драйвер в кэш версии Chrome и записывает манифест"""
+        if not chrome_major:
+            return driver_path
+
+        version_dir = os.path.join(self.cache_dir, chrome_major)
+        os.makedirs(version_dir, exist_ok=True)
+        target = os.path.join(version_dir, "chromedriver")
+        if os.path.abspath(driver_path) != os.path.abspath(target):
+            # Копия во временный файл и атомарная замена - параллельные драйверы не увидят полфайла
+            tmp_target = f"{target}.tmp"
+            shutil.copy2(driver_path, tmp_target)
+            os.chmod(tmp_target, 0o755)
+            os.replace(tmp_target, target)
+
+        with open(os.path.join(version_dir, "manifest.json"), "w") as f:
+            json.dump({
+                "chrome_major": chrome_major,
+                "driver_version": self._binary_version(target),
+                "source": source,
+                "pinned_at": datetime.now().isoformat(),
+            }, f, indent=2)
+        return target
+
+    @staticmethod
+    def _download_driver() -> str:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        # Отключаем логи WebDriverManager
+        os.environ['WDM_LOG_LEVEL'] = '0'
+        os.environ['WDM_PRINT_FIRST_LINE'] = 'False'
+        return ChromeDriverManager().install()
+
+    # ---------- Версии ----------
+
+    def get_chrome_major(self) -> Optional[str]:
+        """Мажорная версия установленного Chrome"""
+        for binary in (self.chrome_binary, os.getenv('CHROME_BIN'), shutil.which("google-chrome"),
+                       shutil.which("google-chrome-stable"), shutil.which("chromium")):
+            if binary and os.path.exists(binary):
+                major = self._binary_major(binary)
+                if major:
+                    return major
+        logger.warning("⚠️ Не удалось определить версию Chrome")
+        return None
+
+    @staticmethod
+    def _binary_version(binary: str) -> Optional[str]:
+        try:
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None
+        match = re.search(r"(\d+)\.(\d+)\.(\d+)\.(\d+)", output)
+        return match.group(0) if match else None
+
+    @classmethod
+    def _binary_major(cls, binary: str) -> Optional[str]:
+        version = cls._binary_version(binary)
+        return version.split(".")[0] if version else None
@@ -1,16 +1,26 @@
 # app/services/data_collection_service.py
 import asyncio
+import copy
 import logging
 import os
 import json
-from typing import Dict, Any, List, Optional, Union
+import shutil
+import time
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple, Union
 from pathlib import Path
 
 from app import services
 from app.config.mpstats_ui_config import MPSTATS_UI_CONFIG
 from app.services.mpstats_scraper_service import MPStatsScraperService
+from app.services.mpstats_http_service import MPStatsHttpKeywordsClient
+from app.services.keyword_cache_service import KeywordCacheService
+from app.services.scrape_job_scheduler import ScrapeJobScheduler, JobOwner
 from app.utils.keywords_processor import KeywordsProcessor
 from app.utils.temp_file_manager import temp_manager  # ИМПОРТ МЕНЕДЖЕРА
+from app.utils.single_flight import SingleFlight
+from app.utils.job_timing import timings
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.purpose_names import translate_purposes
 
 
 class DataCollectionService:
@@ -31,12 +41,214 @@ class DataCollectionService:
         self.downloads_dir = Path(config.paths.mpstats_downloads_dir)
         self.keywords_dir = Path(config.paths.keywords_dir)
 
+        # Быстрый путь без браузера по кукам сохраненной сессии
+        self.http_client = MPStatsHttpKeywordsClient(
+            config,
+            cookies_path=os.path.join(self.scraper.profile_dir, 'cookies.json'),
+            keywords_processor=self.keywords_processor
+        )
+
+        # Очередь браузерных задач: не больше max_concurrent_requests Chrome одновременно
+        self.scheduler = ScrapeJobScheduler(max_concurrent=config.limits.max_concurrent_requests)
+
+        # Одинаковые одновременные запросы выполняются один раз; запрос,
+        # который отменили все ожидающие (отмена задачи процесса скрапера), останавливается
+        self.single_flight = SingleFlight(name="collect_keywords", cancel_abandoned=True)
+
+        # Кэш результатов скрапинга (переживает перезапуск - хранится в БД)
+        self.keyword_cache = None
+        if config.scraper.keyword_cache_enabled:
+            self.keyword_cache = KeywordCacheService(
+                ttl=config.scraper.keyword_cache_ttl,
+                max_entries=config.scraper.keyword_cache_max_entries,
+                memory_entries=config.scraper.keyword_cache_memory_entries,
+                stale_ttl=config.scraper.keyword_cache_stale_ttl,
+                soft_ttl=config.scraper.keyword_cache_soft_ttl
+            )
+
+        # Stale-while-revalidate: фоновые обновления устаревших записей кэша (по ключу запроса)
+        # и задачи, которые ждут их, чтобы показать пользователю обновленный результат
+        self._refreshes: Dict[str, asyncio.Task] = {}
+        self._refresh_followers: Set[asyncio.Task] = set()
+        self.refresh_stats = {"scheduled": 0, "changed": 0, "unchanged": 0, "failed": 0}
+
+        # Автомат вокруг браузерного скрапинга: когда MPStats падает или тормозит,
+        # задачи не тратят минуты Chrome на заведомую ошибку
+        self.scrape_breaker = None
+        if config.scraper.scrape_breaker_enabled:
+            self.scrape_breaker = CircuitBreaker(
+                name="MPStats",
+                window=config.scraper.scrape_breaker_window,
+                min_calls=config.scraper.scrape_breaker_min_calls,
+                failure_rate=config.scraper.scrape_breaker_failure_rate,
+                slow_call_seconds=config.scraper.scrape_breaker_slow_call,
+                open_seconds=config.scraper.scrape_breaker_open_seconds,
+                max_open_seconds=config.scraper.scrape_breaker_max_open_seconds
+            )
+
     async def collect_keywords_data(
             self,
             category: str,
             purpose: Union[str, List[str]] = "",
             additional_params: List[str] = None,
-            category_description: str = None
+            category_description: str = None,
+            owner: Optional[JobOwner] = None
+    ) -> Dict[str, Any]:
+        """
+        Сбор данных с объединением одинаковых одновременных запросов:
+        если такой же запрос уже выполняется, ждем его результат
+        вместо запуска второго браузера.
+
+        Args:
+            category: Название категории
+            purpose: Назначение товара (строка или массив строк)
+            additional_params: Дополнительные параметры
+            category_description: Описание категории из БД
+            owner: Пользователь для очереди браузерных задач (приоритет и позиция в очереди);
+                если данные отданы из устаревшего кэша, owner.on_refresh получит
+                обновленный результат, когда фоновое обновление заметно их изменит
+        """
+        flight_key = self._flight_key(category, purpose, additional_params, category_description)
+        result = await self.single_flight.do(
+            flight_key,
+            lambda: self._timed_collect_keywords_data(category, purpose, additional_params, category_description, owner)
+        )
+        # У каждого вызывающего своя копия - результат дальше изменяется в хендлерах
+        result = copy.deepcopy(result)
+        if owner and owner.on_refresh and result.get("refresh_key"):
+            follower = asyncio.create_task(self._notify_refresh(
+                {"refresh_key": result["refresh_key"], "keywords": list(result["keywords"])}, owner
+            ))
+            self._refresh_followers.add(follower)
+            follower.add_done_callback(self._refresh_followers.discard)
+        return result
+
+    async def wait_for_refresh(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Ждет фоновое обновление, запущенное для результата из устаревшего кэша
+
+        Args:
+            result: Результат collect_keywords_data (с refresh_key)
+
+        Returns:
+            Обновленный результат в том же формате или None, если обновления нет,
+            оно не удалось или ключевые слова не изменились
+        """
+        task = self._refreshes.get(result.get("refresh_key") or "")
+        if not task:
+            return None
+        # Не shield: отмена ожидающего не должна отменять обновление, а отмена
+        # обновления (остановка сервиса) - выглядеть как отмена ожидающего
+        await asyncio.wait({task})
+        if task.cancelled() or task.exception() or not task.result():
+            return None
+        fresh = task.result()
+        if set(fresh["keywords"]) == set(result.get("keywords") or []):
+            return None
+        return copy.deepcopy(fresh)
+
+    async def _notify_refresh(self, result: Dict[str, Any], owner: JobOwner):
+        fresh = await self.wait_for_refresh(result)
+        if not fresh:
+            return
+        try:
+            await owner.on_refresh(fresh)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Не удалось показать обновленные данные: {e}")
+
+    @staticmethod
+    def translate_purposes(purposes: List[str]) -> List[str]:
+        """Переводит id назначений на русский перед передачей в MPStats"""
+        return translate_purposes(purposes)
+
+    def build_request_params(self, category: str, purpose: Union[str, List[str]] = "",
+                             additional_params: Optional[List[str]] = None,
+                             category_description: Optional[str] = None) -> Dict[str, Any]:
+        """Параметры запроса сбора данных (от них зависит ключ кэша)"""
+        return {
+            "category": category,
+            "category_description": category_description or "",
+            "purposes": self._normalize_purpose(purpose),
+            "additional_params": additional_params or []
+        }
+
+    def query_text_for(self, params: Dict[str, Any]) -> str:
+        """Текст запроса к MPStats - ключ кэша ключевых слов"""
+        return self.scraper.build_query_text(self._build_scraper_params(params))
+
+    async def warm_keyword_cache(self, requests: List[Dict[str, Any]], pause: float = 0,
+                                 should_stop: Callable[[], bool] = lambda: False,
+                                 owner: Optional[JobOwner] = None) -> Dict[str, Any]:
+        """
+        Заполняет кэш ключевых слов пакетом запросов в одной сессии браузера.
+        Пакет занимает один слот очереди браузерных задач.
+
+        Args:
+            requests: Параметры запросов (см. build_request_params)
+            pause: Пауза между запросами (секунды)
+            should_stop: Проверка остановки - вызывается после каждого запроса
+            owner: Владелец задачи в очереди (по умолчанию служебный, без приоритета)
+        """
+        if not self.keyword_cache:
+            return {"status": "error", "message": "Кэш ключевых слов отключен", "stored": 0, "failed": 0}
+
+        stats = {"stored": 0, "failed": 0}
+
+        async def run_batch():
+            await self.scraper.initialize_scraper()
+            batch = self.scraper.scrape_batch(
+                [self._build_scraper_params(params) for params in requests], pause=pause
+            )
+            try:
+                async for item in batch:
+                    if item["status"] == "success":
+                        try:
+                            with timings.span("excel_parse"):
+                                keywords = await asyncio.to_thread(
+                                    self.keywords_processor.extract_keywords_from_excel, item["file"]
+                                )
+                            await self.keyword_cache.set(item["query_text"], keywords, source="prewarm")
+                            stats["stored"] += 1
+                        finally:
+                            await self._cleanup_temp_files(item["file"])
+                    else:
+                        stats["failed"] += 1
+                    if should_stop():
+                        break
+            finally:
+                await batch.aclose()
+
+        with timings.job("warm_keyword_cache", queries=len(requests)):
+            await self.scheduler.run(owner or JobOwner(user_id=0), run_batch)
+
+        self.logger.info(f"🔥 Прогрев кэша: сохранено {stats['stored']}, ошибок {stats['failed']}")
+        return {"status": "success", **stats}
+
+    async def _timed_collect_keywords_data(self, category: str, purpose: Union[str, List[str]],
+                                           additional_params: Optional[List[str]], category_description: Optional[str],
+                                           owner: Optional[JobOwner]) -> Dict[str, Any]:
+        """Сбор данных как одна задача в замерах фаз (см. PipelineTimings)"""
+        with timings.job("collect_keywords", category=category,
+                         user_id=owner.user_id if owner else None) as job:
+            result = await self._collect_keywords_data(category, purpose, additional_params,
+                                                       category_description, owner)
+            job.status = result.get("status")
+            return result
+
+    def _flight_key(self, category: str, purpose: Union[str, List[str]],
+                    additional_params: Optional[List[str]], category_description: Optional[str]) -> str:
+        """Ключ объединения: категория и нормализованный текст запроса к MPStats"""
+        params = self.build_request_params(category, purpose, additional_params, category_description)
+        query_text = KeywordCacheService.normalize_query(self.query_text_for(params))
+        return f"{category}|{query_text}"
+
+    async def _collect_keywords_data(
+            self,
+            category: str,
+            purpose: Union[str, List[str]] = "",
+            additional_params: List[str] = None,
+            category_description: str = None,
+            owner: Optional[JobOwner] = None
     ) -> Dict[str, Any]:
         """
         Полный цикл сбора данных:
@@ -50,6 +262,7 @@ class DataCollectionService:
             purpose: Назначение товара (строка или массив строк)
             additional_params: Дополнительные параметры
             category_description: Описание категории из БД
+            owner: Пользователь для очереди браузерных задач
         """
         try:
             self.logger.info(f"🚀 Начинаю сбор данных для категории: {category}")
@@ -73,56 +286,29 @@ class DataCollectionService:
             self.logger.info(f"🎯 Назначения: {purposes_list}")
 
             # 1. Подготовка параметров
-            params = {
-                "category": category,
-                "category_description": category_description or "",  # <-- ПЕРЕДАЕМ описание!
-                "purposes": purposes_list,  # Передаем как массив
-                "additional_params": additional_params or []
-            }
-
-            # 2. Запуск скрапинга и скачивания Excel
-            self.logger.info("🔍 Запуск скрапинга MPStats...")
-            self.logger.info(f"📤 Параметры для скрапера (с описанием): {params}")
-
-            excel_file = await self._run_scraping_and_download(params)
-
-            if not excel_file:
-                raise Exception("Не удалось скачать файл с MPStats")
+            params = self.build_request_params(category, purposes_list, additional_params, category_description)
 
-            self.logger.info(f"✅ Файл скачан: {excel_file}")
-
-            self.logger.info("🔄 Закрываю Chrome драйвер...")
-            if hasattr(self.scraper, 'driver') and self.scraper.driver:
-                try:
-                    self.scraper.driver.quit()
-                    self.scraper.driver = None
-                    self.logger.info("✅ Chrome драйвер закрыт")
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Не удалось закрыть драйвер: {e}")
+            # 2. Получение ключевых слов (HTTP быстрый путь или браузер)
+            raw_keywords = await self._collect_raw_keywords(params, owner)
 
-            # 3. Обработка Excel в JSON
-            self.logger.info("🔄 Обработка Excel файла...")
-            result = await self._process_excel_file(
-                excel_path=excel_file,
+            # 3. Фильтрация ключевых слов
+            self.logger.info("🔄 Обработка ключевых слов...")
+            result = await self._process_keywords(
+                keywords=raw_keywords,
                 category=category,
                 purposes=purposes_list,
                 additional_params=additional_params or [],
                 category_description=category_description  # <-- Передаем описание
             )
 
-            # 4. Очистка временных файлов
-            await self._cleanup_temp_files(excel_file)
-
             self.logger.info(f"✅ Данные собраны. Ключевых слов: {len(result.get('keywords', []))}")
 
-            return {
-                "status": "success",
-                "category": category,
-                "purposes": purposes_list,
-                "additional_params": additional_params or [],
-                "keywords": result.get("keywords", []),
-                "keywords_preview": result.get("keywords", [])[:15]
-            }
+            collected = self._success_result(category, purposes_list, additional_params, result.get("keywords", []))
+            # Данные из устаревшего кэша: вызывающий может дождаться обновления (wait_for_refresh)
+            refresh_key = self._flight_key(category, purposes_list, additional_params, category_description)
+            if refresh_key in self._refreshes:
+                collected["refresh_key"] = refresh_key
+            return collected
 
         except Exception as e:
             self.logger.error(f"❌ Ошибка сбора данных: {e}", exc_info=True)
@@ -136,6 +322,18 @@ class DataCollectionService:
                 "keywords_preview": []
             }
 
+    @staticmethod
+    def _success_result(category: str, purposes: List[str], additional_params: Optional[List[str]],
+                        keywords: List[str]) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "category": category,
+            "purposes": purposes,
+            "additional_params": additional_params or [],
+            "keywords": keywords,
+            "keywords_preview": keywords[:15]
+        }
+
     def _normalize_purpose(self, purpose: Union[str, List[str], None]) -> List[str]:
         """
         Нормализует purpose в массив строк
@@ -170,49 +368,240 @@ class DataCollectionService:
                 os.remove(excel_file)
                 self.logger.info(f"🗑️ Удален временный Excel файл: {excel_file}")
 
-            # Также можно удалить другие временные файлы, если они есть
-            # Например, проверяем директорию загрузок
-            if os.path.exists(self.downloads_dir):
-                for file in os.listdir(self.downloads_dir):
-                    file_path = os.path.join(self.downloads_dir, file)
-                    if file.endswith('.crdownload') or file.endswith('.tmp'):
-                        try:
-                            os.remove(file_path)
-                            self.logger.info(f"🗑️ Удален временный файл: {file}")
-                        except Exception as e:
-                            self.logger.warning(f"⚠️ Не удалось удалить временный файл {file}: {e}")
+            # Удаляем директорию задачи целиком (вместе с недокачанными файлами).
+            # Общую директорию загрузок не трогаем - там директории других задач
+            job_dir = Path(excel_file).parent
+            if job_dir.name.startswith("job_") and job_dir.parent.resolve() == self.downloads_dir.resolve():
+                shutil.rmtree(job_dir, ignore_errors=True)
+                self.logger.info(f"🗑️ Удалена директория задачи: {job_dir}")
 
         except Exception as e:
             self.logger.warning(f"⚠️ Ошибка при очистке временных файлов: {e}")
             # Не поднимаем исключение, т.к. это не критичная операция
 
-    async def _run_scraping_and_download(self, params: Dict[str, Any]) -> str:
-        """Запуск скрапинга и скачивания Excel файла"""
+    async def _collect_raw_keywords(self, params: Dict[str, Any], owner: Optional[JobOwner] = None) -> List[str]:
+        """
+        Получение всех ключевых слов по параметрам запроса.
+
+        Сначала смотрит в кэш по тексту запроса (запись старше soft TTL
+        отдается сразу и обновляется в фоне), затем пробует HTTP запрос
+        без браузера (если включен), при любом отказе (сессия протухла,
+        эндпоинт изменился, сеть) - Selenium: перехваченный ответ API или
+        таблица на странице, если включены, иначе скачивание Excel.
+        """
+        query_text = self.query_text_for(params)
+
+        if self.keyword_cache and query_text:
+            with timings.span("cache_lookup") as span:
+                cached = await self.keyword_cache.lookup(query_text)
+                span["hit"] = bool(cached and cached["keywords"])
+                span["needs_refresh"] = bool(cached and cached["needs_refresh"])
+            if cached and cached["keywords"]:
+                if cached["needs_refresh"]:
+                    self._schedule_refresh(params, query_text, cached["keywords"])
+                return cached["keywords"]
+
+        keywords, source = await self._scrape_raw_keywords(params, query_text, owner)
+
+        # Просроченные данные не продлеваем - обновятся, когда MPStats снова доступен
+        if self.keyword_cache and query_text and source != "stale_cache":
+            with timings.span("cache_store"):
+                await self.keyword_cache.set(query_text, keywords, source=source)
+
+        return keywords
+
+    def _schedule_refresh(self, params: Dict[str, Any], query_text: str, stale_keywords: List[str]):
+        """Фоновое обновление устаревшей записи кэша (одно на запрос)"""
+        refresh_key = self._flight_key(params["category"], params["purposes"], params["additional_params"],
+                                       params["category_description"])
+        if refresh_key in self._refreshes:
+            return
+        self.logger.info(f"♻️ Данные из кэша устарели, обновляю в фоне: {query_text}")
+        task = asyncio.create_task(self._refresh_keywords(params, query_text, stale_keywords))
+        self._refreshes[refresh_key] = task
+        task.add_done_callback(lambda _: self._refreshes.pop(refresh_key, None))
+        self.refresh_stats["scheduled"] += 1
+
+    async def _refresh_keywords(self, params: Dict[str, Any], query_text: str,
+                                stale_keywords: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Скрапинг запроса заново и запись в кэш. Браузерная часть идет через общую
+        очередь как служебная задача (без приоритета).
+
+        Returns:
+            Результат в формате collect_keywords_data, если ключевые слова изменились
+            не меньше чем на keyword_refresh_min_change, иначе None
+        """
+        try:
+            with timings.job("refresh_keywords", category=params["category"]) as job:
+                keywords, source = await self._scrape_raw_keywords(params, query_text)
+                # Автомат разомкнут - обновлять нечем, запись остается как есть
+                if source == "stale_cache" or not keywords:
+                    job.status = "skipped"
+                    self.refresh_stats["failed"] += 1
+                    return None
+
+                with timings.span("cache_store"):
+                    await self.keyword_cache.set(query_text, keywords, source=source)
+
+                change = self._keywords_change(stale_keywords, keywords)
+                if change < self.config.scraper.keyword_refresh_min_change:
+                    job.status = "unchanged"
+                    self.refresh_stats["unchanged"] += 1
+                    self.logger.info(f"♻️ Кэш обновлен, изменилось {change:.0%} ключевых слов: {query_text}")
+                    return None
+
+                result = await self._process_keywords(
+                    keywords=keywords,
+                    category=params["category"],
+                    purposes=params["purposes"],
+                    additional_params=params["additional_params"],
+                    category_description=params["category_description"] or None
+                )
+                job.status = "changed"
+                self.refresh_stats["changed"] += 1
+                self.logger.info(f"♻️ Кэш обновлен, изменилось {change:.0%} ключевых слов: {query_text}")
+                return self._success_result(params["category"], params["purposes"], params["additional_params"],
+                                            result.get("keywords", []))
+        except Exception as e:
+            self.refresh_stats["failed"] += 1
+            self.logger.warning(f"⚠️ Фоновое обновление ключевых слов не удалось: {e}")
+            return None
+
+    @staticmethod
+    def _keywords_change(old: List[str], new: List[str]) -> float:
+        """Доля различающихся ключевых слов (1 - коэффициент Жаккара)"""
+        old_set, new_set = set(old), set(new)
+        union = old_set | new_set
+        return 1 - len(old_set & new_set) / len(union) if union else 0.0
+
+    async def _scrape_raw_keywords(self, params: Dict[str, Any], query_text: str,
+                                   owner: Optional[JobOwner] = None) -> Tuple[List[str], str]:
+        """
+        Получение ключевых слов с MPStats
+
+        Returns:
+            (ключевые слова, источник: http, selenium_network (перехваченный ответ API),
+            selenium_grid (таблица на странице), selenium или stale_cache - просроченный
+            кэш, пока автомат скрапинга разомкнут)
+        """
+        if self.http_client.enabled and query_text:
+            with timings.span("http_fast_path") as span:
+                fast_result = await self.http_client.fetch_keywords(query_text)
+                span["result"] = fast_result["status"]
+            if fast_result["status"] == "success" and fast_result["keywords"]:
+                return fast_result["keywords"], "http"
+
+        self.logger.info("🔍 Запуск скрапинга MPStats...")
+        self.logger.info(f"📤 Параметры для скрапера (с описанием): {params}")
+
+        # Браузерная часть идет через очередь с общим лимитом
+        try:
+            if self.scrape_breaker and self.scrape_breaker.is_open:
+                raise CircuitOpenError(self.scrape_breaker.name, self.scrape_breaker.retry_after)
+            results = await self.scheduler.run(
+                owner or JobOwner(user_id=0),
+                lambda: self._guarded_scraping_and_download(params)
+            )
+        except CircuitOpenError:
+            stale_keywords = await self.keyword_cache.get_stale(query_text) \
+                if self.keyword_cache and query_text else None
+            if stale_keywords:
+                self.logger.warning("🔌 MPStats недоступен, отдаю просроченные данные из кэша")
+                return stale_keywords, "stale_cache"
+            raise
+
+        if results["source"] in ("network", "grid"):
+            with timings.span("rows_parse", source=results["source"]):
+                words = [row["word"] for row in results["rows"]]
+                keywords = self.keywords_processor.filter_keywords(words, limit=200)
+            self.logger.info(f"✅ Результаты MPStats без файла ({results['source']}): {len(keywords)} ключевых слов")
+            return keywords, f"selenium_{results['source']}"
+
+        excel_file = results["file"]
+        if not excel_file:
+            raise Exception("Не удалось скачать файл с MPStats")
+
+        self.logger.info(f"✅ Файл скачан: {excel_file}")
+
+        try:
+            # Разбор Excel через pandas блокирующий - выполняем вне event loop
+            with timings.span("excel_parse"):
+                keywords = await asyncio.to_thread(self.keywords_processor.extract_keywords_from_excel, excel_file)
+            return keywords, "selenium"
+        finally:
+            with timings.span("cleanup"):
+                await self._cleanup_temp_files(excel_file)
+
+    def _build_scraper_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Для обратной совместимости с MPStatsScraperService
+        преобразуем массив purposes в строку purpose
+        """
+        scraper_params = params.copy()
+
+        # Преобразуем purposes в строку для скрапера
+        if "purposes" in scraper_params:
+            purposes_list = scraper_params["purposes"]
+            if isinstance(purposes_list, list) and purposes_list:
+                # Объединяем в строку для scraper_service
+                scraper_params["purpose"] = ", ".join(purposes_list)
+                self.logger.info(f"🎯 Преобразовано purposes в purpose: {scraper_params['purpose']}")
+            elif purposes_list:
+                scraper_params["purpose"] = str(purposes_list)
+            # Удаляем ключ purposes чтобы не было конфликта
+            del scraper_params["purposes"]
+
+        return scraper_params
+
+    async def _guarded_scraping_and_download(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        _run_scraping_and_download через автомат. Допуск проверяется уже после
+        очереди: пока задача ждала, автомат мог разомкнуться, а после паузы
+        только одна задача становится пробной.
+        """
+        breaker = self.scrape_breaker
+        if not breaker:
+            return await self._run_scraping_and_download(params)
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.name, breaker.retry_after)
+
+        started = time.monotonic()
+        try:
+            results = await self._run_scraping_and_download(params)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure(time.monotonic() - started, timeout=self._is_timeout_error(e))
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return results
+
+    @staticmethod
+    def _is_timeout_error(error: Exception) -> bool:
+        """Таймауты скрапера: исключения Selenium и пула драйверов, сообщения с "Таймаут"."""
+        return isinstance(error, (asyncio.TimeoutError, TimeoutError)) \
+            or "timeout" in type(error).__name__.lower() or "таймаут" in str(error).lower()
+
+    async def _run_scraping_and_download(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Запуск скрапинга и получение результатов
+
+        Returns:
+            Результат MPStatsScraperService.collect_results: строки ответа API
+            или таблицы (source="network"/"grid") или путь к Excel (source="excel")
+        """
+        driver = None
         try:
             # Инициализация скрапера
             await self.scraper.initialize_scraper()
 
-            # Для обратной совместимости с MPStatsScraperService
-            # преобразуем массив purposes в строку
-            scraper_params = params.copy()
+            scraper_params = self._build_scraper_params(params)
 
             # ДЕБАГ: выводим ВСЕ параметры перед передачей
             self.logger.info(f"📤 ПЕРЕДАЧА в скрапер. Все параметры: {scraper_params}")
 
-            # Преобразуем purposes в строку для скрапера
-            if "purposes" in scraper_params:
-                purposes_list = scraper_params["purposes"]
-                if isinstance(purposes_list, list) and purposes_list:
-                    # Объединяем в строку для scraper_service
-                    scraper_params["purpose"] = ", ".join(purposes_list)
-                    self.logger.info(f"🎯 Преобразовано purposes в purpose: {scraper_params['purpose']}")
-                elif purposes_list:
-                    scraper_params["purpose"] = str(purposes_list)
-                # Удаляем ключ purposes чтобы не было конфликта
-                if "purposes" in scraper_params:
-                    del scraper_params["purposes"]
-                    self.logger.info("🗑️ Удален ключ purposes из параметров")
-
             # Проверяем, что category_description есть в параметрах
             if "category_description" in scraper_params:
                 self.logger.info(f"📝 category_description в параметрах: '{scraper_params['category_description']}'")
@@ -231,53 +620,53 @@ class DataCollectionService:
             if not driver:
                 raise Exception("Драйвер не инициализирован")
 
-            # Скачивание данных
-            excel_file = await self.scraper.download_keywords_data(driver, scraper_params)
+            # Чтение таблицы результатов или скачивание данных
+            with timings.span("download"):
+                results = await self.scraper.collect_results(driver, scraper_params)
 
-            return excel_file
+            return results
 
         except Exception as e:
             self.logger.error(f"Ошибка при скачивании файла: {e}")
             raise
 
-    async def _process_excel_file(
+        finally:
+            # Освобождаем драйвер этой задачи (возврат в пул или закрытие)
+            if driver:
+                self.logger.info("🔄 Освобождаю Chrome драйвер...")
+                try:
+                    with timings.span("driver_release"):
+                        await self.scraper.release_driver(driver)
+                    self.logger.info("✅ Chrome драйвер освобожден")
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Не удалось закрыть драйвер: {e}")
+
+    async def _process_keywords(
             self,
-            excel_path: str,
+            keywords: List[str],
             category: str,
             purposes: List[str],
             additional_params: List[str],
             category_description: str = None,
             max_keywords: int = 13
     ) -> Dict[str, Any]:
-        """Обработка Excel файла через KeywordsProcessor с GPT-фильтрацией"""
+        """
+        GPT-фильтрация ключевых слов (с откатом на простую фильтрацию).
+        Работает в памяти - источник слов (HTTP или Excel) не важен.
+        """
         try:
-            self.logger.info(f"📝 Обработка Excel файла...")
-
-            # ===== СОЗДАНИЕ JSON С АВТОУДАЛЕНИЕМ =====
-            # Создаем обогащенный JSON с auto_delete=True
-            json_path = self.keywords_processor.create_enriched_json(
-                excel_path=excel_path,
-                category=category,
-                purpose=", ".join(purposes) if purposes else "",
-                additional_params=additional_params,
-                json_path=str(
-                    self.keywords_dir / f"{category}_{'_'.join(purposes[:2]) if purposes else 'all'}_enriched.json"
-                ),
-                auto_delete=True  # ВКЛЮЧАЕМ АВТОУДАЛЕНИЕ
-            )
-
-            # Загружаем данные из JSON
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Обогащаем данные purposes (массивом)
-            data["purposes"] = purposes
-            data["purpose"] = ", ".join(purposes) if purposes else ""
+            data = {
+                "category": category,
+                "purpose": ", ".join(purposes) if purposes else "",
+                "additional_params": additional_params,
+                "keywords": keywords,
+                "purposes": purposes,
+            }
 
             # Добавляем описание категории в данные
             if category_description:
                 data["category_description"] = category_description
-                self.logger.info(f"✅ Описание категории добавлено в JSON")
+                self.logger.info(f"✅ Описание категории добавлено в данные")
 
             # === GPT-ФИЛЬТРАЦИЯ КЛЮЧЕВЫХ СЛОВ ===
             self.logger.info(f"🤖 Проверяю возможность GPT-фильтрации...")
@@ -295,7 +684,8 @@ class DataCollectionService:
                     filter_processor = JSONKeywordFilter(openai_service, prompt_service)
 
                     # Фильтруем ключевые слова до 10 самых релевантных
-                    filtered_data = await filter_processor.filter_keywords_gpt(data, max_keywords)
+                    with timings.span("gpt_filter", keywords=len(data["keywords"])):
+                        filtered_data = await filter_processor.filter_keywords_gpt(data, max_keywords)
 
                     # Сохраняем результат
                     data = filtered_data
@@ -308,27 +698,30 @@ class DataCollectionService:
                 self.logger.warning("⚠️ Сервисы не доступны, использую простую фильтрацию")
                 data = self._simple_keyword_filter(data, max_keywords)
 
-            # Сохраняем обновленные данные
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            self.logger.info(f"✅ Финальный JSON сохранен: {json_path}")
-
-            # ===== ЯВНОЕ УДАЛЕНИЕ JSON ПОСЛЕ ИСПОЛЬЗОВАНИЯ =====
-            try:
-                if os.path.exists(json_path):
-                    # Пытаемся удалить через менеджер
-                    temp_manager.delete_file(json_path)
-                    self.logger.info(f"🗑️ JSON файл удален после использования: {json_path}")
-            except Exception as e:
-                self.logger.warning(f"⚠️ Не удалось удалить JSON файл {json_path}: {e}")
-
             return data
 
         except Exception as e:
-            self.logger.error(f"Ошибка обработки Excel файла: {e}")
+            self.logger.error(f"Ошибка обработки ключевых слов: {e}")
             raise
 
+    def get_runtime_stats(self) -> Dict[str, Any]:
+        """Счетчики кэша, быстрого пути и объединения запросов"""
+        return {
+            "scheduler": self.scheduler.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "keyword_cache": self.keyword_cache.get_stats() if self.keyword_cache else None,
+            "http_fast_path": self.http_client.get_stats(),
+            "scrape_breaker": self.scrape_breaker.get_stats() if self.scrape_breaker else None,
+            "refresh": {**self.refresh_stats, "running": len(self._refreshes)},
+        }
+
+    async def close(self):
+        """Отменяет фоновые обновления кэша"""
+        tasks = list(self._refreshes.values()) + list(self._refresh_followers)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     def _get_openai_service(self):
         """Получение сервиса OpenAI"""
         # Пробуем получить из self.services
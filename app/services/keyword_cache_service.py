@@ -0,0 +1,188 @@
+# app/services/keyword_cache_service.py
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from app.database.repositories.keyword_cache_repo import KeywordCacheRepository
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordCacheService:
+    """
+    Кэш результатов скрапинга MPStats по нормализованному тексту запроса.
+
+    Два уровня: небольшой LRU в памяти и таблица keyword_cache в PostgreSQL,
+    которая переживает перезапуск бота. Ошибки БД не ломают сбор данных -
+    кэш просто считается промахом.
+    """
+
+    def __init__(self, ttl: float = 86400, max_entries: int = 1000, memory_entries: int = 128,
+                 stale_ttl: float = 0, soft_ttl: float = 0, repository: Optional[KeywordCacheRepository] = None):
+        """
+        Args:
+            ttl: Время жизни записи (секунды) - после него запись не отдается
+            max_entries: Максимум записей в БД (лишние вытесняются по давности использования)
+            memory_entries: Максимум записей в памяти
+            stale_ttl: Сколько просроченная запись еще хранится для get_stale (секунды)
+            soft_ttl: Возраст записи, после которого она отдается, но требует обновления
+                (секунды, 0 - не требует до ttl)
+            repository: Хранилище записей
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.soft_ttl = soft_ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.repository = repository or KeywordCacheRepository()
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "memory_hits": 0, "misses": 0, "stale_hits": 0, "soft_stale_hits": 0,
+                      "stores": 0, "evicted": 0, "errors": 0}
+
+    @staticmethod
+    def normalize_query(query_text: str) -> str:
+        """Нормализация текста запроса: регистр и пробелы не влияют на ключ"""
+        return re.sub(r"\s+", " ", query_text or "").strip().lower()
+
+    @classmethod
+    def make_key(cls, query_text: str) -> str:
+        return hashlib.sha256(cls.normalize_query(query_text).encode("utf-8")).hexdigest()
+
+    async def get(self, query_text: str) -> Optional[List[str]]:
+        """
+        Ключевые слова из кэша или None при промахе
+        """
+        entry = await self.lookup(query_text)
+        return entry["keywords"] if entry else None
+
+    async def lookup(self, query_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Запись кэша с возрастом или None при промахе
+
+        Returns:
+            {"keywords", "age" (секунды с сохранения), "needs_refresh" (старше soft_ttl)}
+        """
+        key = self.make_key(query_text)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry["expires_at"] > time.time():
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                logger.info(f"💾 Кэш ключевых слов (память): {len(entry['keywords'])} слов")
+                return self._entry(entry["keywords"], entry["expires_at"])
+            if entry:
+                del self._memory[key]
+
+        try:
+            stored = await asyncio.to_thread(self.repository.get_fresh, key)
+        except Exception as e:
+            logger.warning(f"⚠️ Кэш ключевых слов недоступен: {e}")
+            stored = None
+            self.stats["errors"] += 1
+
+        if not stored:
+            self.stats["misses"] += 1
+            return None
+
+        expires_at = stored["expires_at"].timestamp()
+        self._remember(key, stored["keywords"], expires_at)
+        self.stats["hits"] += 1
+        logger.info(f"💾 Кэш ключевых слов (БД): {len(stored['keywords'])} слов, "
+                    f"попаданий {stored['hits']}")
+        return self._entry(stored["keywords"], expires_at)
+
+    def _entry(self, keywords: List[str], expires_at: float) -> Dict[str, Any]:
+        # Время сохранения не хранится отдельно: запись живет ttl с момента сохранения
+        age = max(0.0, self.ttl - (expires_at - time.time()))
+        needs_refresh = 0 < self.soft_ttl < self.ttl and age >= self.soft_ttl
+        if needs_refresh:
+            self.stats["soft_stale_hits"] += 1
+        return {"keywords": list(keywords), "age": age, "needs_refresh": needs_refresh}
+
+    async def get_stale(self, query_text: str) -> Optional[List[str]]:
+        """
+        Ключевые слова из кэша, даже просроченные (не больше чем на stale_ttl).
+        Для случаев, когда свежие данные получить нельзя (MPStats недоступен).
+        """
+        try:
+            stored = await asyncio.to_thread(self.repository.get_stale, self.make_key(query_text), self.stale_ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Кэш ключевых слов недоступен: {e}")
+            self.stats["errors"] += 1
+            return None
+
+        if not stored:
+            return None
+        self.stats["stale_hits"] += 1
+        logger.info(f"💾 Кэш ключевых слов (просроченный): {len(stored['keywords'])} слов, "
+                    f"срок до {stored['expires_at'].isoformat(timespec='minutes')}")
+        return list(stored["keywords"])
+
+    async def set(self, query_text: str, keywords: List[str], source: str):
+        """Сохраняет результат скрапинга"""
+        if not keywords:
+            return
+
+        key = self.make_key(query_text)
+        self._remember(key, keywords, time.time() + self.ttl)
+
+        try:
+            await asyncio.to_thread(
+                self.repository.put, key, self.normalize_query(query_text), keywords, source, self.ttl
+            )
+            self.stats["stores"] += 1
+            self.stats["evicted"] += await asyncio.to_thread(self.repository.evict, self.max_entries, self.stale_ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить ключевые слова в кэш: {e}")
+            self.stats["errors"] += 1
+
+    async def remaining_ttls(self, query_texts: List[str]) -> Dict[str, float]:
+        """
+        Сколько секунд осталось жить записям (0 - записи нет или она просрочена).
+        Попадания не учитываются - метод для планирования прогрева.
+        """
+        keys = {query_text: self.make_key(query_text) for query_text in query_texts}
+        try:
+            expirations = await asyncio.to_thread(self.repository.get_expirations, list(set(keys.values())))
+        except Exception as e:
+            logger.warning(f"⚠️ Кэш ключевых слов недоступен: {e}")
+            self.stats["errors"] += 1
+            expirations = {}
+
+        now = time.time()
+        return {
+            query_text: max(0.0, expirations[key].timestamp() - now) if key in expirations else 0.0
+            for query_text, key in keys.items()
+        }
+
+    def _remember(self, key: str, keywords: List[str], expires_at: float):
+        with self._lock:
+            self._memory[key] = {"keywords": list(keywords), "expires_at": expires_at}
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    async def clear(self) -> int:
+        """Очищает кэш в памяти и в БД"""
+        with self._lock:
+            self._memory.clear()
+        return await asyncio.to_thread(self.repository.clear)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory_size = len(self._memory)
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_size": memory_size,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
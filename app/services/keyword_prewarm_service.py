@@ -0,0 +1,224 @@
+# app/services/keyword_prewarm_service.py
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.data_collection_service import DataCollectionService
+from app.services.scrape_job_scheduler import JobOwner
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordPrewarmService:
+    """
+    Ночной прогрев кэша ключевых слов.
+
+    В тихие часы перебирает назначения категорий (Category.purposes) и
+    комбинации, которые пользователи запрашивали (content_snapshots),
+    сортирует их по частоте и скрапит те, которых нет в кэше или которые
+    скоро истекут. Днем "Собрать данные" по таким запросам - попадание в кэш.
+
+    Ограничения: максимум запросов за ночь, пакеты в одной сессии браузера,
+    пауза между запросами. Выключатель - stop() (например, командой /prewarm off):
+    текущий пакет останавливается после запроса в работе.
+    """
+
+    def __init__(self, config, data_collection: DataCollectionService, category_repo, snapshot_repo):
+        self.config = config.scraper
+        self.data_collection = data_collection
+        self.category_repo = category_repo
+        self.snapshot_repo = snapshot_repo
+
+        self.quiet_hours = self._parse_quiet_hours(self.config.prewarm_quiet_hours)
+        self.enabled = self.config.prewarm_enabled
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._abort = False
+        self._last_run_date = None
+        self.stats = {"runs": 0, "planned": 0, "stored": 0, "failed": 0, "skipped_fresh": 0}
+
+    @staticmethod
+    def _parse_quiet_hours(value: str) -> Tuple[int, int]:
+        """'2-6' -> (2, 6); интервал может переходить через полночь ('23-5')"""
+        try:
+            start, end = (int(part) % 24 for part in value.split("-", 1))
+            return start, end
+        except ValueError:
+            logger.warning(f"⚠️ Некорректные тихие часы '{value}', использую 2-6")
+            return 2, 6
+
+    def in_quiet_hours(self, now: Optional[datetime] = None) -> bool:
+        hour = (now or datetime.now()).hour
+        start, end = self.quiet_hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def _night_key(self, now: Optional[datetime] = None):
+        """Дата начала тихих часов (окно может переходить через полночь)"""
+        now = now or datetime.now()
+        start, end = self.quiet_hours
+        if start > end and now.hour < end:
+            return (now - timedelta(days=1)).date()
+        return now.date()
+
+    # ---------- Жизненный цикл ----------
+
+    def start(self):
+        """Запускает фоновую проверку тихих часов"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+        state = "включен" if self.enabled else "выключен"
+        logger.info(f"🔥 Прогрев кэша {state}, тихие часы {self.quiet_hours[0]}-{self.quiet_hours[1]}")
+
+    async def shutdown(self):
+        self.enabled = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def resume(self):
+        """Включает прогрев по расписанию (после stop или PREWARM_ENABLED=false)"""
+        self.enabled = True
+
+    def stop(self):
+        """Выключатель: новые прогоны не начинаются, текущий пакет останавливается"""
+        self.enabled = False
+        self._abort = True
+        logger.warning("⏹️ Прогрев кэша выключен")
+
+    def _should_stop(self) -> bool:
+        return self._abort or not self.enabled or not self.in_quiet_hours()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.config.prewarm_check_interval)
+            night = self._night_key()
+            # Один прогон за ночь: повторно в те же тихие часы не запускаемся
+            if self.enabled and self.in_quiet_hours() and self._last_run_date != night:
+                self._last_run_date = night
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    logger.error(f"❌ Ошибка прогрева кэша: {e}", exc_info=True)
+
+    # ---------- Прогон ----------
+
+    async def run_once(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Один прогон прогрева
+
+        Args:
+            force: Игнорировать тихие часы (ручной запуск администратором)
+        """
+        if self._running:
+            return {"status": "error", "message": "Прогрев уже выполняется"}
+        if not self.data_collection.keyword_cache:
+            return {"status": "error", "message": "Кэш ключевых слов отключен"}
+
+        self._running = True
+        self._abort = False
+        self.stats["runs"] += 1
+        stored = failed = 0
+        try:
+            plan = await self.build_plan()
+            pending = await self._filter_fresh(plan)
+            pending = pending[:self.config.prewarm_max_queries]
+            self.stats["planned"] += len(pending)
+            logger.info(f"🔥 Прогрев кэша: в плане {len(plan)}, к скрапингу {len(pending)}")
+
+            should_stop = (lambda: self._abort) if force else self._should_stop
+            batch_size = max(1, self.config.prewarm_batch_size)
+            for offset in range(0, len(pending), batch_size):
+                if should_stop():
+                    logger.info("⏹️ Прогрев остановлен (выключен или закончились тихие часы)")
+                    break
+                result = await self.data_collection.warm_keyword_cache(
+                    [item["params"] for item in pending[offset:offset + batch_size]],
+                    pause=self.config.prewarm_query_pause,
+                    should_stop=should_stop,
+                    owner=JobOwner(user_id=0)
+                )
+                stored += result.get("stored", 0)
+                failed += result.get("failed", 0)
+        finally:
+            self._running = False
+            self.stats["stored"] += stored
+            self.stats["failed"] += failed
+
+        return {"status": "success", "planned": len(pending), "stored": stored, "failed": failed}
+
+    async def build_plan(self) -> List[Dict[str, Any]]:
+        """
+        Комбинации категория + назначения, отсортированные по частоте запросов.
+        Каждое назначение категории попадает в план, даже если его еще не запрашивали.
+        """
+        since = datetime.now() - timedelta(days=self.config.prewarm_history_days)
+        categories = await asyncio.to_thread(self.category_repo.get_all)
+        requested = await asyncio.to_thread(self.snapshot_repo.get_request_combinations, since)
+
+        descriptions = {c.name: c.description or c.hidden_description or "" for c in categories}
+        frequency: Counter = Counter()
+        combos: Dict[Tuple, Dict[str, Any]] = {}
+
+        def add(category_name: str, purposes: List[str], additional_params: List[str], hits: int):
+            key = (category_name, tuple(purposes), tuple(additional_params))
+            frequency[key] += hits
+            combos.setdefault(key, {
+                "category": category_name,
+                "purposes": list(purposes),
+                "additional_params": list(additional_params),
+            })
+
+        for category in categories:
+            purposes = category.purposes if isinstance(category.purposes, dict) else {}
+            for purpose_id in purposes:
+                add(category.name, DataCollectionService.translate_purposes([purpose_id]), [], 0)
+
+        for combo in requested:
+            if combo["category_name"] in descriptions:
+                add(combo["category_name"], combo["purposes"], combo["additional_params"], 1)
+
+        plan = []
+        for key, hits in sorted(frequency.items(), key=lambda item: (-item[1], item[0])):
+            combo = combos[key]
+            params = self.data_collection.build_request_params(
+                combo["category"], combo["purposes"], combo["additional_params"], descriptions[combo["category"]]
+            )
+            plan.append({"params": params, "hits": hits, "query_text": self.data_collection.query_text_for(params)})
+        return plan
+
+    async def _filter_fresh(self, plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Убирает запросы, которые проживут в кэше еще больше половины TTL"""
+        remaining = await self.data_collection.keyword_cache.remaining_ttls(
+            [item["query_text"] for item in plan if item["query_text"]]
+        )
+        threshold = self.data_collection.keyword_cache.ttl / 2
+        pending = []
+        seen = set()
+        for item in plan:
+            query_text = item["query_text"]
+            if not query_text or query_text in seen:
+                continue
+            seen.add(query_text)
+            if remaining.get(query_text, 0) > threshold:
+                self.stats["skipped_fresh"] += 1
+                continue
+            pending.append(item)
+        return pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "running": self._running,
+            "quiet_hours": f"{self.quiet_hours[0]}-{self.quiet_hours[1]}",
+            "last_run_date": self._last_run_date.isoformat() if self._last_run_date else None,
+        }
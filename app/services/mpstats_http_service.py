@@ -0,0 +1,209 @@
+# app/services/mpstats_http_service.py
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from app.utils.keywords_processor import KeywordsProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class MPStatsHttpKeywordsClient:
+    """
+    Быстрый путь сбора ключевых слов без браузера.
+
+    Использует куки авторизованной сессии Chrome (chrome_profile/cookies.json,
+    их сохраняет MPStatsScraperService после логина) и запрашивает тот же
+    эндпоинт, который дергает страница при нажатии "Найти запросы".
+    Если сессия протухла или эндпоинт изменился - возвращает статус,
+    по которому вызывающий код откатывается на Selenium.
+    """
+
+    # Ключи, под которыми API может вернуть список строк
+    LIST_KEYS = ("data", "items", "rows", "result", "words", "keywords")
+    # Ключи строки, в которых лежит сам запрос
+    WORD_KEYS = ("word", "keyword", "query", "name", "text", "Слова")
+    # Ключи строки с частотой запроса
+    FREQUENCY_KEYS = ("frequency", "freq", "count", "wb_count", "Частота")
+
+    XLSX_CONTENT_TYPES = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "application/octet-stream",
+    )
+
+    def __init__(self, config, cookies_path: str, keywords_processor: Optional[KeywordsProcessor] = None):
+        self.config = config
+        self.cookies_path = cookies_path
+        self.api_url = config.scraper.keywords_api_url
+        self.method = config.scraper.keywords_api_method.upper()
+        self.query_param = config.scraper.keywords_api_query_param
+        self.timeout = config.api.mpstats_timeout
+        self.download_dir = Path(config.paths.mpstats_downloads_dir)
+        self.keywords_processor = keywords_processor or KeywordsProcessor(target_column="Слова")
+
+        # Счетчики исходов быстрого пути
+        self.stats = {"success": 0, "session_invalid": 0, "endpoint_changed": 0, "error": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.scraper.http_fast_path_enabled and self.api_url)
+
+    def _load_cookies(self) -> Dict[str, str]:
+        """Загружает непросроченные куки сайта (site_url), сохраненные Selenium"""
+        if not os.path.exists(self.cookies_path):
+            return {}
+        try:
+            with open(self.cookies_path, 'r') as f:
+                raw_cookies = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Не удалось прочитать куки {self.cookies_path}: {e}")
+            return {}
+
+        now = time.time()
+        site_host = (urlparse(self.config.scraper.site_url).hostname or "").lower()
+        cookies = {}
+        for cookie in raw_cookies:
+            expiry = cookie.get("expiry")
+            if expiry and expiry <= now:
+                continue
+            # Без домена кука относится к сайту, с которого ее сохранили
+            domain = cookie.get("domain", site_host).lstrip(".").lower()
+            if not (site_host == domain or site_host.endswith("." + domain) or domain.endswith("." + site_host)):
+                continue
+            cookies[cookie["name"]] = cookie["value"]
+        return cookies
+
+    async def fetch_keywords(self, query_text: str) -> Dict[str, Any]:
+        """
+        Запрашивает ключевые слова по тексту запроса.
+
+        Returns:
+            Dict со статусом:
+            - success: keywords - список слов
+            - session_invalid: нужен логин через браузер
+            - endpoint_changed: ответ не похож на ожидаемый
+            - error: сетевая ошибка
+        """
+        result = await self._fetch(query_text)
+        self.stats[result["status"]] = self.stats.get(result["status"], 0) + 1
+        if result["status"] == "success":
+            logger.info(f"⚡ HTTP быстрый путь: {len(result['keywords'])} ключевых слов")
+        else:
+            logger.info(f"↩️ HTTP быстрый путь недоступен ({result['status']}): {result.get('message')}")
+        return result
+
+    async def _fetch(self, query_text: str) -> Dict[str, Any]:
+        cookies = self._load_cookies()
+        if not cookies:
+            return {"status": "session_invalid", "message": "Нет сохраненных кук сессии"}
+
+        headers = {
+            "Accept": "application/json, application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "X-Requested-With": "XMLHttpRequest",
+            "Referer": f"{self.config.scraper.site_url}/",
+        }
+        if self.method == "GET":
+            request_kwargs = {"params": {self.query_param: query_text}}
+        else:
+            request_kwargs = {"json": {self.query_param: query_text}}
+
+        try:
+            async with aiohttp.ClientSession(
+                    cookies=cookies,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as session:
+                async with session.request(self.method, self.api_url, allow_redirects=False,
+                                           **request_kwargs) as response:
+                    return await self._parse_response(response)
+        except (aiohttp.ClientError, TimeoutError) as e:
+            return {"status": "error", "message": str(e) or type(e).__name__}
+
+    async def _parse_response(self, response: aiohttp.ClientResponse) -> Dict[str, Any]:
+        location = response.headers.get("Location", "")
+        if response.status in (401, 403) or (300 <= response.status < 400 and "login" in location):
+            return {"status": "session_invalid", "message": f"HTTP {response.status}"}
+        if response.status in (404, 405, 410) or response.status >= 300:
+            return {"status": "endpoint_changed", "message": f"HTTP {response.status}"}
+
+        content_type = response.content_type or ""
+        if content_type in self.XLSX_CONTENT_TYPES:
+            return await self._parse_xlsx(await response.read())
+        if content_type == "text/html":
+            # Вместо данных отдали страницу (обычно форму логина)
+            return {"status": "session_invalid", "message": "Получен HTML вместо данных"}
+
+        try:
+            payload = await response.json(content_type=None)
+        except ValueError:
+            return {"status": "endpoint_changed", "message": f"Не JSON ответ ({content_type})"}
+
+        rows = self.extract_keyword_rows(payload)
+        if rows is None:
+            return {"status": "endpoint_changed", "message": "Неизвестная структура JSON"}
+
+        words = [row["word"] for row in rows]
+        return {"status": "success", "keywords": self.keywords_processor.filter_keywords(words, limit=200)}
+
+    @classmethod
+    def extract_keyword_rows(cls, payload: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        Строки запросов из JSON ответа API (того же, что получает страница)
+
+        Returns:
+            [{"word", "frequency"}] или None, если список строк не найден
+        """
+        rows = cls._extract_rows(payload)
+        if rows is None:
+            return None
+
+        result = []
+        for row in rows:
+            if isinstance(row, str):
+                result.append({"word": row, "frequency": None})
+            elif isinstance(row, dict):
+                word = next((row[key] for key in cls.WORD_KEYS if row.get(key)), None)
+                if word:
+                    frequency = next((row[key] for key in cls.FREQUENCY_KEYS if row.get(key) is not None), None)
+                    result.append({"word": word, "frequency": frequency})
+        return result
+
+    @classmethod
+    def _extract_rows(cls, payload: Any) -> Optional[List[Any]]:
+        """Находит список строк в ответе API"""
+        if isinstance(payload, list):
+            return payload
+        if isinstance(payload, dict):
+            for key in cls.LIST_KEYS:
+                value = payload.get(key)
+                if isinstance(value, list):
+                    return value
+                if isinstance(value, dict):
+                    nested = cls._extract_rows(value)
+                    if nested is not None:
+                        return nested
+        return None
+
+    async def _parse_xlsx(self, content: bytes) -> Dict[str, Any]:
+        """Эндпоинт отдал сразу Excel - разбираем его так же, как скачанный браузером"""
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        excel_path = self.download_dir / f"http_{uuid.uuid4().hex[:12]}.xlsx"
+        try:
+            excel_path.write_bytes(content)
+            keywords = await asyncio.to_thread(self.keywords_processor.extract_keywords_from_excel, str(excel_path))
+        except Exception as e:
+            return {"status": "endpoint_changed", "message": f"Не удалось разобрать Excel: {e}"}
+        finally:
+            excel_path.unlink(missing_ok=True)
+        return {"status": "success", "keywords": keywords}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.stats}
@@ -5,8 +5,14 @@ import random
 import time
 import re
 import os
+import shutil
+import threading
+import uuid
+import weakref
+from collections import Counter
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver import Keys, ActionChains
 from selenium.webdriver.common.by import By
@@ -16,10 +22,36 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from app.config.mpstats_ui_config import MPSTATS_UI_CONFIG
 from app.config.config import config, SeleniumConfig
 
+from app.services.scraper_executor import ScraperExecutor
+from app.services.mpstats_http_service import MPStatsHttpKeywordsClient
 from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+from app.utils.selenium_tools.driver_pool import ChromeDriverPool, DriverPoolTimeout
+from app.utils.selenium_tools.tab_pool import TabPool, TabDriver
+from app.utils.selenium_tools.readiness import PageReadiness
+from app.utils.selenium_tools.download_tracker import CDPDownloadTracker
+from app.utils.selenium_tools.download_watcher import DownloadWatcher
+from app.utils.selenium_tools.grid_reader import ResultsGridReader
+from app.utils.selenium_tools.network_capture import NetworkCapture
+from app.utils.selenium_tools.network_profile import NetworkProfile
+from app.utils.selenium_tools.session_probe import SessionProbe
+from app.utils.selenium_tools.memory_sampler import DriverMemorySampler
+from app.utils.selenium_tools.profile_template import ProfileTemplateManager
+from app.utils.selenium_tools.selector_engine import SelectorEngine
+from app.utils.job_timing import timings
 
 logger = logging.getLogger(__name__)
 
+# Настройки selenium-stealth для всех драйверов и вкладок скрапера
+STEALTH_OPTIONS = {
+    "languages": ["ru-RU", "ru", "en-US", "en"],
+    "vendor": "Google Inc.",
+    "platform": "Win32",
+    "webgl_vendor": "Intel Inc.",
+    "renderer": "Intel Iris OpenGL Engine",
+    "fix_hairline": True,
+    "run_on_insecure_origins": False,
+}
+
 
 class MPStatsScraperService:
     """Сервис для скрапинга MPStats с использованием stealth режима"""
@@ -27,7 +59,7 @@ class MPStatsScraperService:
     def __init__(self, config):
         self.config = config
         self.driver_manager = ChromeDriverManager
-        self.download_dir = Path("downloads/mpstats")
+        self.download_dir = Path(config.paths.mpstats_downloads_dir)
         self.logger = logger
         self.email_config = MPSTATS_UI_CONFIG["login"]["email_field"]
         self.password_config = MPSTATS_UI_CONFIG["login"]["password_field"]
@@ -36,8 +68,105 @@ class MPStatsScraperService:
         self.textarea_config = MPSTATS_UI_CONFIG["forms"]["textarea"]
         self.find_queries_btn_config = MPSTATS_UI_CONFIG["forms"]["find_queries_btn"]
         self.downloads_config = MPSTATS_UI_CONFIG["download"]["download_btn"]
-        self.driver = None
-        self.profile_dir = None  # ДОБАВЛЕНО: для хранения пути к профилю
+        self.driver = None  # Последний созданный драйвер (для обратной совместимости)
+        # Адреса страниц MPStats (сайт можно подменить локальной копией для бенчмарков)
+        self.keywords_url = f"{config.scraper.site_url}/seo/keywords/expanding"
+        self.login_url = f"{config.scraper.site_url}/login"
+        self.profile_dir = self._default_profile_dir()  # ДОБАВЛЕНО: для хранения пути к профилю
+
+        # Вся блокирующая работа Selenium выполняется в отдельном пуле потоков
+        self.executor = ScraperExecutor(max_workers=config.scraper.executor_workers)
+        self._active_drivers = set()
+
+        # Ожидания по реальным сигналам страницы вместо фиксированных пауз
+        self.readiness = PageReadiness(
+            poll_interval=config.scraper.readiness_poll_interval,
+            network_idle_ms=config.scraper.network_idle_ms
+        )
+
+        # Поиск элементов MPSTATS_UI_CONFIG: явные потолки, запасные локаторы, статистика промахов
+        self.selectors = SelectorEngine(
+            MPSTATS_UI_CONFIG,
+            default_timeout=config.scraper.selector_timeout,
+            poll_interval=config.scraper.readiness_poll_interval
+        )
+
+        # Результаты прямо из таблицы на странице (без скачивания и разбора Excel)
+        self.grid_reader = ResultsGridReader() if config.scraper.grid_extraction_enabled else None
+        # Захват JSON ответа API страницы (по драйверу задачи, от формы до чтения результатов)
+        self._captures: Dict[int, NetworkCapture] = {}
+        self._capture_lock = threading.Lock()
+        self._capture_outcomes = Counter()
+
+        # Блокировка лишних запросов страницы (трекеры, картинки, шрифты)
+        self.network_profile = NetworkProfile(
+            name=config.scraper.network_profile,
+            allowed_hosts=config.scraper.network_allowed_hosts
+        )
+
+        # Быстрая проверка сессии вместо навигации с паузой
+        self.session_probe = None
+        if config.scraper.login_probe_enabled:
+            self.session_probe = SessionProbe(
+                probe_url=config.scraper.login_probe_url or self.keywords_url,
+                cookie_domain=urlparse(config.scraper.site_url).hostname or "",
+                auth_cookie_names=config.scraper.login_probe_cookie_names,
+                timeout=config.scraper.login_probe_timeout
+            )
+        # Драйверы, у которых открыта нетронутая страница запросов (после логина)
+        self._fresh_page_drivers = weakref.WeakSet()
+
+        # Пиковая память Chrome за задачу (для подбора размера пула)
+        self.memory_sampler = DriverMemorySampler(interval=config.scraper.memory_sample_interval)
+
+        # Каждый драйвер работает в своей копии эталонного профиля (self.profile_dir):
+        # Chrome блокирует профиль, а копия позволяет запускать браузеры параллельно
+        self.profile_templates = None
+        self._driver_clones: Dict[int, str] = {}
+        self._clones_to_promote = set()
+        if config.scraper.profile_cloning_enabled:
+            self.profile_templates = ProfileTemplateManager(
+                template_dir=self.profile_dir,
+                clones_dir=config.scraper.profile_clones_dir or os.path.join(config.paths.data_dir, "profile_clones"),
+                stale_after=config.scraper.profile_clone_stale_minutes * 60
+            )
+            self.profile_templates.cleanup_stale()
+
+        # Вкладки одного авторизованного Chrome: запросы параллельно без браузера на каждый
+        self.tab_pool = None
+        if config.scraper.tab_workers > 0:
+            self.tab_pool = TabPool(
+                factory=self._create_pooled_driver,
+                downloads_dir=os.path.join(config.paths.mpstats_downloads_dir, "tabs"),
+                tabs=config.scraper.tab_workers,
+                tab_setup=self._setup_tab,
+                health_check=self._is_session_valid,
+                max_uses=config.scraper.tab_browser_max_uses,
+                max_memory_mb=config.scraper.tab_browser_max_memory_mb,
+                on_close=self._release_profile_clone
+            )
+
+        # Пул прогретых авторизованных драйверов (опционально, вкладки его заменяют)
+        self.driver_pool = None
+        if config.scraper.driver_pool_enabled and not self.tab_pool:
+            self.driver_pool = ChromeDriverPool(
+                factory=self._create_pooled_driver,
+                size=config.scraper.driver_pool_size,
+                health_check=self._is_session_valid,
+                max_uses=config.scraper.driver_pool_max_uses,
+                max_memory_mb=config.scraper.driver_pool_max_memory_mb,
+                on_close=self._release_profile_clone
+            )
+
+        # Аренда вкладки или драйвера из пула ждется в event loop, а не в потоке пула: задача держит
+        # драйвер между несколькими вызовами executor.run, и ожидающие в потоках заняли бы
+        # потоки, без которых арендаторы не доходят до release_driver
+        self._lease_slots: Optional[asyncio.Semaphore] = None
+        self._leased_drivers = set()
+        if self.tab_pool:
+            self._lease_slots = asyncio.Semaphore(config.scraper.tab_workers)
+        elif self.driver_pool:
+            self._lease_slots = asyncio.Semaphore(config.scraper.driver_pool_size)
 
         self.by_mapping = {
             "NAME": By.NAME,
@@ -56,14 +185,70 @@ class MPStatsScraperService:
         self.download_dir.mkdir(parents=True, exist_ok=True)
 
         # ДОБАВЛЕНО: Определяем путь к профилю
+        self.profile_dir = self._default_profile_dir()
+        logger.info(f"📁 Путь к профилю Chrome: {self.profile_dir}")
+
+    @staticmethod
+    def _default_profile_dir() -> str:
+        """Путь к основному профилю Chrome"""
         import app
         app_dir = os.path.dirname(os.path.dirname(app.__file__))
-        self.profile_dir = os.path.join(app_dir, 'chrome_profile')
-        logger.info(f"📁 Путь к профилю Chrome: {self.profile_dir}")
+        return os.path.join(app_dir, 'chrome_profile')
+
+    def start_driver_pool(self):
+        """Прогревает пул драйверов или вкладок в фоне (если включен)"""
+        if self.tab_pool:
+            self.tab_pool.warm_up(background=True)
+        if self.driver_pool:
+            self.driver_pool.warm_up(background=True)
+
+    def _create_pooled_driver(self, slot: int) -> webdriver.Chrome:
+        """
+        Создает драйвер для пула и сразу авторизует его.
+        Chrome блокирует директорию профиля, поэтому у каждого слота свой профиль:
+        копия эталона (ее удалит очистка после закрытия драйвера пулом)
+        или постоянный профиль слота, если копирование выключено.
+        """
+        profile_dir = None
+        if not self.profile_templates:
+            profile_dir = self.profile_dir if slot == 0 else f"{self.profile_dir}_{slot}"
+        driver = self._setup_driver(profile_dir=profile_dir, track=False)
+        try:
+            self._login_to_mpstats(driver)
+        except Exception:
+            driver.quit()
+            self._release_profile_clone(driver)
+            raise
+        return driver
+
+    def _is_session_valid(self, driver) -> bool:
+        """Проверка сессии драйвера из пула: не выкинуло ли на страницу логина"""
+        return not driver.current_url.startswith(self.login_url)
+
+    def _setup_tab(self, tab: TabDriver):
+        """Настройка новой вкладки браузера вкладок (как _setup_driver для первой)"""
+        driver_manager = ChromeDriverManager(
+            headless=SeleniumConfig.headless,
+            use_stealth=SeleniumConfig.stealth_mode,
+            memory_profile=self.config.scraper.memory_profile,
+            js_heap_mb=self.config.scraper.js_heap_mb
+        )
+        driver_manager.network_profile = self.network_profile
+        driver_manager.prepare_tab(tab, STEALTH_OPTIONS)
+        self.readiness.install_network_tracker(tab)
+
+    def _acquire_driver(self) -> webdriver.Chrome:
+        """Берет вкладку или драйвер из пула или создает новый драйвер"""
+        if self.tab_pool:
+            return self.tab_pool.acquire(timeout=self.config.scraper.driver_pool_acquire_timeout)
+        if self.driver_pool:
+            return self.driver_pool.acquire(timeout=self.config.scraper.driver_pool_acquire_timeout)
+        return self._setup_driver()
 
     async def scrape_categories(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Основной метод скрапинга: авторизация и заполнение формы
+        Основной метод скрапинга: авторизация и заполнение формы.
+        Выполняется в пуле потоков скрапера, event loop не блокируется.
 
         Args:
             params: Параметры запроса от пользователя
@@ -71,6 +256,48 @@ class MPStatsScraperService:
         Returns:
             Dict с результатом выполнения
         """
+        await self._acquire_lease_slot()
+        job = asyncio.ensure_future(self.executor.run(self._scrape_categories_sync, params))
+        try:
+            result = await asyncio.shield(job)
+        except asyncio.CancelledError:
+            # Поток дорабатывает сам - драйвер, который он вернет, освобождаем после
+            job.add_done_callback(self._release_abandoned_lease)
+            raise
+        except BaseException:
+            self._release_lease_slot()
+            raise
+        if result.get("driver"):
+            self._leased_drivers.add(id(result["driver"]))
+        else:
+            self._release_lease_slot()
+        return result
+
+    async def _acquire_lease_slot(self):
+        """Ждет свободную вкладку или драйвер пула (без пула - сразу)"""
+        if not self._lease_slots:
+            return
+        timeout = self.config.scraper.driver_pool_acquire_timeout
+        try:
+            await asyncio.wait_for(self._lease_slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise DriverPoolTimeout(f"Нет свободного драйвера за {timeout}с")
+
+    def _release_lease_slot(self):
+        if self._lease_slots:
+            self._lease_slots.release()
+
+    def _release_abandoned_lease(self, job: asyncio.Future):
+        """Освобождает драйвер задачи, которую отменили, пока поток ее выполнял"""
+        result = None if job.cancelled() or job.exception() else job.result()
+        if result and result.get("driver"):
+            self._leased_drivers.add(id(result["driver"]))
+            asyncio.ensure_future(self.release_driver(result["driver"]))
+        else:
+            self._release_lease_slot()
+
+    def _scrape_categories_sync(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Синхронная часть scrape_categories (выполняется в потоке пула)"""
         # ДЕБАГ: выводим полученные параметры
         logger.info("=" * 50)
         logger.info("📥 ПОЛУЧЕНЫ ПАРАМЕТРЫ ДЛЯ СКРАПИНГА:")
@@ -83,28 +310,37 @@ class MPStatsScraperService:
         if not validation_result["valid"]:
             return validation_result
 
+        driver = None
         try:
-            # 1. Настройка драйвера
-            self.driver = await self._setup_driver()
+            # 1. Настройка драйвера (или аренда прогретого из пула)
+            with timings.span("driver_acquire", pooled=bool(self.driver_pool or self.tab_pool)):
+                driver = self._acquire_driver()
+            self.memory_sampler.track(driver)
 
             # 2. Авторизация (будет пропущена если уже есть сессия)
-            await self._login_to_mpstats()
+            with timings.span("login_check"):
+                self._login_to_mpstats(driver)
 
-            # 3. Заполнение формы ключевыми словами
-            form_result = await self._fill_keywords_form(params)
+            # Захват ответа API включается до "Подобрать запросы"
+            if self._wants_network_capture(params):
+                self._start_network_capture(driver)
+
+            # 3. Заполнение формы ключевыми словами (включает results_wait)
+            with timings.span("form_fill"):
+                form_result = self._fill_keywords_form(driver, params)
 
             if form_result["success"]:
                 # Возвращаем успешный результат с информацией о драйвере
                 return {
                     "status": "success",
                     "message": "✅ Форма успешно заполнена",
-                    "driver": self.driver,
+                    "driver": driver,
                     "query_text": form_result["query_text"],
                     "params": params
                 }
             else:
                 # Закрываем драйвер при ошибке
-                self.cleanup()
+                self._quit_driver(driver)
                 return {
                     "status": "error",
                     "message": form_result.get("message", "❌ Не удалось заполнить форму")
@@ -112,7 +348,7 @@ class MPStatsScraperService:
 
         except Exception as e:
             logger.error(f"Ошибка при скрапинге: {e}", exc_info=True)
-            self.cleanup()
+            self._quit_driver(driver)
             return {
                 "status": "error",
                 "message": f"❌ Ошибка при выполнении скрапинга: {str(e)}"
@@ -175,32 +411,37 @@ class MPStatsScraperService:
         except Exception as e:
             self.logger.error(f"❌ Ошибка очистки временных файлов: {e}")
 
-    async def _setup_driver(self) -> webdriver.Chrome:
-        """Настройка Chrome драйвера с stealth режимом и сохранением профиля"""
+    def _setup_driver(self, profile_dir: Optional[str] = None, track: bool = True) -> webdriver.Chrome:
+        """
+        Настройка Chrome драйвера с stealth режимом и сохранением профиля
+
+        Args:
+            profile_dir: Директория профиля (по умолчанию копия эталона
+                или сам self.profile_dir, если копирование выключено)
+            track: Учитывать драйвер в списке активных (драйверы пула учитывает пул)
+        """
         import app
         from pathlib import Path
 
+        clone_dir = None
+        if not profile_dir and self.profile_templates:
+            with timings.span("profile_clone"):
+                clone_dir = profile_dir = self.profile_templates.clone()
+        profile_dir = profile_dir or self.profile_dir
+
         # ИСПРАВЛЕНО: Явно указываем путь для скачивания
         app_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
         self.download_dir = Path(app_dir) / "downloads" / "mpstats"
         self.download_dir.mkdir(parents=True, exist_ok=True)
 
-        # ИСПРАВЛЕНО: Используем self.driver_manager как класс, а не экземпляр
-        self.driver_manager = ChromeDriverManager(
+        # Отдельный менеджер на каждый драйвер: задачи выполняются параллельно
+        driver_manager = ChromeDriverManager(
             headless= SeleniumConfig.headless,
             use_stealth= SeleniumConfig.stealth_mode,
+            memory_profile=self.config.scraper.memory_profile,
+            js_heap_mb=self.config.scraper.js_heap_mb
         )
 
-        stealth_options = {
-            "languages": ["ru-RU", "ru", "en-US", "en"],
-            "vendor": "Google Inc.",
-            "platform": "Win32",
-            "webgl_vendor": "Intel Inc.",
-            "renderer": "Intel Iris OpenGL Engine",
-            "fix_hairline": True,
-            "run_on_insecure_origins": False,
-        }
-
         user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.6045.159 Safari/537.36",
@@ -210,21 +451,34 @@ class MPStatsScraperService:
         user_agent = random.choice(user_agents)
 
         # ИСПРАВЛЕНО: Используем self.profile_dir для сохранения профиля
-        driver = self.driver_manager.create_driver(
-            download_dir=str(self.download_dir),
-            block_videos=True,
-            block_images=False,
-            block_sounds=True,
-            user_agent=user_agent,
-            stealth_options=stealth_options,
-            profile_dir=self.profile_dir,  # ДОБАВЛЕНО: передаем путь к профилю
-            keep_profile=True  # ДОБАВЛЕНО: сохраняем профиль
-        )
+        try:
+            driver = driver_manager.create_driver(
+                download_dir=str(self.download_dir),
+                block_videos=True,
+                block_images=False,
+                block_sounds=True,
+                user_agent=user_agent,
+                stealth_options=STEALTH_OPTIONS,
+                profile_dir=profile_dir,  # ДОБАВЛЕНО: передаем путь к профилю
+                keep_profile=True,  # ДОБАВЛЕНО: сохраняем профиль
+                network_profile=self.network_profile
+            )
+        except Exception:
+            if clone_dir:
+                self.profile_templates.release(clone_dir)
+            raise
+        if clone_dir:
+            # Копию освобождает тот, кто закрывает драйвер: _quit_driver или пул (on_close)
+            self._driver_clones[id(driver)] = clone_dir
+
+        self._check_download_directory(driver)
 
-        await self._check_download_directory(driver)
+        # Счетчик сетевых запросов страницы для ожидания "сеть простаивает"
+        self.readiness.install_network_tracker(driver)
 
-        # Случайные задержки
-        driver.implicitly_wait(random.uniform(2, 5))
+        # Без неявного ожидания: каждый промах find_elements стоил до 5 секунд,
+        # элементы ищет SelectorEngine с явным потолком для каждого
+        driver.implicitly_wait(0)
 
         # Случайный размер окна
         window_sizes = [(1920, 1080), (1366, 768), (1536, 864), (1440, 900)]
@@ -239,8 +493,11 @@ class MPStatsScraperService:
 
         logger.info(f"✅ Драйвер создан. Размер окна: {width}x{height}")
         logger.info(f"📂 Путь для скачивания: {self.download_dir}")
-        logger.info(f"📁 Профиль сохранен в: {self.profile_dir}")
+        logger.info(f"📁 Профиль сохранен в: {profile_dir}")
 
+        if track:
+            self.driver = driver
+            self._active_drivers.add(driver)
         return driver
 
     async def download_keywords_data(self, driver, params: Dict[str, Any]) -> str:
@@ -248,15 +505,201 @@ class MPStatsScraperService:
         Полная последовательность действий для скачивания данных
         Возвращает путь к скачанному Excel файлу
         """
+        return await self.executor.run(self._download_keywords_data_sync, driver, params)
+
+    async def collect_results(self, driver, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Результаты запроса: из перехваченного ответа API (если захват включен),
+        из таблицы на странице, если она отрисована целиком, иначе скачиванием
+        Excel (как download_keywords_data)
+
+        Returns:
+            {"status": "success", "source": "network" или "grid", "rows": [{"word", "frequency"}]} или
+            {"status": "success", "source": "excel", "file": путь к Excel}
+        """
+        return await self.executor.run(self._collect_results_sync, driver, params)
+
+    def _collect_results_sync(self, driver, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Синхронная часть collect_results (выполняется в потоке пула)"""
+        rows = self._read_captured_rows(driver)
+        if rows:
+            return {"status": "success", "source": "network", "rows": rows}
+
+        if self.grid_reader:
+            self._open_words_tab(driver)
+            with timings.span("grid_read") as span:
+                try:
+                    grid = self.selectors.find(driver, "results.grid")
+                    result = self.grid_reader.read(driver, grid)
+                except Exception as e:
+                    logger.info(f"📋 Таблица результатов не найдена ({e}), скачиваю файл")
+                    result = {"status": "fallback", "reason": "not_found"}
+                span["result"] = result.get("reason", result["status"])
+            if result["status"] == "success" and result["rows"]:
+                return {"status": "success", "source": "grid", "rows": result["rows"]}
+
+        excel_file = self._download_keywords_data_sync(driver, params, words_tab_open=bool(self.grid_reader))
+        return {"status": "success", "source": "excel", "file": excel_file}
+
+    async def release_driver(self, driver):
+        """
+        Освобождает драйвер задачи: возвращает его в пул драйверов
+        или закрывает (quit может занимать секунды, поэтому в пуле потоков)
+        """
+        if driver:
+            try:
+                await self.executor.run(self._quit_driver, driver)
+            finally:
+                if id(driver) in self._leased_drivers:
+                    self._leased_drivers.discard(id(driver))
+                    self._release_lease_slot()
+
+    async def scrape_batch(self, queries: List[Dict[str, Any]], pause: float = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Пакетный скрапинг: одна авторизация и одна вкладка на весь список запросов.
+
+        Результаты отдаются по мере готовности:
+        {"status": "success", "index", "params", "query_text", "file"} или
+        {"status": "error", "index", "params", "message"}.
+        Скачанные файлы удаляет вызывающий (как и для download_keywords_data).
+        Если перестать читать результаты, пакет остановится после текущего запроса.
+
+        Args:
+            queries: Параметры запросов (как для scrape_categories)
+            pause: Пауза между запросами (секунды) - ограничение нагрузки на MPStats
+        """
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        stop_event = threading.Event()
+
+        def emit(item):
+            loop.call_soon_threadsafe(results.put_nowait, item)
+
+        # Пакет держит один драйвер пула и сам освобождает его в потоке
+        await self._acquire_lease_slot()
+        batch = asyncio.ensure_future(
+            self.executor.run(self._scrape_batch_sync, list(queries), emit, finished, stop_event, pause)
+        )
+        batch.add_done_callback(lambda _: self._release_lease_slot())
         try:
-            logger.info(f"📂 Ожидаю файл в директории: {self.download_dir}")
-            logger.info(f"📂 Абсолютный путь: {os.path.abspath(str(self.download_dir))}")
+            while True:
+                item = await results.get()
+                if item is finished:
+                    break
+                yield item
+            # Ошибки, прервавшие пакет целиком (драйвер, авторизация)
+            await batch
+        finally:
+            stop_event.set()
+
+    def _scrape_batch_sync(self, queries: List[Dict[str, Any]], emit: Callable[[Any], None],
+                           finished: Any, stop_event: threading.Event, pause: float = 0,
+                           max_consecutive_errors: int = 3):
+        """Синхронная часть scrape_batch (выполняется в потоке пула)"""
+        driver = None
+        consecutive_errors = 0
+        try:
+            with timings.span("driver_acquire", pooled=bool(self.driver_pool or self.tab_pool)):
+                driver = self._acquire_driver()
+            self.memory_sampler.track(driver)
+            with timings.span("login_check"):
+                self._login_to_mpstats(driver)
+
+            logger.info(f"📦 Пакетный скрапинг: {len(queries)} запросов в одной вкладке")
+            for index, params in enumerate(queries):
+                # Пауза прерывается сразу, если потребитель остановил пакет
+                if stop_event.wait(pause if index > 0 else 0):
+                    logger.info(f"⏹️ Пакет остановлен на запросе {index + 1}/{len(queries)}")
+                    break
+
+                result = self._scrape_batch_item(driver, index, params, reopen_page=index > 0)
+                emit(result)
+
+                consecutive_errors = consecutive_errors + 1 if result["status"] == "error" else 0
+                if consecutive_errors >= max_consecutive_errors:
+                    logger.error(f"❌ Пакет прерван: {consecutive_errors} ошибок подряд")
+                    break
+        finally:
+            self._quit_driver(driver)
+            emit(finished)
+
+    def _scrape_batch_item(self, driver, index: int, params: Dict[str, Any], reopen_page: bool) -> Dict[str, Any]:
+        """Один запрос пакета: форма, результаты и скачивание в уже открытой вкладке"""
+        validation_result = self._validate_params(params)
+        if not validation_result["valid"]:
+            return {"status": "error", "index": index, "params": params,
+                    "message": validation_result.get("message", "Некорректные параметры")}
+
+        try:
+            with timings.span("batch_query", index=index):
+                if reopen_page:
+                    self._reopen_keywords_page(driver)
+
+                with timings.span("form_fill"):
+                    form_result = self._fill_keywords_form(driver, params)
+                if not form_result["success"]:
+                    return {"status": "error", "index": index, "params": params,
+                            "message": form_result.get("message", "Не удалось заполнить форму")}
+
+                excel_file = self._download_keywords_data_sync(driver, params)
+
+            logger.info(f"✅ Пакет [{index + 1}]: {form_result['query_text']}")
+            return {"status": "success", "index": index, "params": params,
+                    "query_text": form_result["query_text"], "file": excel_file}
+
+        except Exception as e:
+            logger.warning(f"⚠️ Пакет [{index + 1}] не удался: {e}")
+            return {"status": "error", "index": index, "params": params, "message": str(e)}
 
-            # Создайте тестовый файл для проверки
-            test_file = os.path.join(self.download_dir, "test_check.txt")
+    def _reopen_keywords_page(self, driver):
+        """
+        Открывает страницу запросов заново в той же вкладке: иначе таблица
+        предыдущего запроса сразу выглядит как готовый результат нового.
+        Если сессия истекла посреди пакета - повторная авторизация.
+        """
+        driver.get(self.keywords_url)
+        landed = self.readiness.wait_for_any(driver, "keywords_page", {
+            "keywords": self.selectors.at_least("tabs.requests", 1),
+            "login": lambda d: d.current_url.startswith(self.login_url),
+        }, timeout=self.config.scraper.step_timeout)
+
+        if landed != "keywords":
+            logger.info("🔑 Сессия пакета потеряна, авторизуюсь заново")
+            with timings.span("login_check"):
+                self._login_to_mpstats(driver)
+
+    def _download_keywords_data_sync(self, driver, params: Dict[str, Any], words_tab_open: bool = False) -> str:
+        """
+        Синхронная часть download_keywords_data (выполняется в потоке пула)
+
+        Args:
+            words_tab_open: Вкладка "Слова" уже открыта (после попытки чтения таблицы)
+        """
+        # У каждой задачи своя директория скачивания: параллельные задачи
+        # не подхватывают и не удаляют чужие файлы
+        job_dir = self._create_job_download_dir()
+        # У вкладок общий браузер и общий трекер: файл вкладки определяется по ее frameId
+        shared_tracker = driver.browser.downloads if isinstance(driver, TabDriver) else None
+        tracker = shared_tracker or CDPDownloadTracker(driver, str(job_dir))
+        watcher = DownloadWatcher(str(job_dir))
+        try:
+            logger.info(f"📂 Ожидаю файл в директории: {job_dir}")
+            # Без событий CDP - события inotify директории задачи (до кликов, чтобы не пропустить)
+            if shared_tracker:
+                if not shared_tracker.active:
+                    driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+                        "behavior": "allow", "downloadPath": str(job_dir)
+                    })
+                    watcher.start()
+            elif not tracker.start():
+                watcher.start()
+
+            # Проверяем, что директория доступна на запись
+            test_file = os.path.join(job_dir, "test_check.txt")
             with open(test_file, 'w') as f:
                 f.write("Test if directory is writable")
-            logger.info(f"✅ Тестовый файл создан: {test_file}")
+            os.remove(test_file)
 
             from selenium.webdriver.common.by import By
             from selenium.webdriver.support.ui import WebDriverWait
@@ -264,52 +707,50 @@ class MPStatsScraperService:
             import time
 
             self.logger.info("🔄 Начинаю процесс скачивания данных...")
+            clicks_started_at = time.monotonic()
 
             # 2. Переключение на вкладку "Слова"
-            try:
-                elements = driver.find_elements(
-                    self.by_mapping[self.words_config["by"]],
-                    self.words_config["value"]
-                )
-                if len(elements) > 1:
-                    driver.execute_script("arguments[0].click();", elements[1])
-                    self.logger.info("✅ Переключились на 'Слова'")
-                    time.sleep(2)
-            except Exception as e:
-                self.logger.warning(f"Не удалось переключиться на 'Слова': {e}")
+            if not words_tab_open:
+                self._open_words_tab(driver)
 
             # 3. Скачивание файла (первая кнопка)
             try:
-                elements = driver.find_elements(
-                    self.by_mapping[self.downloads_config["by"]],
-                    self.downloads_config["value"]
-                )
+                elements = self.selectors.find_all(driver, "download.download_btn")
                 if len(elements) > 0:
-                    driver.execute_script("arguments[0].click();", elements[0])
-                    self.logger.info("✅ Кликнули на первую кнопку скачивания 1 в стеке")
-                    time.sleep(2)
+                    with timings.span("download_click_1"):
+                        driver.execute_script("arguments[0].click();", elements[0])
+                        self.logger.info("✅ Кликнули на первую кнопку скачивания 1 в стеке")
+                        self._wait_download_buttons(driver, "download_click_1")
             except Exception as e:
                 self.logger.warning(f"Не удалось кликнуть первую кнопку: {e}")
 
             # 4. Скачивание файла (вторая кнопка)
             try:
-                elements = driver.find_elements(
-                    self.by_mapping[self.downloads_config["by"]],
-                    self.downloads_config["value"]
-                )
-                if len(elements) > 2:
-                    driver.execute_script("arguments[0].click();", elements[2])
-                    self.logger.info("✅ Кликнули на вторую кнопку скачивания 3 в стеке")
-                    time.sleep(2)
-                else:
-                    driver.execute_script("arguments[0].click();", elements[1])
-                    self.logger.info("✅ Кликнули на вторую кнопку скачивания 2 в стеке")
+                with timings.span("download_click_2"):
+                    elements = self.selectors.find_all(driver, "download.download_btn", min_count=2)
+                    if len(elements) > 2:
+                        driver.execute_script("arguments[0].click();", elements[2])
+                        self.logger.info("✅ Кликнули на вторую кнопку скачивания 3 в стеке")
+                    else:
+                        driver.execute_script("arguments[0].click();", elements[1])
+                        self.logger.info("✅ Кликнули на вторую кнопку скачивания 2 в стеке")
 
             except Exception as e:
                 self.logger.warning(f"Не удалось кликнуть вторую кнопку: {e}")
 
-            # 5. Ожидание скачивания
-            downloaded_file = await self._wait_for_download()
+            # 5. Ожидание скачивания: по событиям CDP, иначе inotify (или опросом) директории задачи
+            method = "cdp" if tracker.active else "inotify" if watcher.active else "poll"
+            with timings.span("file_wait", method=method):
+                if tracker.active:
+                    files = tracker.wait_for_completed(
+                        count=1, timeout=120,
+                        frame_id=driver.target_id if shared_tracker else None,
+                        started_after=clicks_started_at, target_dir=str(job_dir)
+                    )
+                    downloaded_file = files[0] if files else None
+                else:
+                    logger.info(f"⏳ Ожидаю скачивания файла в {job_dir} ({method})")
+                    downloaded_file = watcher.wait(timeout=120)
 
             if downloaded_file:
                 self.logger.info(f"✅ Файл скачан: {downloaded_file}")
@@ -319,88 +760,149 @@ class MPStatsScraperService:
 
         except Exception as e:
             self.logger.error(f"Ошибка при скачивании: {e}")
+            shutil.rmtree(job_dir, ignore_errors=True)
             raise
 
-    async def _wait_for_download(self, timeout: int = 120, check_interval: int = 1) -> str:
-        """Ожидание завершения скачивания файла с улучшенной логикой"""
-        import time
-
-        logger.info(f"⏳ Ожидаю скачивания файла в {self.download_dir}. Таймаут: {timeout}с")
-
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if not os.path.exists(self.download_dir):
-                await asyncio.sleep(check_interval)
-                continue
-
-            # Ищем все файлы .xlsx и .xls в директории
-            for filename in os.listdir(self.download_dir):
-                if filename.endswith('.xlsx') or filename.endswith('.xls'):
-                    file_path = os.path.join(self.download_dir, filename)
-
-                    # Проверяем, что файл больше не скачивается
-                    if filename.endswith('.crdownload') or filename.endswith('.tmp'):
-                        logger.debug(f"Файл в процессе скачивания (пропускаем): {filename}")
-                        continue
-
-                    # Проверяем, что файл имеет нормальный размер и не заблокирован системой
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        if file_size > 1024:  # Минимальный размер (1KB)
-                            logger.info(f"✅ Найден готовый Excel файл: {filename} (размер: {file_size} байт)")
-                            return file_path
-                        else:
-                            logger.debug(f"Файл слишком мал, возможно, не скачан: {filename} ({file_size} байт)")
-                    except OSError as e:
-                        logger.debug(f"Не удалось проверить файл {filename}: {e}")
-
-            await asyncio.sleep(check_interval)
-
-        # Если цикл завершился по таймауту, сделаем последнюю попытку найти любой Excel файл
-        logger.warning("Таймаут ожидания. Делаю финальную проверку директории...")
-        if os.path.exists(self.download_dir):
-            for filename in os.listdir(self.download_dir):
-                if filename.endswith('.xlsx') or filename.endswith('.xls'):
-                    if not (filename.endswith('.crdownload') or filename.endswith('.tmp')):
-                        final_file = os.path.join(self.download_dir, filename)
-                        logger.info(f"✅ Файл найден после таймаута: {final_file}")
-                        return final_file
-
-        logger.error("❌ Файл не найден после таймаута ожидания.")
-        return None
-
-    async def _login_to_mpstats(self):
+        finally:
+            if not shared_tracker:
+                tracker.stop()
+            watcher.close()
+
+    def _wants_network_capture(self, params: Dict[str, Any]) -> bool:
+        """Захват ответа API для задачи: params["network_capture"], иначе настройка"""
+        wanted = params.get("network_capture")
+        return self.config.scraper.network_capture_enabled if wanted is None else bool(wanted)
+
+    def _start_network_capture(self, driver):
+        """Включает захват ответа API на драйвере задачи (до отправки формы)"""
+        self._stop_network_capture(driver)
+        with timings.span("capture_start"):
+            capture = self.driver_manager.start_network_capture(
+                driver, self.config.scraper.network_capture_urls,
+                max_body_bytes=self.config.scraper.network_capture_max_mb * 1024 * 1024
+            )
+        if capture:
+            self._captures[id(driver)] = capture
+        else:
+            self._count_capture("unavailable")
+
+    def _stop_network_capture(self, driver):
+        capture = self._captures.pop(id(driver), None)
+        if capture:
+            capture.stop()
+
+    def _read_captured_rows(self, driver) -> Optional[List[Dict[str, Any]]]:
+        """Строки результатов из перехваченного ответа API или None (откат на таблицу/скачивание)"""
+        capture = self._captures.pop(id(driver), None)
+        if not capture:
+            return None
+        try:
+            with timings.span("capture_read") as span:
+                responses = capture.wait_for_responses(timeout=self.config.scraper.network_capture_timeout)
+                span["responses"] = len(responses)
+                span["bytes"] = sum(response["size"] for response in responses)
+                for response in responses:
+                    rows = MPStatsHttpKeywordsClient.extract_keyword_rows(response["payload"])
+                    if rows:
+                        span["result"] = "success"
+                        self._count_capture("success")
+                        logger.info(f"🛰️ Результаты из ответа API: {len(rows)} строк ({response['url']})")
+                        return rows
+                reason = "no_rows" if responses else "no_response"
+                span["result"] = reason
+                self._count_capture(reason)
+                logger.info(f"🛰️ Ответ API не перехвачен ({reason}), беру результаты со страницы")
+                return None
+        finally:
+            capture.stop()
+
+    def _count_capture(self, outcome: str):
+        with self._capture_lock:
+            self._capture_outcomes[outcome] += 1
+
+    def _capture_stats(self) -> Dict[str, int]:
+        """Исходы захвата ответа API: success и причины отката"""
+        with self._capture_lock:
+            return dict(self._capture_outcomes)
+
+    def _open_words_tab(self, driver):
+        """Переключение на вкладку "Слова" (таблица слов и кнопки ее выгрузки)"""
+        try:
+            elements = self.selectors.find_all(driver, "tabs.words", min_count=2)
+            if len(elements) > 1:
+                with timings.span("words_tab"):
+                    driver.execute_script("arguments[0].click();", elements[1])
+                    self.logger.info("✅ Переключились на 'Слова'")
+                    self._wait_download_buttons(driver, "words_tab")
+        except Exception as e:
+            self.logger.warning(f"Не удалось переключиться на 'Слова': {e}")
+
+    def _create_job_download_dir(self) -> Path:
+        """Создает отдельную директорию скачивания для задачи"""
+        job_dir = Path(self.download_dir) / f"job_{uuid.uuid4().hex[:12]}"
+        job_dir.mkdir(parents=True, exist_ok=True)
+        return job_dir
+
+    def _wait_download_buttons(self, driver, name: str) -> bool:
+        """Ждет, пока кнопки скачивания активны и страница закончила запросы"""
+        buttons_enabled = self.selectors.at_least("download.download_btn", 2, only_enabled=True)
+        return self.readiness.wait_for(
+            driver, name,
+            lambda d: buttons_enabled(d) and self.readiness.is_network_idle(d),
+            timeout=self.config.scraper.step_timeout
+        )
+
+    def _wait_for_results(self, driver, baseline_buttons: int) -> Optional[str]:
+        """
+        Ждет ответа MPStats на "Подобрать запросы": появления строк таблицы
+        результатов или новых активных кнопок скачивания, после чего сеть должна затихнуть.
+
+        Args:
+            driver: Chrome WebDriver
+            baseline_buttons: Количество кнопок по селектору скачивания до отправки формы
+
+        Returns:
+            Имя сработавшего сигнала или None при таймауте
+        """
+        grid_rows = self.selectors.at_least("results.grid_row", 1)
+        new_buttons = self.selectors.at_least("download.download_btn", baseline_buttons + 1, only_enabled=True)
+        idle = self.readiness.is_network_idle
+        return self.readiness.wait_for_any(
+            driver, "results",
+            {
+                "results_grid": lambda d: grid_rows(d) and idle(d),
+                "download_buttons": lambda d: new_buttons(d) and idle(d),
+            },
+            timeout=self.config.scraper.results_timeout
+        )
+
+    def _login_to_mpstats(self, driver):
         """Авторизация в MPStats (будет пропущена если уже есть сессия)"""
         logger.info("Проверка авторизации в MPStats...")
 
+        if self._open_keywords_page_if_logged_in(driver):
+            self._mark_template_refresh(driver, relogin=False)
+            return
+
         try:
             # Переход на страницу
-            self.driver.get('https://mpstats.io/seo/keywords/expanding')
-            time.sleep(random.uniform(2, 4))
-            current_url = self.driver.current_url
+            driver.get(self.keywords_url)
+            landed = self.readiness.wait_for_any(driver, "keywords_page", {
+                "keywords": self.selectors.at_least("tabs.requests", 1),
+                "login": lambda d: d.current_url.startswith(self.login_url),
+            }, timeout=self.config.scraper.step_timeout)
 
             # Проверяем, нужно ли логиниться
-            if 'https://mpstats.io/login' in current_url:
+            if landed == "login":
                 logger.info("🔑 Требуется авторизация. Выполняю вход...")
 
-                # Ожидание формы логина
-                WebDriverWait(self.driver, 30).until(
-                    EC.presence_of_element_located((By.NAME, "mpstats-login-form-name"))
-                )
-
-                # Ввод email
-                email_input = self.driver.find_element(
-                    self.by_mapping[self.email_config["by"]],
-                    self.email_config["value"]
-                )
+                # Ожидание формы логина и ввод email
+                email_input = self.selectors.find(driver, "login.email_field")
                 email = self.config.api.mpstats_email
                 email_input.send_keys(email)
 
                 # Ввод пароля
-                password_input = self.driver.find_element(
-                    self.by_mapping[self.password_config["by"]],
-                    self.password_config["value"]
-                )
+                password_input = self.selectors.find(driver, "login.password_field")
                 password = self.config.api.mpstats_pswd
                 password_input.send_keys(password)
 
@@ -408,23 +910,24 @@ class MPStatsScraperService:
                 password_input.send_keys(Keys.ENTER)
 
                 # Ожидание успешного входа
-                WebDriverWait(self.driver, 30).until(
-                    lambda d: "expanding" in d.current_url or
-                              d.find_elements(
-                                  self.by_mapping[self.requests_btn_config["by"]],
-                                  self.requests_btn_config["value"]
-                              )
+                WebDriverWait(driver, 30).until(
+                    lambda d: "expanding" in d.current_url or self.selectors.count(d, "tabs.requests")
                 )
 
-                time.sleep(random.uniform(2, 4))
-                self.driver.get('https://mpstats.io/seo/keywords/expanding')
+                driver.get(self.keywords_url)
                 logger.info("✅ Авторизация выполнена и сохранена в профиле")
+                self._mark_template_refresh(driver, relogin=True)
 
-            elif current_url == 'https://mpstats.io/seo/keywords/expanding':
+            elif landed == "keywords":
                 logger.info('✅ Уже авторизован (использован сохраненный профиль)')
+                self._mark_template_refresh(driver, relogin=False)
+
+            else:
+                logger.warning(f"⚠️ Страница запросов не открылась за {self.config.scraper.step_timeout}с")
 
             # ДОБАВЛЕНО: Сохраняем куки в файл для проверки
-            self._save_cookies()
+            self._save_cookies(driver)
+            self._fresh_page_drivers.add(driver)
 
         except TimeoutException as e:
             logger.error("Таймаут при авторизации")
@@ -433,11 +936,60 @@ class MPStatsScraperService:
             logger.error(f"Ошибка при авторизации: {e}")
             raise Exception(f"Ошибка авторизации: {str(e)}")
 
-    def _save_cookies(self):
+    def _mark_template_refresh(self, driver, relogin: bool):
+        """
+        Помечает копию профиля драйвера для переноса в эталон при закрытии:
+        после нового логина или если эталон старше profile_template_refresh_hours
+        """
+        # Профиль вкладки - профиль ее браузера
+        if isinstance(driver, TabDriver):
+            driver = driver.browser.driver
+        if id(driver) not in self._driver_clones:
+            return
+        age = self.profile_templates.template_age
+        if relogin or age is None or age > self.config.scraper.profile_template_refresh_hours * 3600:
+            self._clones_to_promote.add(id(driver))
+
+    def _open_keywords_page_if_logged_in(self, driver) -> bool:
+        """
+        Быстрый путь авторизации: проверка сессии без навигации.
+
+        Если сессия жива и у драйвера уже открыта нетронутая страница
+        запросов (драйвер из пула сразу после логина) - навигации нет вовсе.
+        Иначе страница открывается один раз с ожиданием по сигналу вместо паузы.
+
+        Returns:
+            True если драйвер авторизован и на странице запросов
+        """
+        if not self.session_probe:
+            return False
+        if self.session_probe.check(driver) != "valid":
+            return False
+
+        if driver in self._fresh_page_drivers and driver.current_url.startswith(self.keywords_url):
+            logger.info("✅ Сессия активна, страница запросов уже открыта")
+            return True
+
+        driver.get(self.keywords_url)
+        landed = self.readiness.wait_for_any(driver, "keywords_page", {
+            "keywords": self.selectors.at_least("tabs.requests", 1),
+            "login": lambda d: d.current_url.startswith(self.login_url),
+        }, timeout=self.config.scraper.step_timeout)
+
+        if landed == "keywords":
+            logger.info("✅ Сессия активна (быстрая проверка), страница запросов открыта")
+            return True
+
+        if landed == "login":
+            self.session_probe.record_false_positive()
+        logger.info("🔑 Быстрая проверка не подтвердилась, выполняю полную авторизацию")
+        return False
+
+    def _save_cookies(self, driver):
         """Сохраняет куки в файл для отладки"""
         try:
-            if self.driver:
-                cookies = self.driver.get_cookies()
+            if driver:
+                cookies = driver.get_cookies()
                 cookies_file = os.path.join(self.profile_dir, 'cookies.json')
                 import json
                 with open(cookies_file, 'w') as f:
@@ -446,62 +998,47 @@ class MPStatsScraperService:
         except Exception as e:
             logger.warning(f"Не удалось сохранить куки: {e}")
 
-    async def _fill_keywords_form(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _fill_keywords_form(self, driver, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Заполнение формы ключевыми словами
 
         Args:
+            driver: Chrome WebDriver
             params: Параметры для заполнения
 
         Returns:
             Dict с результатом заполнения
         """
+        # Страница запросов больше не "чистая" - следующей задаче нужно открыть ее заново
+        self._fresh_page_drivers.discard(driver)
+
         try:
             # 1. Клик на вкладку "Запросы"
             logger.info("Поиск вкладки 'Запросы'...")
 
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.element_to_be_clickable((self.by_mapping[self.requests_btn_config["by"]],
-                                                self.requests_btn_config["value"]))
-                )
-
-                elements = self.driver.find_elements(
-                    self.by_mapping[self.requests_btn_config["by"]],
-                    self.requests_btn_config["value"]
-                )
-                if len(elements) > 1:
-                    elements[1].click()
+            # Основной локатор и текстовый запасной проверяются вместе (SelectorEngine)
+            requests_tabs = self.selectors.find_all(driver, "tabs.requests", only_enabled=True)
+            if requests_tabs:
+                if len(requests_tabs) > 1:
+                    requests_tabs[1].click()
                 else:
-                    elements[0].click()
+                    requests_tabs[0].click()
 
-                time.sleep(random.uniform(0.3, 0.7))
                 logger.info("✅ Кликнули на вкладку 'Запросы'")
-                time.sleep(random.uniform(1, 2))
-
-            except TimeoutException:
-                # Пробуем альтернативные варианты
-                requests_tabs = self.driver.find_elements(
-                    By.XPATH,
-                    "//*[contains(text(), 'Запросы') or contains(text(), 'Запрос')]"
-                )
-
-                if requests_tabs:
-                    if len(requests_tabs) > 1:
-                        requests_tabs[1].click()
-                    else:
-                        requests_tabs[0].click()
-                    logger.info("✅ Кликнули на альтернативную вкладку 'Запросы'")
-                else:
-                    logger.warning("Вкладка 'Запросы' не найдена, продолжаем...")
+                # Вкладка активна, когда появилась textarea и догрузились ее запросы
+                self.readiness.wait_for(driver, "requests_tab",
+                    self.selectors.at_least("forms.textarea", 1),
+                    timeout=self.config.scraper.step_timeout)
+                self.readiness.wait_for(driver, "requests_tab_network_idle",
+                    self.readiness.network_idle(),
+                    timeout=self.config.scraper.step_timeout)
+            else:
+                logger.warning("Вкладка 'Запросы' не найдена, продолжаем...")
 
             # 2. Поиск textarea
             logger.info("Поиск textarea...")
 
-            textarea = self.driver.find_element(
-                self.by_mapping[self.textarea_config["by"]],
-                self.textarea_config["value"]
-            )
+            textarea = self.selectors.find(driver, "forms.textarea")
 
             # 3. Формирование текста из параметров
             query_text = self._build_query_text(params)
@@ -518,20 +1055,27 @@ class MPStatsScraperService:
             textarea.send_keys(query_text)
 
             logger.info("✅ Textarea заполнена")
-            time.sleep(3)
 
-            # 5. Нажимаем "Подобрать запросы"
-            element = self.driver.find_element(
-                self.by_mapping[self.find_queries_btn_config["by"]],
-                self.find_queries_btn_config["value"]
+            # 5. Нажимаем "Подобрать запросы" (ждем, пока кнопка станет активной)
+            self.readiness.wait_for(
+                driver, "find_button_enabled",
+                self.selectors.at_least("forms.find_queries_btn", 1, only_enabled=True),
+                timeout=self.config.scraper.step_timeout
             )
+            baseline_buttons = self.selectors.count(driver, "download.download_btn", only_enabled=True)
+            element = self.selectors.find(driver, "forms.find_queries_btn", only_enabled=True)
             # клик по кнопке игнорирую фокус
-            self.driver.execute_script("arguments[0].click();", element)
+            driver.execute_script("arguments[0].click();", element)
 
             logger.info("✅ Форма отправлена (клик по кнопке 'Подобрать запросы')")
 
-            # 6. Ждем некоторое время для обработки
-            time.sleep(40)
+            # 6. Ждем ответа MPStats (вместо фиксированных 40 секунд)
+            with timings.span("results_wait"):
+                signal = self._wait_for_results(driver, baseline_buttons)
+            if signal:
+                logger.info(f"✅ Результаты готовы (сигнал: {signal})")
+            else:
+                logger.warning("⚠️ Не дождались сигнала готовности результатов, продолжаем")
 
             return {
                 "success": True,
@@ -552,6 +1096,10 @@ class MPStatsScraperService:
                 "message": f"Ошибка при заполнении формы: {str(e)}"
             }
 
+    def build_query_text(self, params: Dict[str, Any]) -> str:
+        """Текст запроса, который скрапер вводит в форму MPStats"""
+        return self._build_query_text(params)
+
     def _build_query_text(self, params: Dict[str, Any]) -> str:
         """
         Формирование текста запроса из параметров
@@ -669,7 +1217,7 @@ class MPStatsScraperService:
 
         return query_text
 
-    async def _check_download_directory(self, driver):
+    def _check_download_directory(self, driver):
         """Проверка настроек директории скачивания"""
         try:
             # Проверяем существование директории
@@ -706,18 +1254,53 @@ class MPStatsScraperService:
 
         return cleaned
 
+    def _quit_driver(self, driver):
+        """Закрывает конкретный драйвер (или возвращает в пул) и убирает его из списка активных"""
+        if not driver:
+            return
+        self._stop_network_capture(driver)
+        peak_mb = self.memory_sampler.untrack(driver)
+        if peak_mb:
+            timings.record_metric("chrome_peak_rss_mb", round(peak_mb))
+        if self.tab_pool and self.tab_pool.owns(driver):
+            self._fresh_page_drivers.discard(driver)
+            self.tab_pool.release(driver)
+            return
+        if self.driver_pool and self.driver_pool.owns(driver):
+            self.driver_pool.release(driver)
+            return
+        try:
+            driver.quit()
+            logger.info("✅ Драйвер закрыт")
+        except:
+            logger.warning("⚠️ Не удалось закрыть драйвер (уже закрыт)")
+        finally:
+            self._active_drivers.discard(driver)
+            self._fresh_page_drivers.discard(driver)
+            if self.driver is driver:
+                self.driver = None
+            self._release_profile_clone(driver)
+
+    def _release_profile_clone(self, driver):
+        """Удаляет копию профиля закрытого драйвера, при необходимости обновив из нее эталон"""
+        clone_dir = self._driver_clones.pop(id(driver), None)
+        if not clone_dir:
+            return
+        if id(driver) in self._clones_to_promote:
+            self._clones_to_promote.discard(id(driver))
+            try:
+                self.profile_templates.promote(clone_dir)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось обновить эталонный профиль: {e}")
+        self.profile_templates.release(clone_dir)
+
     def cleanup(self):
         """Очистка ресурсов"""
         try:
-            # Проверяем наличие драйвера безопасно
-            if hasattr(self, 'driver') and self.driver:
-                try:
-                    self.driver.quit()
-                    logger.info("✅ Драйвер закрыт")
-                except:
-                    logger.warning("⚠️ Не удалось закрыть драйвер (уже закрыт)")
-                finally:
-                    self.driver = None
+            # Закрываем все драйверы, которые еще не были закрыты
+            if self._active_drivers:
+                for driver in list(self._active_drivers):
+                    self._quit_driver(driver)
             else:
                 logger.info("ℹ️ Драйвер уже закрыт или не существует")
 
@@ -736,4 +1319,29 @@ class MPStatsScraperService:
                             pass
                 logger.info("🗑️ Временные файлы очищены")
         except Exception as e:
-            logger.error(f"❌ Ошибка при очистке файлов: {e}")
\ No newline at end of file
+            logger.error(f"❌ Ошибка при очистке файлов: {e}")
+
+    def get_runtime_stats(self) -> Dict[str, Any]:
+        """Метрики пула потоков и пула драйверов скрапера"""
+        return {
+            "executor": self.executor.get_stats(),
+            "readiness": self.readiness.get_stats(),
+            "driver_pool": self.driver_pool.get_stats() if self.driver_pool else None,
+            "tab_pool": self.tab_pool.get_stats() if self.tab_pool else None,
+            "session_probe": self.session_probe.get_stats() if self.session_probe else None,
+            "memory": self.memory_sampler.get_stats(),
+            "profiles": self.profile_templates.get_stats() if self.profile_templates else None,
+            "selectors": self.selectors.get_stats(),
+            "grid": self.grid_reader.get_stats() if self.grid_reader else None,
+            "network_capture": self._capture_stats(),
+        }
+
+    def shutdown(self):
+        """Закрывает все драйверы и останавливает пул скрапера"""
+        self.cleanup()
+        self.memory_sampler.stop()
+        if self.tab_pool:
+            self.tab_pool.close()
+        if self.driver_pool:
+            self.driver_pool.close()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,218 @@
+# app/services/scrape_job_scheduler.py
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.utils.job_timing import timings
+
+logger = logging.getLogger(__name__)
+
+# Колбэк позиции в очереди: (позиция, ожидание до старта в секундах).
+# Позиция 0 означает, что задача запущена
+PositionCallback = Callable[[int, float], Awaitable[None]]
+# Колбэк обновленного результата: данные были отданы из устаревшего кэша,
+# а фоновое обновление заметно их изменило
+RefreshCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class JobOwner:
+    """Кто запускает задачу скрапинга"""
+    user_id: int
+    is_admin: bool = False
+    on_position: Optional[PositionCallback] = None
+    on_refresh: Optional[RefreshCallback] = None
+
+
+@dataclass
+class _ScrapeJob:
+    id: int
+    owner: JobOwner
+    func: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    last_position: Optional[int] = None
+    # Контекст того, кто поставил задачу: задача выполняется в нем, а не в контексте
+    # задачи, освободившей слот
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+
+
+class ScrapeJobScheduler:
+    """
+    Очередь задач скрапинга с глобальным лимитом одновременных браузеров.
+
+    - не больше max_concurrent задач одновременно (каждая задача - свой Chrome)
+    - пользователи обслуживаются по кругу: один пользователь с пачкой
+      запросов не блокирует остальных
+    - задачи администраторов идут раньше обычных
+    - ожидающим сообщается позиция в очереди и оценка ожидания
+      по длительности последних задач
+    """
+
+    def __init__(self, max_concurrent: int = 5, default_duration: float = 90, history: int = 20):
+        """
+        Args:
+            max_concurrent: Максимум одновременно выполняемых задач
+            default_duration: Оценка длительности задачи, пока нет истории (секунды)
+            history: Сколько последних длительностей учитывать в оценке
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.default_duration = default_duration
+        self._ids = itertools.count(1)
+
+        # Очереди по пользователям; порядок ключей - порядок обхода по кругу
+        self._admin_queues: "OrderedDict[int, Deque[_ScrapeJob]]" = OrderedDict()
+        self._user_queues: "OrderedDict[int, Deque[_ScrapeJob]]" = OrderedDict()
+        self._running: Dict[int, float] = {}  # job_id -> время старта
+        self._durations: Deque[float] = deque(maxlen=history)
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "max_queued": 0}
+
+    async def run(self, owner: JobOwner, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ставит задачу в очередь и ждет ее результат
+
+        Args:
+            owner: Владелец задачи (пользователь, приоритет, колбэк позиции)
+            func: Фабрика корутины задачи
+        """
+        loop = asyncio.get_running_loop()
+        job = _ScrapeJob(id=next(self._ids), owner=owner, func=func, future=loop.create_future())
+        queues = self._admin_queues if owner.is_admin else self._user_queues
+        queues.setdefault(owner.user_id, deque()).append(job)
+        self.stats["submitted"] += 1
+        self.stats["max_queued"] = max(self.stats["max_queued"], self.queued)
+
+        self._dispatch()
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            if self._remove(job):
+                self.stats["cancelled"] += 1
+                self._notify_positions()
+            raise
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._admin_queues.values()) + \
+            sum(len(q) for q in self._user_queues.values())
+
+    def _dispatch(self):
+        """Запускает задачи, пока есть свободные слоты"""
+        while len(self._running) < self.max_concurrent:
+            job = self._pop_next()
+            if job is None:
+                break
+            self._running[job.id] = time.monotonic()
+            waited = time.monotonic() - job.enqueued_at
+            logger.info(f"▶️ Задача скрапинга #{job.id} (user {job.owner.user_id}) запущена, "
+                        f"ожидание {waited:.1f}с, выполняется {len(self._running)}/{self.max_concurrent}")
+            if job.last_position:
+                self._send_position(job, 0, 0.0)
+            job.context.run(asyncio.create_task, self._execute(job))
+        self._notify_positions()
+
+    def _pop_next(self) -> Optional[_ScrapeJob]:
+        for queues in (self._admin_queues, self._user_queues):
+            while queues:
+                user_id, queue = next(iter(queues.items()))
+                # Пользователь уходит в конец круга
+                queues.move_to_end(user_id)
+                job = queue.popleft()
+                if not queue:
+                    del queues[user_id]
+                if not job.future.done():
+                    return job
+        return None
+
+    async def _execute(self, job: _ScrapeJob):
+        started = self._running[job.id]
+        timings.record("queue_wait", started - job.enqueued_at)
+        try:
+            result = await job.func()
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.stats["completed"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._durations.append(time.monotonic() - started)
+            del self._running[job.id]
+            self._dispatch()
+
+    def _remove(self, job: _ScrapeJob) -> bool:
+        """Убирает ожидающую задачу из очереди (при отмене)"""
+        for queues in (self._admin_queues, self._user_queues):
+            queue = queues.get(job.owner.user_id)
+            if queue and job in queue:
+                queue.remove(job)
+                if not queue:
+                    del queues[job.owner.user_id]
+                return True
+        return False
+
+    def _waiting_order(self) -> List[_ScrapeJob]:
+        """Порядок, в котором будут запущены ожидающие задачи"""
+        order = []
+        for queues in (self._admin_queues, self._user_queues):
+            for round_jobs in itertools.zip_longest(*queues.values()):
+                order.extend(job for job in round_jobs if job is not None)
+        return order
+
+    def _average_duration(self) -> float:
+        if not self._durations:
+            return self.default_duration
+        return sum(self._durations) / len(self._durations)
+
+    def _notify_positions(self):
+        """Сообщает ожидающим новую позицию (только если она изменилась)"""
+        order = self._waiting_order()
+        if not order:
+            return
+
+        # Оценка: слоты освобождаются по мере завершения текущих задач,
+        # каждая следующая задача занимает слот на среднюю длительность
+        average = self._average_duration()
+        now = time.monotonic()
+        slots = [max(average - (now - started), 0.0) for started in self._running.values()]
+        slots += [0.0] * (self.max_concurrent - len(slots))
+        heapq.heapify(slots)
+
+        for position, job in enumerate(order, 1):
+            start_in = heapq.heappop(slots)
+            heapq.heappush(slots, start_in + average)
+            if job.last_position != position:
+                self._send_position(job, position, start_in)
+
+    def _send_position(self, job: _ScrapeJob, position: int, eta: float):
+        job.last_position = position
+        if job.owner.on_position:
+            asyncio.create_task(self._safe_callback(job.owner.on_position, position, eta))
+
+    @staticmethod
+    async def _safe_callback(callback: PositionCallback, position: int, eta: float):
+        try:
+            await callback(position, eta)
+        except Exception as e:
+            logger.debug(f"Не удалось сообщить позицию в очереди: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": len(self._running),
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "avg_duration": self._average_duration(),
+        }
@@ -0,0 +1,91 @@
+# app/services/scraper_executor.py
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperExecutor:
+    """
+    Ограниченный пул потоков для блокирующей работы Selenium.
+
+    Все вызовы WebDriver, time.sleep и ожидания файлов выполняются здесь,
+    а корутины бота только ждут результат, не блокируя event loop.
+    """
+
+    def __init__(self, max_workers: int = 2, thread_name_prefix: str = "mpstats-scraper"):
+        """
+        Args:
+            max_workers: Максимальное число одновременно работающих Selenium задач
+            thread_name_prefix: Префикс имени потоков (удобно для логов)
+        """
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        logger.info(f"✅ ScraperExecutor создан: max_workers={self.max_workers}")
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Выполняет блокирующую функцию в пуле и ожидает результат.
+
+        Args:
+            func: Синхронная функция
+            *args, **kwargs: Аргументы функции
+
+        Returns:
+            Результат func
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._submitted += 1
+        # run_in_executor не переносит contextvars в поток - копируем контекст явно
+        # (нужно, например, чтобы замеры фаз попадали в запись своей задачи)
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._tracked_call, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def _tracked_call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Обертка для подсчета активных/завершенных задач"""
+        with self._lock:
+            self._running += 1
+        try:
+            result = func(*args, **kwargs)
+            with self._lock:
+                self._completed += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Текущее состояние пула"""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": max(0, self._submitted - finished - self._running),
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Останавливает пул (незапущенные задачи отменяются)"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("ScraperExecutor остановлен")
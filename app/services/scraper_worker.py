@@ -0,0 +1,300 @@
+# app/services/scraper_worker.py
+"""
+Процесс скрапера: DataCollectionService и MPStatsScraperService (Selenium,
+Chrome, pandas) вне процесса бота.
+
+Бот общается с процессом по Unix сокету (ScraperWorkerClient): одно
+соединение - один запрос, сообщения - JSON по строке.
+
+Запрос сбора: {"op": "collect_keywords", "job_id", "args": {...}, "owner": {"user_id", "is_admin", "refresh"}}
+Ответы: {"event": "accepted"}, {"event": "progress", "position", "eta"} (позиция
+в очереди браузерных задач, 0 - задача запущена), затем {"event": "result", "result", "stats"}
+или {"event": "error", "message"}. Если владелец запросил обновления ("refresh": true), а результат
+отдан из устаревшего кэша, соединение остается открытым до {"event": "refreshed", "result"}
+(null - данные не изменились). Отмена: {"op": "cancel"} в том же соединении
+или закрытие соединения; из другого соединения - {"op": "cancel", "job_id"}.
+Служебные: {"op": "ping"}, {"op": "stats"}. Прогрев кэша (процесс 0):
+{"op": "prewarm", "action": "status" | "resume" | "stop" | "run", "force"} -> {"event": "prewarm", "stats", "result"}.
+
+Запуск отдельно от бота:
+    python -m app.services.scraper_worker --index 0
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import uuid
+from typing import Dict, Any, Optional
+
+from app.services.scrape_job_scheduler import JobOwner
+from app.utils.job_timing import timings
+
+logger = logging.getLogger(__name__)
+
+# Потолок одного сообщения (результат сбора - сотни ключевых слов, статистика)
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Следующее сообщение или None, если соединение закрыто"""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def worker_socket_path(config, index: int) -> str:
+    """Сокет процесса скрапера с номером index"""
+    socket_dir = config.scraper.worker_socket_dir or os.path.join(config.paths.data_dir, "workers")
+    return os.path.join(socket_dir, f"scraper-{index}.sock")
+
+
+class ScraperWorkerServer:
+    """Unix сокет сервер процесса скрапера: прием задач, прогресс, отмена"""
+
+    def __init__(self, data_collection, scraper, socket_path: str, prewarm=None):
+        """
+        Args:
+            data_collection: DataCollectionService процесса
+            scraper: MPStatsScraperService процесса (для статистики)
+            socket_path: Путь к Unix сокету
+            prewarm: KeywordPrewarmService, если прогрев идет в этом процессе
+        """
+        self.data_collection = data_collection
+        self.scraper = scraper
+        self.prewarm = prewarm
+        self.socket_path = socket_path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._jobs: Dict[str, asyncio.Task] = {}
+        self.stats = {"accepted": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        # Сокет от предыдущего запуска (процесс был убит) мешает bind
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=self.socket_path, limit=MAX_MESSAGE_BYTES
+        )
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"🧵 Процесс скрапера {os.getpid()} слушает {self.socket_path}")
+
+    async def close(self):
+        """Останавливает прием, отменяет задачи в работе"""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._jobs.values()):
+            task.cancel()
+        await asyncio.gather(*self._jobs.values(), return_exceptions=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker": {**self.stats, "pid": os.getpid(), "running": len(self._jobs)},
+            "data_collection": self.data_collection.get_runtime_stats(),
+            "scraper": self.scraper.get_runtime_stats(),
+            "prewarm": self.prewarm.get_stats() if self.prewarm else None,
+            "timings": timings.get_histograms(),
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        send_lock = asyncio.Lock()
+
+        async def send(message: Dict[str, Any]):
+            async with send_lock:
+                writer.write(encode_message(message))
+                await writer.drain()
+
+        try:
+            request = await read_message(reader)
+            if request is None:
+                return
+            op = request.get("op")
+            if op == "collect_keywords":
+                await self._run_collect(request, reader, send)
+            elif op == "cancel":
+                task = self._jobs.get(request.get("job_id"))
+                if task:
+                    task.cancel()
+                await send({"event": "cancelled" if task else "unknown_job", "job_id": request.get("job_id")})
+            elif op == "stats":
+                await send({"event": "stats", "stats": self.get_stats()})
+            elif op == "prewarm":
+                await send(await self._handle_prewarm(request))
+            elif op == "ping":
+                await send({"event": "pong", "pid": os.getpid(), "running": len(self._jobs)})
+            else:
+                await send({"event": "error", "message": f"Неизвестная операция: {op}"})
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Соединение с ботом прервано: {e}")
+        finally:
+            writer.close()
+
+    async def _run_collect(self, request: Dict[str, Any], reader: asyncio.StreamReader, send):
+        job_id = request.get("job_id") or uuid.uuid4().hex
+        owner_data = request.get("owner") or {}
+
+        async def on_position(position: int, eta: float):
+            try:
+                await send({"event": "progress", "job_id": job_id, "position": position, "eta": eta})
+            except ConnectionError:
+                pass
+
+        owner = JobOwner(
+            user_id=owner_data.get("user_id", 0),
+            is_admin=bool(owner_data.get("is_admin")),
+            on_position=on_position
+        )
+        task = asyncio.create_task(self.data_collection.collect_keywords_data(**request.get("args", {}), owner=owner))
+        self._jobs[job_id] = task
+        self.stats["accepted"] += 1
+        await send({"event": "accepted", "job_id": job_id})
+
+        # Любое следующее сообщение ({"op": "cancel"}) или закрытие соединения - отмена
+        cancel_signal = asyncio.create_task(reader.readline())
+        try:
+            await asyncio.wait({task, cancel_signal}, return_when=asyncio.FIRST_COMPLETED)
+            if not task.done():
+                logger.info(f"⏹️ Задача {job_id} отменена ботом")
+                task.cancel()
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                self.stats["cancelled"] += 1
+                await send({"event": "cancelled", "job_id": job_id})
+                return
+            except Exception as e:
+                logger.error(f"❌ Задача {job_id}: {e}", exc_info=True)
+                self.stats["failed"] += 1
+                await send({"event": "error", "job_id": job_id, "message": str(e)})
+                return
+            self.stats["completed"] += 1
+            self._jobs.pop(job_id, None)
+            await send({"event": "result", "job_id": job_id, "result": result, "stats": self.get_stats()})
+            if owner_data.get("refresh") and result.get("refresh_key"):
+                await self._send_refresh(job_id, result, cancel_signal, send)
+        finally:
+            cancel_signal.cancel()
+            self._jobs.pop(job_id, None)
+
+
+    async def _handle_prewarm(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Управление прогревом кэша из бота (/prewarm)"""
+        if not self.prewarm:
+            return {"event": "error", "message": "Прогрев кэша выполняется в процессе скрапера 0"}
+        action = request.get("action", "status")
+        result = None
+        if action == "resume":
+            self.prewarm.resume()
+        elif action == "stop":
+            self.prewarm.stop()
+        elif action == "run":
+            result = await self.prewarm.run_once(force=bool(request.get("force")))
+        elif action != "status":
+            return {"event": "error", "message": f"Неизвестное действие прогрева: {action}"}
+        return {"event": "prewarm", "stats": self.prewarm.get_stats(), "result": result}
+
+    async def _send_refresh(self, job_id: str, result: Dict[str, Any], cancel_signal: asyncio.Task, send):
+        """Результат фонового обновления кэша (пока бот не закрыл соединение)"""
+        refresh = asyncio.create_task(self.data_collection.wait_for_refresh(result))
+        try:
+            await asyncio.wait({refresh, cancel_signal}, return_when=asyncio.FIRST_COMPLETED)
+            if refresh.done():
+                await send({"event": "refreshed", "job_id": job_id, "result": refresh.result()})
+        finally:
+            refresh.cancel()
+
+
+async def serve(socket_path: str, index: int):
+    """Сервисы сбора данных процесса и сервер до SIGTERM/SIGINT"""
+    from app.config.config import config
+    from app.database.database import database
+    from app.database.repositories.category_repo import CategoryRepository
+    from app.database.repositories.snapshot_repo import SnapshotRepository
+    from app.services import MPStatsService
+    from app.services.openai_service import OpenAIService
+    from app.services.content_service import ContentService
+    from app.services.prompt_service import PromptService
+    from app.services.mpstats_scraper_service import MPStatsScraperService
+    from app.services.data_collection_service import DataCollectionService
+    from app.services.keyword_prewarm_service import KeywordPrewarmService
+
+    database.connect()
+
+    openai_service = OpenAIService()
+    scraper_service = MPStatsScraperService(config)
+    scraper_service.start_driver_pool()
+    data_collection_service = DataCollectionService(
+        config=config,
+        scraper_service=scraper_service,
+        services={
+            'openai': openai_service,
+            'prompt': PromptService(),
+            'content': ContentService(MPStatsService(), openai_service)
+        }
+    )
+
+    # Ночной прогрев кэша - в первом процессе (кэш общий, в БД)
+    prewarm_service = None
+    if index == 0:
+        prewarm_service = KeywordPrewarmService(
+            config=config,
+            data_collection=data_collection_service,
+            category_repo=CategoryRepository(),
+            snapshot_repo=SnapshotRepository()
+        )
+        prewarm_service.start()
+
+    server = ScraperWorkerServer(data_collection_service, scraper_service, socket_path, prewarm=prewarm_service)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        await server.start()
+        await stop_event.wait()
+        logger.info(f"🛑 Процесс скрапера {index} останавливается")
+    finally:
+        await server.close()
+        if prewarm_service:
+            await prewarm_service.shutdown()
+        await data_collection_service.close()
+        logger.info(f"Data collection stats: {data_collection_service.get_runtime_stats()}")
+        scraper_service.shutdown()
+        database.close()
+
+
+def main():
+    from app.config.config import config
+    from app.services.chrome_driver_updater import ChromeDriverUpdater
+    from app.utils.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Процесс скрапера MPStats")
+    parser.add_argument("--index", type=int, default=0, help="Номер процесса (сокет scraper-<N>.sock)")
+    parser.add_argument("--socket", help="Путь к Unix сокету (по умолчанию из SCRAPER_WORKER_SOCKET_DIR)")
+    parser.add_argument("--no-driver-update", action="store_true",
+                        help="Не проверять ChromeDriver (процесс запущен ботом, драйвер уже проверен)")
+    args = parser.parse_args()
+
+    setup_logging()
+    if not args.no_driver_update:
+        updater = ChromeDriverUpdater()
+        updater.update_once()
+        if config.scraper.driver_background_refresh and args.index == 0:
+            updater.start_background_refresh()
+
+    asyncio.run(serve(args.socket or worker_socket_path(config, args.index), args.index))
+
+
+if __name__ == "__main__":
+    main()
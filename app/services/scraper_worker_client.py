@@ -0,0 +1,367 @@
+# app/services/scraper_worker_client.py
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+import zlib
+from typing import Dict, Any, List, Optional, Set, Union
+
+from app.services.scrape_job_scheduler import JobOwner
+from app.services.scraper_worker import MAX_MESSAGE_BYTES, encode_message, read_message
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperWorkerClient:
+    """
+    Сбор данных в процессах скрапера (см. app/services/scraper_worker.py).
+
+    Интерфейс как у DataCollectionService.collect_keywords_data: обработчики
+    бота не знают, где выполняется скрапинг. Одинаковые запросы направляются
+    в один процесс (по хэшу параметров) - там они объединяются и попадают в
+    кэш памяти; недоступный процесс пропускается.
+    """
+
+    def __init__(self, socket_paths: List[str], connect_timeout: float = 5):
+        """
+        Args:
+            socket_paths: Сокеты процессов скрапера
+            connect_timeout: Сколько ждать сокет процесса (процесс мог только запускаться)
+        """
+        self.socket_paths = socket_paths
+        self.connect_timeout = connect_timeout
+        self._worker_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_task: Optional[asyncio.Task] = None
+        self._refresh_followers: Set[asyncio.Task] = set()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rerouted": 0,
+                      "refreshed": 0}
+
+    async def collect_keywords_data(
+            self,
+            category: str,
+            purpose: Union[str, List[str]] = "",
+            additional_params: List[str] = None,
+            category_description: str = None,
+            owner: Optional[JobOwner] = None
+    ) -> Dict[str, Any]:
+        """Сбор данных в процессе скрапера (аргументы и результат - как у DataCollectionService)"""
+        args = {
+            "category": category,
+            "purpose": purpose,
+            "additional_params": additional_params,
+            "category_description": category_description,
+        }
+        request = {
+            "op": "collect_keywords",
+            "job_id": uuid.uuid4().hex,
+            "args": args,
+            "owner": {"user_id": owner.user_id, "is_admin": owner.is_admin,
+                      "refresh": owner.on_refresh is not None} if owner else {},
+        }
+        self.stats["submitted"] += 1
+
+        last_error = None
+        for path in self._route(json.dumps(args, ensure_ascii=False, sort_keys=True)):
+            try:
+                reader, writer = await self._connect(path)
+            except OSError as e:
+                logger.warning(f"⚠️ Процесс скрапера {path} недоступен: {e}")
+                self.stats["rerouted"] += 1
+                last_error = e
+                continue
+            follow_refresh = False
+            try:
+                result = await self._run_job(path, reader, writer, request, owner)
+                # Данные из устаревшего кэша: обновление придет в этом же соединении
+                follow_refresh = bool(owner and owner.on_refresh and result.get("refresh_key"))
+                if follow_refresh:
+                    follower = asyncio.create_task(self._follow_refresh(reader, writer, owner))
+                    self._refresh_followers.add(follower)
+                    follower.add_done_callback(self._refresh_followers.discard)
+                return result
+            finally:
+                if not follow_refresh:
+                    writer.close()
+
+        self.stats["failed"] += 1
+        return self._error_result(args, f"Процессы скрапера недоступны: {last_error}")
+
+    def _route(self, key: str) -> List[str]:
+        """Процессы в порядке попыток: закрепленный за запросом, затем остальные"""
+        start = zlib.crc32(key.encode("utf-8")) % len(self.socket_paths)
+        return self.socket_paths[start:] + self.socket_paths[:start]
+
+    async def _connect(self, path: str):
+        """Подключение с ожиданием сокета (процесс мог только запускаться или перезапускаться)"""
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return await asyncio.open_unix_connection(path, limit=MAX_MESSAGE_BYTES)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(0.25)
+
+    async def _run_job(self, path: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                       request: Dict[str, Any], owner: Optional[JobOwner]) -> Dict[str, Any]:
+        writer.write(encode_message(request))
+        try:
+            await writer.drain()
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    self.stats["failed"] += 1
+                    return self._error_result(request["args"], "Процесс скрапера прервал задачу")
+
+                event = message.get("event")
+                if event == "progress":
+                    if owner and owner.on_position:
+                        try:
+                            await owner.on_position(message["position"], message["eta"])
+                        except Exception as e:
+                            logger.debug(f"Колбэк позиции в очереди: {e}")
+                elif event == "result":
+                    if message.get("stats"):
+                        self._worker_stats[path] = message["stats"]
+                    self.stats["completed"] += 1
+                    return message["result"]
+                elif event in ("error", "cancelled"):
+                    self.stats["failed"] += 1
+                    return self._error_result(request["args"], message.get("message") or "Задача отменена")
+        except asyncio.CancelledError:
+            # Отмена в боте - отмена в процессе скрапера
+            self.stats["cancelled"] += 1
+            try:
+                writer.write(encode_message({"op": "cancel", "job_id": request["job_id"]}))
+            except Exception:
+                pass
+            raise
+        except (ConnectionError, ValueError) as e:
+            self.stats["failed"] += 1
+            return self._error_result(request["args"], f"Связь с процессом скрапера потеряна: {e}")
+
+    async def _follow_refresh(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, owner: JobOwner):
+        """Ждет результат фонового обновления кэша и передает его владельцу"""
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    return
+                if message.get("event") == "refreshed":
+                    if message.get("result"):
+                        self.stats["refreshed"] += 1
+                        await owner.on_refresh(message["result"])
+                    return
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Обновление результата не получено: {e}")
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось показать обновленные данные: {e}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _error_result(args: Dict[str, Any], message: str) -> Dict[str, Any]:
+        """Результат ошибки в формате DataCollectionService"""
+        purpose = args.get("purpose")
+        return {
+            "status": "error",
+            "message": message,
+            "category": args.get("category"),
+            "purposes": purpose if isinstance(purpose, list) else ([purpose] if purpose else []),
+            "additional_params": args.get("additional_params") or [],
+            "keywords": [],
+            "keywords_preview": []
+        }
+
+    # ---------- Статистика ----------
+
+    async def request(self, path: str, op: str, reply_timeout: Optional[float] = None,
+                      **fields) -> Optional[Dict[str, Any]]:
+        """
+        Служебный запрос к процессу (ping, stats, prewarm); None если процесс недоступен
+
+        Args:
+            reply_timeout: Сколько ждать ответ (по умолчанию connect_timeout, 0 - без ограничения)
+            fields: Поля запроса кроме op
+        """
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(path, limit=MAX_MESSAGE_BYTES), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return None
+        if reply_timeout is None:
+            reply_timeout = self.connect_timeout
+        try:
+            writer.write(encode_message({"op": op, **fields}))
+            await writer.drain()
+            return await asyncio.wait_for(read_message(reader), reply_timeout or None)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return None
+        finally:
+            writer.close()
+
+    def start(self, stats_interval: float = 30):
+        """Фоновое обновление статистики процессов (для /timings и /prewarm)"""
+        if not self._stats_task or self._stats_task.done():
+            self._stats_task = asyncio.create_task(self._refresh_stats_loop(stats_interval))
+
+    async def close(self):
+        if self._stats_task:
+            self._stats_task.cancel()
+            try:
+                await self._stats_task
+            except asyncio.CancelledError:
+                pass
+            self._stats_task = None
+        followers = list(self._refresh_followers)
+        for task in followers:
+            task.cancel()
+        await asyncio.gather(*followers, return_exceptions=True)
+
+    async def _refresh_stats_loop(self, interval: float):
+        while True:
+            for path in self.socket_paths:
+                response = await self.request(path, "stats")
+                if response and response.get("stats"):
+                    self._worker_stats[path] = response["stats"]
+                else:
+                    self._worker_stats.pop(path, None)
+            await asyncio.sleep(interval)
+
+    def get_runtime_stats(self) -> Dict[str, Any]:
+        """
+        Статистика в формате DataCollectionService.get_runtime_stats (по первому
+        отвечающему процессу; разомкнутый автомат любого процесса важнее) и по процессам
+        """
+        workers = [self._worker_stats[path] for path in self.socket_paths if path in self._worker_stats]
+        merged = dict(workers[0]["data_collection"]) if workers else {}
+        for worker in workers:
+            breaker = worker["data_collection"].get("scrape_breaker") or {}
+            if breaker.get("state", "closed") != "closed":
+                merged["scrape_breaker"] = breaker
+                break
+        merged["workers"] = {path: self._worker_stats[path]["worker"] for path in self.socket_paths
+                             if path in self._worker_stats}
+        merged["client"] = dict(self.stats)
+        return merged
+
+    def get_scraper_stats(self) -> Dict[str, Any]:
+        """MPStatsScraperService.get_runtime_stats первого отвечающего процесса"""
+        return self._first_worker_stats("scraper")
+
+    def get_timing_histograms(self) -> Dict[str, Any]:
+        """Гистограммы фаз (timings.get_histograms) первого отвечающего процесса"""
+        return self._first_worker_stats("timings")
+
+    def _first_worker_stats(self, key: str) -> Dict[str, Any]:
+        for path in self.socket_paths:
+            if path in self._worker_stats:
+                return self._worker_stats[path].get(key) or {}
+        return {}
+
+
+class ScraperWorkerPrewarm:
+    """
+    Прогрев кэша в процессе скрапера 0 для /prewarm: методы KeywordPrewarmService,
+    но все - корутины (каждый вызов - запрос к процессу)
+    """
+
+    def __init__(self, client: ScraperWorkerClient, socket_path: str):
+        self.client = client
+        self.socket_path = socket_path
+
+    async def _call(self, action: str, reply_timeout: Optional[float] = None, **fields) -> Dict[str, Any]:
+        response = await self.client.request(self.socket_path, "prewarm", reply_timeout=reply_timeout,
+                                             action=action, **fields)
+        if not response:
+            raise RuntimeError("Процесс скрапера с прогревом кэша недоступен")
+        if response.get("event") == "error":
+            raise RuntimeError(response.get("message"))
+        return response
+
+    async def resume(self):
+        await self._call("resume")
+
+    async def stop(self):
+        await self._call("stop")
+
+    async def run_once(self, force: bool = False) -> Dict[str, Any]:
+        # Прогон идет десятки минут - ответ ждем без ограничения
+        return (await self._call("run", reply_timeout=0, force=force))["result"]
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return (await self._call("status"))["stats"]
+
+
+class ScraperWorkerSupervisor:
+    """
+    Запуск процессов скрапера из бота и перезапуск упавших (с растущей паузой,
+    если процесс падает сразу после старта)
+    """
+
+    def __init__(self, socket_paths: List[str], restart_delay: float = 5, max_restart_delay: float = 300,
+                 stop_timeout: float = 30):
+        self.socket_paths = socket_paths
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stop_timeout = stop_timeout
+        self._processes: Dict[int, asyncio.subprocess.Process] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.restarts = 0
+
+    def start(self):
+        for index, path in enumerate(self.socket_paths):
+            self._tasks.append(asyncio.create_task(self._supervise(index, path)))
+
+    async def _supervise(self, index: int, path: str):
+        delay = self.restart_delay
+        while not self._stopping:
+            # Драйвер уже проверен ботом при старте (main.py)
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "app.services.scraper_worker",
+                "--index", str(index), "--socket", path, "--no-driver-update",
+                cwd=os.getcwd()
+            )
+            self._processes[index] = process
+            started = time.monotonic()
+            logger.info(f"🧵 Процесс скрапера {index} запущен (pid {process.pid})")
+
+            code = await process.wait()
+            if self._stopping:
+                break
+            # Проработал долго - падение случайное, перезапуск без накопленной паузы
+            if time.monotonic() - started > self.max_restart_delay:
+                delay = self.restart_delay
+            logger.warning(f"⚠️ Процесс скрапера {index} завершился с кодом {code}, перезапуск через {delay:.0f}с")
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def shutdown(self):
+        """SIGTERM процессам (задачи отменяются, Chrome закрывается), по таймауту - kill"""
+        self._stopping = True
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.terminate()
+        for index, process in self._processes.items():
+            try:
+                await asyncio.wait_for(process.wait(), self.stop_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Процесс скрапера {index} не остановился за {self.stop_timeout}с, kill")
+                process.kill()
+                await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "processes": {index: {"pid": process.pid, "alive": process.returncode is None}
+                          for index, process in self._processes.items()},
+            "restarts": self.restarts,
+        }
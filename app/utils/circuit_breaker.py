@@ -0,0 +1,151 @@
+# app/utils/circuit_breaker.py
+import logging
+import time
+from collections import deque
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Автомат разомкнут: вызов отклонен без попытки"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"{name} временно недоступен, повторная попытка через {retry_after:.0f}с")
+
+
+class CircuitBreaker:
+    """
+    Автомат для нестабильного внешнего ресурса (скрапинг MPStats).
+
+    - closed: вызовы проходят; по последним window вызовам считается доля
+      ошибок, таймаутов и медленных успехов. Если она не меньше failure_rate
+      (при хотя бы min_calls вызовах) - автомат размыкается
+    - open: вызовы отклоняются сразу, пока не пройдет open_seconds
+    - half_open: пропускается ровно один пробный вызов. Успех замыкает автомат,
+      ошибка снова размыкает с удвоенной паузой (до max_open_seconds)
+
+    Работает в одном event loop - блокировки не нужны.
+    """
+
+    def __init__(self, name: str, window: int = 10, min_calls: int = 4, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 90, open_seconds: float = 120, max_open_seconds: float = 1800):
+        """
+        Args:
+            name: Имя ресурса (для логов и сообщений)
+            window: Сколько последних вызовов учитывать
+            min_calls: Минимум вызовов в окне для размыкания
+            failure_rate: Доля плохих вызовов для размыкания
+            slow_call_seconds: Успешный вызов дольше этого считается плохим
+            open_seconds: Пауза перед пробным вызовом после первого размыкания
+            max_open_seconds: Потолок паузы при повторных размыканиях
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self._outcomes = deque(maxlen=window)
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._open_for = 0.0
+        self._consecutive_trips = 0
+        self._trial_inflight = False
+        self.stats = {"calls": 0, "failures": 0, "timeouts": 0, "slow": 0, "rejected": 0, "trips": 0, "trials": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == "open" and self.retry_after <= 0:
+            return "half_open"
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Через сколько секунд будет пробный вызов (0 - уже можно)"""
+        if self._state != "open":
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        """Вызов сейчас был бы отклонен (без захвата пробного вызова)"""
+        state = self.state
+        return state == "open" or (state == "half_open" and self._trial_inflight)
+
+    def allow(self) -> bool:
+        """
+        Допуск вызова. В half_open первый допущенный вызов - пробный,
+        остальные отклоняются до его результата.
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_inflight:
+            self._state = "half_open"
+            self._trial_inflight = True
+            self.stats["trials"] += 1
+            logger.info(f"🔌 {self.name}: пробный вызов после паузы {self._open_for:.0f}с")
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self, duration: float):
+        self.stats["calls"] += 1
+        if self._state == "half_open":
+            self._close()
+            return
+        slow = duration >= self.slow_call_seconds
+        if slow:
+            self.stats["slow"] += 1
+        self._record(not slow)
+
+    def record_failure(self, duration: float, timeout: bool = False):
+        self.stats["calls"] += 1
+        self.stats["failures"] += 1
+        if timeout:
+            self.stats["timeouts"] += 1
+        if self._state == "half_open":
+            self._open(f"пробный вызов не удался за {duration:.0f}с")
+            return
+        self._record(False)
+
+    def release(self):
+        """Допущенный вызов отменен без результата - пробный вызов снова свободен"""
+        if self._state == "half_open":
+            self._trial_inflight = False
+
+    def _record(self, ok: bool):
+        self._outcomes.append(ok)
+        bad = self._outcomes.count(False)
+        if self._state == "closed" and len(self._outcomes) >= self.min_calls \
+                and bad / len(self._outcomes) >= self.failure_rate:
+            self._open(f"{bad} из {len(self._outcomes)} последних вызовов неудачны или медленны")
+
+    def _open(self, reason: str):
+        self._consecutive_trips += 1
+        self._open_for = min(self.max_open_seconds, self.open_seconds * 2 ** (self._consecutive_trips - 1))
+        self._opened_at = time.monotonic()
+        self._state = "open"
+        self._trial_inflight = False
+        self.stats["trips"] += 1
+        logger.warning(f"🔌 {self.name}: автомат разомкнут ({reason}), пауза {self._open_for:.0f}с")
+
+    def _close(self):
+        self._state = "closed"
+        self._trial_inflight = False
+        self._consecutive_trips = 0
+        self._outcomes.clear()
+        logger.info(f"🔌 {self.name}: пробный вызов успешен, автомат замкнут")
+
+    def get_stats(self) -> Dict[str, Any]:
+        bad = self._outcomes.count(False)
+        return {
+            **self.stats,
+            "state": self.state,
+            "retry_after": round(self.retry_after),
+            "window_bad": bad,
+            "window_calls": len(self._outcomes),
+        }
@@ -0,0 +1,203 @@
+# app/utils/job_timing.py
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограммы (секунды)
+HISTOGRAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, float("inf"))
+
+
+class JobTimeline:
+    """Замеры фаз одной задачи сбора данных"""
+
+    def __init__(self, kind: str, meta: Dict[str, Any]):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.meta = meta
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+        # Итог задачи, если она возвращает ошибку результатом, а не исключением
+        self.status: Optional[str] = None
+        # Прочие показатели задачи (например, пиковая память Chrome)
+        self.metrics: Dict[str, Any] = {}
+
+    def add(self, name: str, started: float, duration: float, ok: bool, meta: Dict[str, Any]):
+        span = {
+            "name": name,
+            "offset": round(started - self._started, 3),
+            "duration": round(duration, 3),
+            "ok": ok,
+        }
+        if meta:
+            span["meta"] = meta
+        with self._lock:
+            self.spans.append(span)
+
+    def to_record(self, status: str) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["offset"])
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total": round(time.perf_counter() - self._started, 3),
+            "status": status,
+            "meta": self.meta,
+            "metrics": dict(self.metrics),
+            "spans": spans,
+        }
+
+
+class _Histogram:
+    def __init__(self, history: int = 500):
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=history)
+
+    def observe(self, duration: float, ok: bool):
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.recent.append(duration)
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.recent)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": values[len(values) // 2] if values else 0.0,
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))] if values else 0.0,
+            "max": self.max,
+            "buckets": {
+                ("inf" if bound == float("inf") else str(bound)): n
+                for bound, n in zip(HISTOGRAM_BUCKETS, self.buckets)
+            },
+        }
+
+
+class PipelineTimings:
+    """
+    Замеры фаз конвейера сбора данных.
+
+    - job(): задача (например, один "Собрать данные"); фазы внутри нее попадают в ее запись
+    - span(): фаза; работает в корутинах и в потоках скрапера (контекст задачи
+      передается через contextvars)
+    - гистограммы по фазам копятся за все время работы процесса
+    - запись каждой задачи пишется в лог и в JSONL файл
+    """
+
+    def __init__(self, records_file: Optional[str] = None, history: int = 200):
+        self.records_file = records_file
+        self._current: contextvars.ContextVar[Optional[JobTimeline]] = contextvars.ContextVar(
+            "pipeline_job", default=None
+        )
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = defaultdict(_Histogram)
+        self._records = deque(maxlen=history)
+
+    @contextmanager
+    def job(self, kind: str, **meta):
+        """Задача, в которую собираются все фазы, выполненные внутри"""
+        timeline = JobTimeline(kind, meta)
+        token = self._current.set(timeline)
+        status = "success"
+        try:
+            yield timeline
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self._current.reset(token)
+            if status == "success" and timeline.status:
+                status = timeline.status
+            record = timeline.to_record(status)
+            self.observe(f"job:{kind}", record["total"], status == "success")
+            self._store(record)
+
+    @contextmanager
+    def span(self, name: str, **meta):
+        """Фаза задачи"""
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield meta
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, ok=ok, started=started, **meta)
+
+    def record(self, name: str, duration: float, ok: bool = True, started: Optional[float] = None, **meta):
+        """Учитывает уже измеренную фазу (например, ожидание в очереди)"""
+        self.observe(name, duration, ok)
+        timeline = self._current.get()
+        if timeline:
+            timeline.add(name, started if started is not None else time.perf_counter() - duration,
+                         duration, ok, meta)
+
+    def record_metric(self, name: str, value: Any):
+        """Показатель текущей задачи, не являющийся длительностью"""
+        timeline = self._current.get()
+        if timeline:
+            timeline.metrics[name] = value
+
+    def observe(self, name: str, duration: float, ok: bool = True):
+        with self._lock:
+            self._histograms[name].observe(duration, ok)
+
+    @property
+    def current_job_id(self) -> Optional[str]:
+        timeline = self._current.get()
+        return timeline.job_id if timeline else None
+
+    def _store(self, record: Dict[str, Any]):
+        with self._lock:
+            self._records.append(record)
+        phases = ", ".join(f"{s['name']}={s['duration']:.2f}" for s in record["spans"])
+        logger.info(f"⏱️ Задача {record['kind']} #{record['job_id']}: {record['total']:.2f}с [{phases}]")
+
+        if self.records_file:
+            try:
+                os.makedirs(os.path.dirname(self.records_file), exist_ok=True)
+                with open(self.records_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"Не удалось записать замеры задачи: {e}")
+
+    def get_histograms(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def get_recent_jobs(self, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records)[-limit:][::-1]
+
+
+def _default_records_file() -> str:
+    from app.config.config import config
+    return os.path.join(config.paths.logs_dir, "pipeline_timings.jsonl")
+
+
+timings = PipelineTimings(records_file=_default_records_file())
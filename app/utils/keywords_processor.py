@@ -2,7 +2,7 @@
 import os
 import json
 import pandas as pd
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Iterable
 from pathlib import Path
 import logging
 import re
@@ -43,6 +43,66 @@ class KeywordsProcessor:
             f"target_column={target_column}, auto_delete_json={auto_delete_json}, "
             f"keywords_dir={self.keywords_dir})")
 
+    def filter_keywords(self, values: Iterable[Any], limit: int = 100) -> List[str]:
+        """
+        Фильтрует значения столбца "Слова": убирает цифры, технические коды
+        и слова без русских букв. Источник значений не важен (Excel, JSON, DOM).
+
+        Args:
+            values: Исходные значения
+            limit: Максимум ключевых слов до удаления дубликатов
+
+        Returns:
+            Уникальные отсортированные ключевые слова
+        """
+        values = list(values)
+        filtered_keywords = []
+
+        for word in values:
+            word_str = str(word).strip()
+
+            # ИГНОРИРУЕМ:
+            # 1. Чистые цифры (2020, 30, 5055 и т.д.)
+            if word_str.isdigit():
+                continue
+
+            # 2. Цифры с суффиксами (20201000, 60шт, 70х77)
+            if re.match(r'^\d+[штх\.,]?\d*$', word_str):
+                continue
+
+            # 3. Слишком короткие слова (меньше 2 букв)
+            # Сначала удаляем все не-буквы для проверки длины
+            letters_only = re.sub(r'[^а-яА-Яa-zA-Z]', '', word_str)
+            if len(letters_only) < 2:
+                continue
+
+            # 4. Технические коды (только цифры и символы)
+            if not any(c.isalpha() for c in word_str):
+                continue
+
+            # 5. Проверяем, что есть хотя бы одна русская буква
+            if not re.search(r'[а-яА-Я]', word_str):
+                continue
+
+            # Если слово прошло все фильтры - добавляем
+            filtered_keywords.append(word_str)
+
+            # ОГРАНИЧИВАЕМ количество ключевых слов
+            if len(filtered_keywords) >= limit:
+                self.logger.info(f"📊 Достигнут лимит в {limit} ключевых слов")
+                break
+
+        # Удаляем дубликаты
+        unique_keywords = list(set(filtered_keywords))
+        unique_keywords.sort()  # Сортируем для удобства
+
+        self.logger.info(f"📊 После фильтрации:")
+        self.logger.info(f"  - Исходно: {len(values)} значений")
+        self.logger.info(f"  - После фильтрации: {len(filtered_keywords)}")
+        self.logger.info(f"  - Уникальных: {len(unique_keywords)}")
+
+        return unique_keywords
+
     def extract_keywords_from_sheet(self, df: pd.DataFrame, sheet_name: str) -> List[str]:
         """
         Извлекает уникальные ключевые слова из ПЕРВОГО столбца таблицы
@@ -73,50 +133,7 @@ class KeywordsProcessor:
                     self.logger.info(f"  {i + 1}. '{val}'")
 
             # 4. ФИЛЬТРАЦИЯ: удаляем цифры, технические данные и не-слова
-            filtered_keywords = []
-
-            for word in column_values:
-                word_str = str(word).strip()
-
-                # ИГНОРИРУЕМ:
-                # 1. Чистые цифры (2020, 30, 5055 и т.д.)
-                if word_str.isdigit():
-                    continue
-
-                # 2. Цифры с суффиксами (20201000, 60шт, 70х77)
-                if re.match(r'^\d+[штх\.,]?\d*$', word_str):
-                    continue
-
-                # 3. Слишком короткие слова (меньше 2 букв)
-                # Сначала удаляем все не-буквы для проверки длины
-                letters_only = re.sub(r'[^а-яА-Яa-zA-Z]', '', word_str)
-                if len(letters_only) < 2:
-                    continue
-
-                # 4. Технические коды (только цифры и символы)
-                if not any(c.isalpha() for c in word_str):
-                    continue
-
-                # 5. Проверяем, что есть хотя бы одна русская буква
-                if not re.search(r'[а-яА-Я]', word_str):
-                    continue
-
-                # Если слово прошло все фильтры - добавляем
-                filtered_keywords.append(word_str)
-
-                # ОГРАНИЧИВАЕМ до 100 ключевых слов
-                if len(filtered_keywords) >= 100:
-                    self.logger.info(f"📊 Достигнут лимит в 100 ключевых слов")
-                    break
-
-            # 5. Удаляем дубликаты
-            unique_keywords = list(set(filtered_keywords))
-            unique_keywords.sort()  # Сортируем для удобства
-
-            self.logger.info(f"📊 После фильтрации:")
-            self.logger.info(f"  - Исходно: {len(column_values)} значений")
-            self.logger.info(f"  - После фильтрации: {len(filtered_keywords)}")
-            self.logger.info(f"  - Уникальных: {len(unique_keywords)}")
+            unique_keywords = self.filter_keywords(column_values)
 
             # 6. Показываем результат фильтрации
             if unique_keywords:
@@ -133,6 +150,50 @@ class KeywordsProcessor:
             self.logger.exception("Подробности ошибки:")
             return keywords
 
+    def extract_keywords_from_excel(self, excel_path: str, max_keywords: int = 200) -> List[str]:
+        """
+        Извлекает ключевые слова из всех листов Excel файла без записи JSON
+
+        Args:
+            excel_path: Путь к Excel файлу
+            max_keywords: Максимальное количество ключевых слов
+
+        Returns:
+            Уникальные отсортированные ключевые слова
+        """
+        # Загружаем Excel файл
+        excel_data = pd.read_excel(excel_path, sheet_name=None)
+        sheet_names = list(excel_data.keys())
+        self.logger.info(f"📑 Листы в файле: {sheet_names}")
+
+        all_keywords = []
+
+        for sheet_name, df in excel_data.items():
+            self.logger.info(f"📊 Лист '{sheet_name}': {df.shape[0]} строк, {df.shape[1]} столбцов")
+            self.logger.info(f"📊 Столбцы: {list(df.columns)}")
+
+            # Показываем первые 3 строки первого столбца для отладки
+            if len(df) > 0:
+                self.logger.info(f"📊 Первые 5 строк ПЕРВОГО столбца:")
+                for i in range(min(5, len(df))):
+                    first_col_value = str(df.iloc[i, 0]) if pd.notna(df.iloc[i, 0]) else "ПУСТО"
+                    self.logger.info(f"  Строка {i}: '{first_col_value}'")
+
+            # Извлекаем ключевые слова из этого листа
+            sheet_keywords = self.extract_keywords_from_sheet(df, sheet_name)
+            all_keywords.extend(sheet_keywords)
+
+        # Удаляем дубликаты на уровне всего файла
+        unique_keywords = list(set(all_keywords))
+        unique_keywords.sort()
+
+        # Ограничиваем количество (если нужно)
+        if len(unique_keywords) > max_keywords:
+            self.logger.info(f"📊 Ограничиваю до {max_keywords} ключевых слов")
+            unique_keywords = unique_keywords[:max_keywords]
+
+        return unique_keywords
+
     def convert_xlsx_to_json(self, excel_path: str, json_path: Optional[str] = None,
                              auto_delete: bool = False) -> str:
         """
@@ -146,37 +207,7 @@ class KeywordsProcessor:
             if not os.path.exists(excel_path):
                 raise FileNotFoundError(f"Файл не найден: {excel_path}")
 
-            # Загружаем Excel файл
-            excel_data = pd.read_excel(excel_path, sheet_name=None)
-            sheet_names = list(excel_data.keys())
-            self.logger.info(f"📑 Листы в файле: {sheet_names}")
-
-            all_keywords = []
-
-            for sheet_name, df in excel_data.items():
-                self.logger.info(f"📊 Лист '{sheet_name}': {df.shape[0]} строк, {df.shape[1]} столбцов")
-                self.logger.info(f"📊 Столбцы: {list(df.columns)}")
-
-                # Показываем первые 3 строки первого столбца для отладки
-                if len(df) > 0:
-                    self.logger.info(f"📊 Первые 5 строк ПЕРВОГО столбца:")
-                    for i in range(min(5, len(df))):
-                        first_col_value = str(df.iloc[i, 0]) if pd.notna(df.iloc[i, 0]) else "ПУСТО"
-                        self.logger.info(f"  Строка {i}: '{first_col_value}'")
-
-                # Извлекаем ключевые слова из этого листа
-                sheet_keywords = self.extract_keywords_from_sheet(df, sheet_name)
-                all_keywords.extend(sheet_keywords)
-
-            # Удаляем дубликаты на уровне всего файла
-            unique_keywords = list(set(all_keywords))
-            unique_keywords.sort()
-
-            # Ограничиваем количество (если нужно)
-            max_keywords = 200
-            if len(unique_keywords) > max_keywords:
-                self.logger.info(f"📊 Ограничиваю до {max_keywords} ключевых слов")
-                unique_keywords = unique_keywords[:max_keywords]
+            unique_keywords = self.extract_keywords_from_excel(excel_path)
 
             # Подготовка JSON данных
             json_data = {
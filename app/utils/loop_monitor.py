@@ -0,0 +1,69 @@
+# app/utils/loop_monitor.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """
+    Измеряет задержку event loop: насколько позже запланированного
+    просыпается корутина, спящая фиксированный интервал.
+    Любой блокирующий вызов в loop сразу виден как рост задержки.
+    """
+
+    def __init__(self, interval: float = 0.5, warn_threshold: float = 0.3, window: int = 600):
+        """
+        Args:
+            interval: Интервал замера (секунды)
+            warn_threshold: Порог задержки для предупреждения в логе (секунды)
+            window: Количество последних замеров для статистики
+        """
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._samples = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+
+    def start(self):
+        """Запускает фоновую задачу замера"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📈 Мониторинг задержки event loop запущен (интервал {self.interval}с)")
+
+    async def stop(self):
+        """Останавливает фоновую задачу"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.warn_threshold:
+                logger.warning(f"⚠️ Event loop заблокирован на {lag:.3f}с")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Статистика по последним замерам (секунды)"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "last": 0.0, "p50": 0.0, "p95": 0.0, "max": self.max_lag}
+        return {
+            "samples": len(samples),
+            "last": self._samples[-1],
+            "p50": samples[len(samples) // 2],
+            "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max": self.max_lag,
+        }
@@ -0,0 +1,16 @@
+# app/utils/purpose_names.py
+from typing import List
+
+# Назначения из Category.purposes (id) в том виде, в каком они уходят в запрос MPStats
+PURPOSE_QUERY_NAMES = {
+    "wood": "под дерево", "with_pattern": "с рисунком", "kitchen": "кухня",
+    "tile": "плитка", "3d": "3D", "in_roll": "в рулоне",
+    "self_adhesive": "самоклеящиеся", "stone": "под камень", "bathroom": "ванная",
+    "bedroom": "спальня", "brick": "под кирпич", "marble": "под мрамор",
+    "living_room": "гостиная", "white": "белый"
+}
+
+
+def translate_purposes(purposes: List[str]) -> List[str]:
+    """Переводит id назначений на русский перед передачей в MPStats"""
+    return [PURPOSE_QUERY_NAMES.get(str(p).lower(), str(p)) for p in purposes]
@@ -3,8 +3,12 @@ Selenium tools package for web automation.
 """
 
 from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+from app.utils.selenium_tools.driver_pool import ChromeDriverPool, DriverPoolTimeout
+from app.utils.selenium_tools.download_tracker import CDPDownloadTracker, CDPSession
+from app.utils.selenium_tools.network_profile import NetworkProfile
 
 
 
 __version__ = "1.0.0"
-__all__ = ['ChromeDriverManager']
\ No newline at end of file
+__all__ = ['ChromeDriverManager', 'ChromeDriverPool', 'DriverPoolTimeout', 'CDPDownloadTracker', 'CDPSession',
+           'NetworkProfile']
\ No newline at end of file
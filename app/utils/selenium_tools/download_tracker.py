@@ -0,0 +1,290 @@
+# app/utils/selenium_tools/download_tracker.py
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from typing import Dict, Any, List, Optional, Tuple
+
+from selenium import webdriver
+
+try:
+    import websocket
+
+    HAS_WEBSOCKET = True
+except ImportError:
+    HAS_WEBSOCKET = False
+    logging.warning("websocket-client not installed. CDP download tracking disabled.")
+
+logger = logging.getLogger(__name__)
+
+
+class CDPSession:
+    """
+    Минимальное browser-level подключение к Chrome DevTools Protocol.
+
+    execute_cdp_cmd в Selenium умеет только отправлять команды, а события
+    (Browser.downloadProgress и т.п.) приходят только по websocket отладчика.
+    """
+
+    def __init__(self, driver: webdriver.Chrome, connect_timeout: float = 5, target: str = "browser",
+                 target_id: Optional[str] = None):
+        """
+        Args:
+            driver: Chrome WebDriver
+            connect_timeout: Таймаут подключения (секунды)
+            target: "browser" - подключение ко всему браузеру, "page" - к вкладке
+            target_id: Id вкладки для target="page" (по умолчанию первая вкладка)
+        """
+        debugger_address = driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+        if not debugger_address:
+            raise RuntimeError("Драйвер не сообщает debuggerAddress (удаленный драйвер?)")
+        if not HAS_WEBSOCKET:
+            raise RuntimeError("websocket-client не установлен")
+
+        if target == "page" and target_id:
+            ws_url = f"ws://{debugger_address}/devtools/page/{target_id}"
+        elif target == "page":
+            with urllib.request.urlopen(f"http://{debugger_address}/json/list", timeout=connect_timeout) as resp:
+                pages = [t for t in json.loads(resp.read().decode()) if t.get("type") == "page"]
+            if not pages:
+                raise RuntimeError("Нет открытых вкладок для подключения CDP")
+            ws_url = pages[0]["webSocketDebuggerUrl"]
+        else:
+            with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=connect_timeout) as resp:
+                ws_url = json.loads(resp.read().decode())["webSocketDebuggerUrl"]
+
+        self._ws = websocket.create_connection(ws_url, timeout=connect_timeout, suppress_origin=True)
+        self._ws.settimeout(0.5)
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._responses: Dict[int, Dict[str, Any]] = {}
+        self._ignored_ids = set()
+        self._condition = threading.Condition()
+        self._listeners = []
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="cdp-reader", daemon=True)
+        self._reader.start()
+
+    def add_listener(self, callback):
+        """Подписка на все события: callback(method, params)"""
+        self._listeners.append(callback)
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10) -> Dict[str, Any]:
+        """Отправляет команду CDP и ждет ответ"""
+        message_id = self._send_message(method, params)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while message_id not in self._responses:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    raise TimeoutError(f"CDP: нет ответа на {method}")
+                self._condition.wait(remaining)
+            response = self._responses.pop(message_id)
+        if "error" in response:
+            raise RuntimeError(f"CDP {method}: {response['error']}")
+        return response.get("result", {})
+
+    def post(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Отправляет команду без ожидания ответа.
+        Единственный безопасный способ отвечать на события из listener'а:
+        listener выполняется в потоке чтения, и send() в нем зависнет.
+        """
+        message_id = self._send_message(method, params)
+        with self._condition:
+            if self._responses.pop(message_id, None) is None:
+                self._ignored_ids.add(message_id)
+
+    def _send_message(self, method: str, params: Optional[Dict[str, Any]]) -> int:
+        message_id = next(self._ids)
+        with self._send_lock:
+            self._ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        return message_id
+
+    def _read_loop(self):
+        while not self._closed:
+            try:
+                raw = self._ws.recv()
+            except websocket.WebSocketTimeoutException:
+                continue
+            except Exception:
+                break
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+
+            if "id" in message:
+                with self._condition:
+                    if message["id"] in self._ignored_ids:
+                        self._ignored_ids.discard(message["id"])
+                        if "error" in message:
+                            logger.debug(f"CDP error: {message['error']}")
+                        continue
+                    self._responses[message["id"]] = message
+                    self._condition.notify_all()
+            elif "method" in message:
+                for callback in self._listeners:
+                    try:
+                        callback(message["method"], message.get("params", {}))
+                    except Exception as e:
+                        logger.debug(f"CDP listener error: {e}")
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def close(self):
+        self._closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+class CDPDownloadTracker:
+    """
+    Скачивание в отдельную директорию задачи с отслеживанием завершения
+    по событиям Browser.downloadWillBegin / Browser.downloadProgress.
+
+    Файлы сохраняются под GUID (allowAndName), поэтому каждое скачивание
+    однозначно относится к своей задаче; после завершения файл
+    переименовывается в имя, предложенное сайтом.
+
+    Для нескольких вкладок одного браузера (TabBrowser) трекер общий:
+    скачивание относится к вкладке по frameId из Browser.downloadWillBegin,
+    а wait_for_completed с frame_id переносит файл в директорию задачи.
+    """
+
+    def __init__(self, driver: webdriver.Chrome, download_dir: str):
+        self.driver = driver
+        self.download_dir = os.path.abspath(download_dir)
+        self._session: Optional[CDPSession] = None
+        self._condition = threading.Condition()
+        self._downloads: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> bool:
+        """
+        Подключается к CDP и направляет скачивания в директорию задачи.
+
+        Returns:
+            True если события CDP доступны, False если нужно откатиться на опрос директории
+        """
+        os.makedirs(self.download_dir, exist_ok=True)
+        try:
+            self._session = CDPSession(self.driver)
+            self._session.add_listener(self._on_event)
+            self._session.send("Browser.setDownloadBehavior", {
+                "behavior": "allowAndName",
+                "downloadPath": self.download_dir,
+                "eventsEnabled": True,
+            })
+            logger.info(f"📥 CDP отслеживание скачиваний: {self.download_dir}")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ CDP события недоступны ({e}), скачивание через Page.setDownloadBehavior")
+            self.stop()
+            # Без событий все равно направляем файлы в директорию задачи
+            try:
+                self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+                    "behavior": "allow",
+                    "downloadPath": self.download_dir,
+                })
+            except Exception as cdp_error:
+                logger.warning(f"Не удалось задать директорию скачивания: {cdp_error}")
+            return False
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def _on_event(self, method: str, params: Dict[str, Any]):
+        if method == "Browser.downloadWillBegin":
+            with self._condition:
+                self._downloads[params["guid"]] = {
+                    "url": params.get("url"),
+                    "frame_id": params.get("frameId"),
+                    "started_at": time.monotonic(),
+                    "suggested_filename": params.get("suggestedFilename") or params["guid"],
+                    "state": "inProgress",
+                    "received": 0,
+                    "total": 0,
+                }
+            logger.info(f"📥 Начато скачивание: {params.get('suggestedFilename')}")
+        elif method == "Browser.downloadProgress":
+            with self._condition:
+                info = self._downloads.setdefault(params["guid"], {
+                    "suggested_filename": params["guid"], "state": "inProgress"
+                })
+                info["state"] = params.get("state", info["state"])
+                info["received"] = params.get("receivedBytes", 0)
+                info["total"] = params.get("totalBytes", 0)
+                if params.get("filePath"):
+                    info["file_path"] = params["filePath"]
+                if info["state"] != "inProgress":
+                    self._condition.notify_all()
+
+    def wait_for_completed(self, count: int = 1, timeout: float = 120,
+                           suffixes: Tuple[str, ...] = ('.xlsx', '.xls'), frame_id: Optional[str] = None,
+                           started_after: float = 0.0, target_dir: Optional[str] = None) -> List[str]:
+        """
+        Ждет завершения count скачиваний с нужным расширением.
+
+        Args:
+            frame_id: Учитывать только скачивания этой вкладки (id ее target)
+            started_after: Учитывать только скачивания, начатые позже (time.monotonic())
+            target_dir: Куда перенести готовые файлы (по умолчанию download_dir)
+
+        Returns:
+            Пути к готовым файлам (может быть меньше count при таймауте)
+        """
+        def own(info):
+            return (frame_id is None or info.get("frame_id") == frame_id) \
+                and info.get("started_at", 0.0) >= started_after and not info.get("final_path")
+
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                downloads = {guid: info for guid, info in self._downloads.items() if own(info)}
+                completed = [
+                    (guid, info) for guid, info in downloads.items()
+                    if info["state"] == "completed"
+                    and info["suggested_filename"].lower().endswith(suffixes)
+                ]
+                pending = [info for info in downloads.values() if info["state"] == "inProgress"]
+                remaining = deadline - time.monotonic()
+                if len(completed) >= count or remaining <= 0:
+                    break
+                if not pending and downloads and all(
+                        info["state"] == "canceled" for info in downloads.values()):
+                    logger.warning("⚠️ Все скачивания отменены браузером")
+                    break
+                self._condition.wait(min(remaining, 1.0))
+
+        return [self._finalize(guid, info, target_dir) for guid, info in completed]
+
+    def _finalize(self, guid: str, info: Dict[str, Any], target_dir: Optional[str] = None) -> str:
+        """Переименовывает файл из GUID в предложенное сайтом имя"""
+        if info.get("final_path"):
+            return info["final_path"]
+        source = info.get("file_path") or os.path.join(self.download_dir, guid)
+        target = os.path.join(target_dir or self.download_dir, info["suggested_filename"])
+        if os.path.exists(target):
+            base, ext = os.path.splitext(target)
+            target = f"{base}_{guid[:8]}{ext}"
+        try:
+            os.replace(source, target)
+        except OSError as e:
+            logger.warning(f"Не удалось переименовать {source}: {e}")
+            target = source
+        info["final_path"] = target
+        return target
+
+    def stop(self):
+        """Отключается от CDP"""
+        if self._session:
+            self._session.close()
+            self._session = None
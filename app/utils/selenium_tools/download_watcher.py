@@ -0,0 +1,218 @@
+# app/utils/selenium_tools/download_watcher.py
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from typing import Optional, Tuple
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    _libc.inotify_init1
+    _libc.inotify_add_watch
+
+    HAS_INOTIFY = True
+except (OSError, AttributeError):
+    _libc = None
+    HAS_INOTIFY = False
+    logging.warning("inotify not available. Download watching falls back to directory polling.")
+
+logger = logging.getLogger(__name__)
+
+# linux/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+# struct inotify_event: int wd; uint32 mask, cookie, len; char name[len]
+_EVENT_HEADER = struct.Struct("iIII")
+
+PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+
+class DownloadWatcher:
+    """
+    Ожидание скачанного файла в директории задачи по событиям inotify.
+
+    Chrome пишет файл как "<имя>.crdownload" и переименовывает его в конечное
+    имя, когда скачивание завершено, поэтому готовность файла - это событие
+    IN_MOVED_TO (или IN_CLOSE_WRITE, если файл записан сразу под своим именем).
+    Ни опроса раз в секунду, ни эвристики по размеру файла.
+
+    Наблюдение нужно начать (start) до клика по кнопке скачивания, чтобы не
+    пропустить событие. Без inotify (не Linux) ожидание опрашивает директорию.
+    """
+
+    def __init__(self, download_dir: str, suffixes: Tuple[str, ...] = (".xlsx", ".xls"),
+                 poll_interval: float = 0.5):
+        """
+        Args:
+            download_dir: Директория скачивания задачи
+            suffixes: Расширения ожидаемых файлов
+            poll_interval: Период опроса без inotify (секунды)
+        """
+        self.download_dir = os.path.abspath(download_dir)
+        self.suffixes = suffixes
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    def start(self) -> bool:
+        """
+        Начинает наблюдение за директорией.
+
+        Returns:
+            True если события inotify доступны, False если ожидание будет опросом
+        """
+        os.makedirs(self.download_dir, exist_ok=True)
+        if not HAS_INOTIFY:
+            return False
+
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"⚠️ inotify_init1: {os.strerror(ctypes.get_errno())}, ожидание скачивания опросом")
+            return False
+        if _libc.inotify_add_watch(fd, os.fsencode(self.download_dir), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            logger.warning(f"⚠️ inotify_add_watch: {os.strerror(ctypes.get_errno())}, ожидание скачивания опросом")
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        return True
+
+    @property
+    def active(self) -> bool:
+        return self._fd is not None
+
+    def close(self):
+        """Прекращает наблюдение"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ---------- Ожидание ----------
+
+    def wait(self, timeout: float = 120) -> Optional[str]:
+        """
+        Ждет готовый файл (блокирует поток - для синхронного кода скрапера)
+
+        Returns:
+            Путь к файлу или None по таймауту
+        """
+        deadline = time.monotonic() + timeout
+        ready = self._scan()
+        while not ready:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self._fd is None:
+                time.sleep(min(self.poll_interval, remaining))
+                ready = self._scan()
+                continue
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if readable:
+                ready = self._read_events()
+        return ready
+
+    async def wait_async(self, timeout: float = 120) -> Optional[str]:
+        """
+        Ждет готовый файл в event loop: дескриптор inotify регистрируется
+        через loop.add_reader, поток не занимается
+
+        Returns:
+            Путь к файлу или None по таймауту
+        """
+        ready = self._scan()
+        if ready:
+            return ready
+
+        loop = asyncio.get_running_loop()
+        if self._fd is None:
+            deadline = loop.time() + timeout
+            while not ready and loop.time() < deadline:
+                await asyncio.sleep(min(self.poll_interval, max(0.0, deadline - loop.time())))
+                ready = self._scan()
+            return ready
+
+        future = loop.create_future()
+
+        def on_readable():
+            try:
+                path = self._read_events()
+            except OSError as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+            if path and not future.done():
+                future.set_result(path)
+
+        loop.add_reader(self._fd, on_readable)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            loop.remove_reader(self._fd)
+
+    # ---------- Внутреннее ----------
+
+    def _is_ready_name(self, name: str) -> bool:
+        lowered = name.lower()
+        return lowered.endswith(self.suffixes) and not lowered.endswith(PARTIAL_SUFFIXES)
+
+    def _ready_path(self, name: str) -> Optional[str]:
+        if not self._is_ready_name(name):
+            return None
+        path = os.path.join(self.download_dir, name)
+        try:
+            return path if os.path.getsize(path) > 0 else None
+        except OSError:
+            return None
+
+    def _scan(self) -> Optional[str]:
+        """Готовый файл, уже лежащий в директории (конечное имя = скачивание завершено)"""
+        try:
+            names = sorted(os.listdir(self.download_dir))
+        except OSError:
+            return None
+        for name in names:
+            path = self._ready_path(name)
+            if path:
+                return path
+        return None
+
+    def _read_events(self) -> Optional[str]:
+        """Разбирает накопленные события, возвращает первый готовый файл"""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return None
+
+        ready = None
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + name_len]
+            offset += _EVENT_HEADER.size + name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # События потеряны - состояние берем из самой директории
+                ready = ready or self._scan()
+                continue
+            name = os.fsdecode(raw_name.rstrip(b"\0"))
+            if name and not ready:
+                ready = self._ready_path(name)
+                if ready:
+                    logger.info(f"📥 Файл готов ({'переименован' if mask & IN_MOVED_TO else 'записан'}): {name}")
+        return ready
@@ -2,13 +2,15 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options as ChromeOptions
-from webdriver_manager.chrome import ChromeDriverManager as WebDriverManager
 from selenium.common.exceptions import TimeoutException
 import os
 import logging
 from typing import Optional
 import json
 from app.services.chrome_driver_updater import ChromeDriverUpdater
+from app.utils.selenium_tools.network_profile import NetworkProfile
+from app.utils.selenium_tools.network_capture import NetworkCapture
+from app.utils.job_timing import timings
 
 try:
     from selenium_stealth import stealth
@@ -20,21 +22,60 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+MEMORY_PROFILES = ("default", "lean")
+
+# Профиль lean: меньше процессов и фоновых сервисов Chrome.
+# Для одной вкладки MPStats изоляция сайтов по процессам не нужна
+LEAN_CHROME_ARGS = [
+    "--renderer-process-limit=2",
+    "--process-per-site",
+    "--disable-site-isolation-trials",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+    # Дисковый кэш нужен сетевому профилю lean (бандлы SPA), но ограничен по размеру
+    "--disk-cache-size=104857600",
+    "--media-cache-size=1",
+    "--aggressive-cache-discard",
+]
+
+LEAN_DISABLED_FEATURES = [
+    "site-per-process", "IsolateOrigins", "Translate", "MediaRouter", "BackForwardCache",
+    "AutofillServerCommunication", "InterestFeedContentSuggestions", "HeavyAdPrivacyMitigations",
+]
+
 
 class ChromeDriverManager:
     """Управление Chrome драйвером с настройками для скачивания файлов, блокировкой медиа и stealth режимом."""
 
-    def __init__(self, headless: bool = True, use_stealth: bool = True):
+    def __init__(self, headless: bool = True, use_stealth: bool = True,
+                 memory_profile: str = "default", js_heap_mb: int = 512):
         """
         Инициализация менеджера Chrome драйвера.
 
         Args:
             headless: Режим без графического интерфейса
             use_stealth: Использовать selenium-stealth для сокрытия автоматизации
+            memory_profile: Профиль памяти Chrome: default или lean
+            js_heap_mb: Лимит JS heap вкладки для профиля lean (MB)
         """
         self.headless = headless
         self.use_stealth = use_stealth and HAS_STEALTH
+        if memory_profile not in MEMORY_PROFILES:
+            logger.warning(f"⚠️ Неизвестный профиль памяти '{memory_profile}', использую 'default'")
+            memory_profile = "default"
+        self.memory_profile = memory_profile
+        self.js_heap_mb = js_heap_mb
         self.driver = None
+        self.network_profile: Optional[NetworkProfile] = None
+        self.request_allowlist = None
         logger.info(f"ChromeDriverManager initialized: headless={headless}, stealth={self.use_stealth}")
         self.use_remote = os.getenv('USE_REMOTE_DRIVER', 'false').lower() == 'true'
         self.remote_url = os.getenv('SELENIUM_REMOTE_URL', 'http://localhost:4444/wd/hub')
@@ -86,7 +127,8 @@ class ChromeDriverManager:
             proxy: Optional[str] = None,
             stealth_options: Optional[dict] = None,
             profile_dir: Optional[str] = None,  # НОВЫЙ ПАРАМЕТР
-            keep_profile: bool = True  # НОВЫЙ ПАРАМЕТР
+            keep_profile: bool = True,  # НОВЫЙ ПАРАМЕТР
+            network_profile: Optional[NetworkProfile] = None
     ) -> webdriver.Chrome:
         """
         Создает и настраивает Chrome драйвер с stealth режимом.
@@ -103,6 +145,7 @@ class ChromeDriverManager:
             stealth_options: Дополнительные настройки stealth
             profile_dir: Путь к директории профиля Chrome
             keep_profile: Сохранять профиль между запусками
+            network_profile: Профиль сетевых блокировок (None - только медиа, как раньше)
 
         Returns:
             Настроенный Chrome WebDriver
@@ -119,6 +162,8 @@ class ChromeDriverManager:
         # Гарантируем, что директория существует
         os.makedirs(download_dir, exist_ok=True)
 
+        self.network_profile = network_profile
+
         # СОХРАНЯЕМ путь в атрибуте класса
         self.download_dir = download_dir
         self.last_download_dir = download_dir
@@ -158,11 +203,13 @@ class ChromeDriverManager:
             keep_profile=keep_profile  # НОВЫЙ ПАРАМЕТР
         )
 
-        driver = self._create_driver_with_options(chrome_options)
+        with timings.span("driver_create"):
+            driver = self._create_driver_with_options(chrome_options)
 
         # Применяем stealth режим
         if self.use_stealth:
-            driver = self._apply_stealth_mode(driver, stealth_options)
+            with timings.span("stealth"):
+                driver = self._apply_stealth_mode(driver, stealth_options)
 
         return driver
 
@@ -180,6 +227,8 @@ class ChromeDriverManager:
             keep_profile: bool = True  # НОВЫЙ ПАРАМЕТР
     ) -> ChromeOptions:
         chrome_options = ChromeOptions()
+        # Chrome учитывает только последний --disable-features, поэтому список собирается в один флаг
+        disabled_features = []
 
         # Базовые флаги для работы в контейнере
         chrome_options.add_argument("--headless=new")
@@ -187,7 +236,8 @@ class ChromeDriverManager:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--remote-debugging-port=9222")
+        # Порт отладчика не фиксируем: chromedriver выберет свободный и вернет его
+        # в capabilities (debuggerAddress), иначе параллельные браузеры конфликтуют
 
         # ИСПРАВЛЕНО: Добавляем путь к профилю
         chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
@@ -199,10 +249,10 @@ class ChromeDriverManager:
         if keep_profile:
             # Эти флаги помогают сохранять куки и сессии
             chrome_options.add_argument("--disable-session-crashed-bubble")
-            chrome_options.add_argument(
-                "--disable-features=OptimizationGuideModelDownloading,OptimizationHintsFetching,OptimizationTargetPrediction,OptimizationHints")
-            chrome_options.add_argument("--disable-features=TranslateUI")
-            chrome_options.add_argument("--disable-features=ChromeWhatsNewUI")
+            disabled_features += [
+                "OptimizationGuideModelDownloading", "OptimizationHintsFetching",
+                "OptimizationTargetPrediction", "OptimizationHints", "TranslateUI", "ChromeWhatsNewUI",
+            ]
 
             # Сохраняем пароли и автозаполнение
             prefs = {
@@ -238,6 +288,16 @@ class ChromeDriverManager:
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
 
+        if self.memory_profile == "lean":
+            for argument in LEAN_CHROME_ARGS:
+                chrome_options.add_argument(argument)
+            chrome_options.add_argument(f"--js-flags=--max-old-space-size={self.js_heap_mb}")
+            disabled_features += LEAN_DISABLED_FEATURES
+            logger.info(f"🪶 Профиль памяти Chrome 'lean': JS heap до {self.js_heap_mb} MB")
+
+        if disabled_features:
+            chrome_options.add_argument(f"--disable-features={','.join(dict.fromkeys(disabled_features))}")
+
         return chrome_options
 
     def _create_driver_with_options(self, chrome_options: ChromeOptions) -> webdriver.Chrome:
@@ -389,27 +449,31 @@ class ChromeDriverManager:
         except Exception as e:
             logger.warning(f"Не удалось удалить признаки автоматизации: {e}")
 
-    def _configure_devtools(self, driver: webdriver.Chrome):
+    def prepare_tab(self, driver: webdriver.Chrome, stealth_options: Optional[dict] = None):
         """
-        Настраивает DevTools для блокировки медиа запросов.
+        Настраивает дополнительную вкладку уже запущенного браузера так же,
+        как create_driver первую: команды CDP Page/Network действуют на одну вкладку.
+        RequestAllowlist профиля strict остается только у первой вкладки.
+
+        Args:
+            driver: Драйвер, у которого активна новая вкладка (TabDriver)
+            stealth_options: Настройки stealth
         """
-        try:
-            # Используем Chrome DevTools Protocol для блокировки медиа
-            driver.execute_cdp_cmd('Network.setBlockedURLs', {
-                'urls': [
-                    '*.mp4', '*.webm', '*.ogg', '*.avi', '*.mov', '*.wmv',
-                    '*.flv', '*.mkv', '*.m4v', '*.mpg', '*.mpeg',
-                    '*.3gp', '*.swf', '*.flac', '*.wav', '*.mp3',
-                    '*.aac', '*.m4a', '*.gif', '*.webp', '*.apng',
-                    '*.mng',
-                    '*.woff2', '*.ttf', '*.otf',
-                ]
-            })
+        self._configure_devtools(driver, allowlist=False)
+        self._remove_automation_flags(driver)
+        if self.use_stealth:
+            self._apply_stealth_mode(driver, stealth_options)
 
-            # Отключаем кэширование медиа
-            driver.execute_cdp_cmd('Network.setCacheDisabled', {
-                'cacheDisabled': True
-            })
+    def _configure_devtools(self, driver: webdriver.Chrome, allowlist: bool = True):
+        """
+        Настраивает DevTools: блокировка запросов по сетевому профилю.
+        """
+        try:
+            # Блокировка медиа/трекеров и кэш (см. NetworkProfile)
+            profile = self.network_profile or NetworkProfile(name="default")
+            request_allowlist = profile.apply(driver, allowlist=allowlist)
+            if allowlist:
+                self.request_allowlist = request_allowlist
 
             # Устанавливаем эмуляцию сети для ускорения загрузки
             driver.execute_cdp_cmd('Network.emulateNetworkConditions', {
@@ -422,6 +486,75 @@ class ChromeDriverManager:
         except Exception as e:
             logger.warning(f"Не удалось настроить DevTools: {e}")
 
+    @staticmethod
+    def start_network_capture(driver: webdriver.Chrome, url_patterns: list,
+                              max_body_bytes: int = 8 * 1024 * 1024) -> Optional[NetworkCapture]:
+        """
+        Включает захват ответов API вкладки через CDP Network (см. NetworkCapture).
+
+        Returns:
+            Запущенный захват или None (удаленный драйвер, нет websocket-client)
+        """
+        capture = NetworkCapture(driver, url_patterns, max_body_bytes=max_body_bytes)
+        if not capture.start():
+            return None
+        logger.info(f"🛰️ Захват ответов API включен: {', '.join(url_patterns)}")
+        return capture
+
+    @staticmethod
+    def get_process_tree_pids(root_pid: int) -> list:
+        """
+        Возвращает PID процесса и всех его потомков (Linux, через /proc).
+
+        Args:
+            root_pid: PID корневого процесса (chromedriver)
+        """
+        children = {}
+        try:
+            for entry in os.listdir('/proc'):
+                if not entry.isdigit():
+                    continue
+                try:
+                    with open(f'/proc/{entry}/stat', 'r') as f:
+                        stat = f.read()
+                    # Имя процесса в скобках может содержать пробелы
+                    ppid = int(stat.rsplit(')', 1)[1].split()[1])
+                    children.setdefault(ppid, []).append(int(entry))
+                except (OSError, ValueError, IndexError):
+                    continue
+        except OSError:
+            return [root_pid]
+
+        pids, stack = [], [root_pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children.get(pid, []))
+        return pids
+
+    @staticmethod
+    def get_driver_memory_mb(driver: webdriver.Chrome) -> Optional[float]:
+        """
+        Суммарный RSS chromedriver и всех процессов Chrome драйвера в MB.
+        Возвращает None, если посчитать не удалось (не Linux, удаленный драйвер).
+        """
+        try:
+            root_pid = driver.service.process.pid
+        except AttributeError:
+            return None
+
+        total_kb = 0
+        for pid in ChromeDriverManager.get_process_tree_pids(root_pid):
+            try:
+                with open(f'/proc/{pid}/status', 'r') as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            total_kb += int(line.split()[1])
+                            break
+            except (OSError, ValueError):
+                continue
+        return total_kb / 1024 if total_kb else None
+
     def quit(self):
         """Закрывает драйвер."""
         if self.driver:
@@ -0,0 +1,289 @@
+# app/utils/selenium_tools/driver_pool.py
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Any
+
+from selenium import webdriver
+
+from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledDriver:
+    """Драйвер в пуле вместе со служебной информацией"""
+    driver: webdriver.Chrome
+    slot: int
+    created_at: float = field(default_factory=time.time)
+    uses: int = 0
+    last_used_at: float = 0.0
+
+
+class DriverPoolTimeout(Exception):
+    """Не удалось получить драйвер из пула за отведенное время"""
+
+
+class ChromeDriverPool:
+    """
+    Пул заранее запущенных и авторизованных Chrome драйверов.
+
+    Драйвер берется через acquire() и возвращается через release().
+    При возврате проверяется его состояние: драйвер пересоздается после
+    max_uses использований, при превышении лимита памяти или если
+    проверка здоровья не прошла.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[int], webdriver.Chrome],
+            size: int = 2,
+            health_check: Optional[Callable[[webdriver.Chrome], bool]] = None,
+            max_uses: int = 20,
+            max_memory_mb: int = 1500,
+            on_close: Optional[Callable[[webdriver.Chrome], None]] = None
+    ):
+        """
+        Args:
+            factory: Функция создания готового (авторизованного) драйвера по номеру слота
+            size: Количество драйверов в пуле
+            health_check: Проверка сессии драйвера (True - можно использовать)
+            max_uses: Пересоздавать драйвер после стольких использований
+            max_memory_mb: Пересоздавать драйвер при превышении памяти (RSS дерева процессов)
+            on_close: Вызывается после закрытия драйвера пулом (пересоздание, закрытие пула)
+        """
+        self.factory = factory
+        self.on_close = on_close
+        self.size = max(1, size)
+        self.health_check = health_check
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._leased: Dict[int, PooledDriver] = {}
+        self._free_slots = deque(range(self.size))
+        self._closed = False
+
+        # Метрики
+        self._wait_times = deque(maxlen=500)
+        self._stats = {
+            "created": 0,
+            "create_failed": 0,
+            "recycled": 0,
+            "unhealthy": 0,
+            "acquired": 0,
+            "timeouts": 0,
+        }
+
+    # ---------- Жизненный цикл ----------
+
+    def warm_up(self, background: bool = True):
+        """Запускает драйверы до размера пула (по умолчанию в фоновом потоке)"""
+        if background:
+            threading.Thread(target=self._fill, name="driver-pool-warmup", daemon=True).start()
+        else:
+            self._fill()
+
+    def _fill(self):
+        """Создает драйверы для всех свободных слотов"""
+        logger.info(f"🔥 Прогрев пула драйверов (размер {self.size})...")
+        while True:
+            with self._condition:
+                if self._closed or not self._free_slots:
+                    break
+                slot = self._free_slots.popleft()
+            pooled = self._create(slot)
+            with self._condition:
+                if pooled:
+                    self._idle.append(pooled)
+                self._condition.notify()
+            if not pooled:
+                # Не крутимся в цикле, если Chrome не запускается
+                break
+        logger.info(f"✅ Пул драйверов прогрет: {self.get_stats()['idle']} свободных")
+
+    def _create(self, slot: int) -> Optional[PooledDriver]:
+        """Создает драйвер для слота; при ошибке слот возвращается в список свободных"""
+        try:
+            started = time.perf_counter()
+            driver = self.factory(slot)
+            with self._condition:
+                self._stats["created"] += 1
+            logger.info(f"✅ Драйвер для слота {slot} создан за {time.perf_counter() - started:.1f}с")
+            return PooledDriver(driver=driver, slot=slot)
+        except Exception as e:
+            logger.error(f"❌ Не удалось создать драйвер для слота {slot}: {e}")
+            with self._condition:
+                self._stats["create_failed"] += 1
+                self._free_slots.append(slot)
+            return None
+
+    def close(self):
+        """Закрывает все драйверы пула"""
+        with self._condition:
+            self._closed = True
+            drivers = list(self._idle) + list(self._leased.values())
+            self._idle.clear()
+            self._leased.clear()
+            self._condition.notify_all()
+        for pooled in drivers:
+            self._quit(pooled)
+        logger.info("Пул драйверов закрыт")
+
+    # ---------- Аренда ----------
+
+    def acquire(self, timeout: float = 300) -> webdriver.Chrome:
+        """
+        Берет драйвер из пула. Если свободных нет, но есть незанятый слот -
+        создает новый драйвер, иначе ждет возврата.
+
+        Raises:
+            DriverPoolTimeout: если драйвер не освободился за timeout секунд
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+
+        while True:
+            slot = None
+            with self._condition:
+                while not self._idle and not self._free_slots:
+                    if self._closed:
+                        raise RuntimeError("Пул драйверов закрыт")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise DriverPoolTimeout(f"Нет свободного драйвера за {timeout}с")
+                    self._condition.wait(remaining)
+
+                if self._idle:
+                    pooled = self._idle.popleft()
+                else:
+                    pooled = None
+                    slot = self._free_slots.popleft()
+
+            if pooled is None:
+                pooled = self._create(slot)
+                if pooled is None:
+                    raise RuntimeError(f"Не удалось создать драйвер для слота {slot}")
+            elif not self._is_healthy(pooled):
+                with self._condition:
+                    self._stats["unhealthy"] += 1
+                self._discard(pooled)
+                continue
+
+            with self._condition:
+                pooled.uses += 1
+                pooled.last_used_at = time.time()
+                self._leased[id(pooled.driver)] = pooled
+                self._stats["acquired"] += 1
+                self._wait_times.append(time.perf_counter() - started)
+
+            logger.info(f"🚗 Драйвер слота {pooled.slot} выдан (использование #{pooled.uses})")
+            return pooled.driver
+
+    def release(self, driver: webdriver.Chrome):
+        """Возвращает драйвер в пул (или пересоздает его, если пора)"""
+        with self._condition:
+            pooled = self._leased.pop(id(driver), None)
+        if pooled is None:
+            logger.warning("⚠️ Возвращен драйвер, не принадлежащий пулу - закрываю")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        reason = self._recycle_reason(pooled)
+        if reason:
+            logger.info(f"♻️ Пересоздаю драйвер слота {pooled.slot}: {reason}")
+            with self._condition:
+                self._stats["recycled"] += 1
+            self._discard(pooled, replenish=True)
+            return
+
+        with self._condition:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._idle.append(pooled)
+                self._condition.notify()
+        if closed:
+            self._quit(pooled)
+
+    def owns(self, driver: webdriver.Chrome) -> bool:
+        """Принадлежит ли драйвер пулу"""
+        with self._condition:
+            return id(driver) in self._leased
+
+    # ---------- Проверки ----------
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        """Жив ли процесс браузера и валидна ли сессия"""
+        try:
+            _ = pooled.driver.current_url
+        except Exception as e:
+            logger.warning(f"⚠️ Драйвер слота {pooled.slot} не отвечает: {e}")
+            return False
+        if self.health_check:
+            try:
+                return bool(self.health_check(pooled.driver))
+            except Exception as e:
+                logger.warning(f"⚠️ Проверка сессии слота {pooled.slot} упала: {e}")
+                return False
+        return True
+
+    def _recycle_reason(self, pooled: PooledDriver) -> Optional[str]:
+        """Причина пересоздания драйвера или None"""
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return f"достигнут лимит использований ({pooled.uses})"
+        if self.max_memory_mb:
+            memory_mb = ChromeDriverManager.get_driver_memory_mb(pooled.driver)
+            if memory_mb and memory_mb > self.max_memory_mb:
+                return f"память {memory_mb:.0f}MB > {self.max_memory_mb}MB"
+        if not self._is_healthy(pooled):
+            return "проверка здоровья не пройдена"
+        return None
+
+    def _discard(self, pooled: PooledDriver, replenish: bool = False):
+        """Закрывает драйвер и освобождает слот"""
+        self._quit(pooled)
+        with self._condition:
+            self._free_slots.append(pooled.slot)
+            self._condition.notify()
+        if replenish and not self._closed:
+            # Новый драйвер поднимаем в фоне, чтобы не задерживать текущую задачу
+            self.warm_up(background=True)
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            logger.warning(f"⚠️ Не удалось закрыть драйвер слота {pooled.slot}")
+        if self.on_close:
+            try:
+                self.on_close(pooled.driver)
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка после закрытия драйвера слота {pooled.slot}: {e}")
+
+    # ---------- Метрики ----------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Размер пула, занятость и время ожидания драйвера"""
+        with self._condition:
+            waits = sorted(self._wait_times)
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "free_slots": len(self._free_slots),
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            })
+            return stats
@@ -0,0 +1,139 @@
+# app/utils/selenium_tools/grid_reader.py
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+
+logger = logging.getLogger(__name__)
+
+# Вся таблица за один вызов: заголовки, тексты ячеек и признаки полноты.
+# aria-rowcount (AG Grid и другие ARIA таблицы) - сколько строк всего, включая
+# заголовок; aria-rowindex - номер строки: пропуски значат виртуальную прокрутку.
+EXTRACT_GRID_JS = """
+const grid = arguments[0];
+const cellsOf = row => {
+    let cells = row.querySelectorAll('[role=gridcell], [role=cell], [role=columnheader], td, th');
+    if (!cells.length) { cells = row.children; }
+    return Array.from(cells).map(c => (c.innerText || c.textContent || '').trim());
+};
+const isHeader = row => !!row.querySelector('[role=columnheader], th') || !!row.closest('thead');
+let rows = Array.from(grid.querySelectorAll('[role=row], tr'));
+if (!rows.length) { rows = Array.from(grid.children); }
+const headerRows = rows.filter(isHeader);
+const dataRows = rows.filter(r => !isHeader(r));
+const indexes = dataRows.map(r => parseInt(r.getAttribute('aria-rowindex'), 10)).filter(i => !isNaN(i));
+const rowCount = parseInt(grid.getAttribute('aria-rowcount'), 10);
+return JSON.stringify({
+    headers: headerRows.length ? cellsOf(headerRows[headerRows.length - 1]) : [],
+    header_rows: headerRows.length,
+    rows: dataRows.map(cellsOf),
+    row_count: isNaN(rowCount) ? null : rowCount,
+    row_indexes: indexes
+});
+"""
+
+WORD_HEADERS = ("слов", "запрос", "ключев", "кластер", "keyword", "word", "query")
+FREQUENCY_HEADERS = ("частот", "frequency")
+
+
+class ResultsGridReader:
+    """
+    Чтение таблицы результатов MPStats прямо из DOM вместо выгрузки Excel.
+
+    Таблица отдается только если она полная: известно общее число строк
+    (aria-rowcount) и все они отрисованы. Виртуальная прокрутка, обрезанная
+    таблица или неизвестный размер - статус "fallback" с причиной, и
+    вызывающий скачивает файл как раньше.
+    """
+
+    def __init__(self, require_row_count: bool = True):
+        """
+        Args:
+            require_row_count: Без aria-rowcount полноту проверить нельзя - откат на скачивание
+        """
+        self.require_row_count = require_row_count
+        self._lock = threading.Lock()
+        self._outcomes = Counter()
+
+    def read(self, driver: webdriver.Chrome, grid: WebElement) -> Dict[str, Any]:
+        """
+        Читает таблицу
+
+        Returns:
+            {"status": "success", "rows": [{"word", "frequency"}], "headers"} или
+            {"status": "fallback", "reason": ...}
+        """
+        try:
+            data = json.loads(driver.execute_script(EXTRACT_GRID_JS, grid))
+        except Exception as e:
+            return self._fallback("script_error", str(e))
+
+        rows = [row for row in data["rows"] if any(row)]
+        if not rows:
+            return self._fallback("empty")
+
+        row_count = data["row_count"]
+        if row_count is None or row_count < 0:
+            if self.require_row_count:
+                return self._fallback("unknown_total", "нет aria-rowcount")
+        else:
+            total = row_count - data["header_rows"]
+            if total > len(rows):
+                # Строки с aria-rowindex идут не подряд - таблица прокручивается виртуально
+                indexes = sorted(data["row_indexes"])
+                gaps = bool(indexes) and (indexes[-1] - indexes[0] + 1 != len(indexes)
+                                          or indexes[0] > data["header_rows"] + 1)
+                reason = "virtualized" if gaps else "truncated"
+                return self._fallback(reason, f"отрисовано {len(rows)} из {total}")
+
+        word_column, frequency_column = self._columns(data["headers"], rows)
+        if word_column is None:
+            return self._fallback("no_word_column", f"заголовки {data['headers']}")
+
+        result = []
+        for row in rows:
+            if word_column >= len(row) or not row[word_column]:
+                continue
+            frequency = None
+            if frequency_column is not None and frequency_column < len(row):
+                frequency = self._to_int(row[frequency_column])
+            result.append({"word": row[word_column], "frequency": frequency})
+
+        with self._lock:
+            self._outcomes["success"] += 1
+        logger.info(f"📋 Таблица результатов прочитана из DOM: {len(result)} строк")
+        return {"status": "success", "rows": result, "headers": data["headers"]}
+
+    def _columns(self, headers: List[str], rows: List[List[str]]):
+        """Столбцы слов и частоты: по заголовкам, без них - первый и первый числовой"""
+        lowered = [header.lower() for header in headers]
+        word_column = next((i for i, h in enumerate(lowered) if h.startswith(WORD_HEADERS)), None)
+        frequency_column = next((i for i, h in enumerate(lowered) if h.startswith(FREQUENCY_HEADERS)), None)
+        if headers:
+            return word_column, frequency_column
+
+        sample = rows[0]
+        frequency_column = next((i for i, value in enumerate(sample) if i > 0 and self._to_int(value) is not None),
+                                None)
+        return 0, frequency_column
+
+    @staticmethod
+    def _to_int(value: str) -> Optional[int]:
+        digits = re.sub(r"\s", "", value or "")
+        return int(digits) if digits.isdigit() else None
+
+    def _fallback(self, reason: str, details: str = "") -> Dict[str, Any]:
+        with self._lock:
+            self._outcomes[reason] += 1
+        logger.info(f"📋 Таблица из DOM не подходит ({reason}{': ' + details if details else ''}), скачиваю файл")
+        return {"status": "fallback", "reason": reason}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Исходы чтения: success и причины отката на скачивание"""
+        with self._lock:
+            return dict(self._outcomes)
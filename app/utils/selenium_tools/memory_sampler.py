@@ -0,0 +1,120 @@
+# app/utils/selenium_tools/memory_sampler.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from selenium import webdriver
+
+from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+
+class _Lease:
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.monotonic()
+        self.peak_mb = 0.0
+        self.samples = 0
+
+    def observe(self, rss_mb: Optional[float]):
+        if rss_mb:
+            self.peak_mb = max(self.peak_mb, rss_mb)
+            self.samples += 1
+
+
+class DriverMemorySampler:
+    """
+    Пиковая память (RSS дерева процессов chromedriver + Chrome) за время задачи.
+
+    Один фоновый поток опрашивает все отслеживаемые драйверы через /proc.
+    track() вызывается при выдаче драйвера задаче, untrack() - при освобождении;
+    для драйверов пула пик считается за аренду, а не за жизнь драйвера.
+    """
+
+    def __init__(self, interval: float = 1.0, history: int = 200):
+        """
+        Args:
+            interval: Интервал замера (секунды)
+            history: Сколько последних пиков хранить для статистики
+        """
+        self.interval = max(0.1, interval)
+        self._leases: Dict[int, _Lease] = {}
+        self._drivers: Dict[int, webdriver.Chrome] = {}
+        self._lock = threading.Lock()
+        self._peaks = deque(maxlen=history)
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def track(self, driver: webdriver.Chrome, label: str = ""):
+        """Начинает замер пика для драйвера"""
+        lease = _Lease(label)
+        lease.observe(ChromeDriverManager.get_driver_memory_mb(driver))
+        with self._lock:
+            self._leases[id(driver)] = lease
+            self._drivers[id(driver)] = driver
+        self._ensure_thread()
+
+    def untrack(self, driver: webdriver.Chrome) -> Optional[float]:
+        """
+        Завершает замер
+
+        Returns:
+            Пиковый RSS за время аренды (MB) или None, если драйвер не отслеживался
+            или память посчитать не удалось (не Linux, удаленный драйвер)
+        """
+        with self._lock:
+            lease = self._leases.pop(id(driver), None)
+            self._drivers.pop(id(driver), None)
+        if lease is None:
+            return None
+
+        lease.observe(ChromeDriverManager.get_driver_memory_mb(driver))
+        if not lease.samples:
+            return None
+
+        with self._lock:
+            self._peaks.append(lease.peak_mb)
+        logger.info(f"🧠 Пик памяти Chrome{' ' + lease.label if lease.label else ''}: "
+                    f"{lease.peak_mb:.0f} MB за {time.monotonic() - lease.started:.0f}с")
+        return lease.peak_mb
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="chrome-memory-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                drivers = list(self._drivers.items())
+            if not drivers:
+                continue
+            for key, driver in drivers:
+                rss_mb = ChromeDriverManager.get_driver_memory_mb(driver)
+                with self._lock:
+                    lease = self._leases.get(key)
+                    if lease:
+                        lease.observe(rss_mb)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика пиков по задачам (MB) - для подбора размера пула"""
+        with self._lock:
+            peaks = sorted(self._peaks)
+            tracked = len(self._leases)
+        if not peaks:
+            return {"jobs": 0, "tracked": tracked}
+        return {
+            "jobs": len(peaks),
+            "tracked": tracked,
+            "p50_mb": peaks[len(peaks) // 2],
+            "p95_mb": peaks[min(len(peaks) - 1, int(len(peaks) * 0.95))],
+            "max_mb": peaks[-1],
+        }
@@ -0,0 +1,154 @@
+# app/utils/selenium_tools/network_capture.py
+import base64
+import fnmatch
+import json
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from selenium import webdriver
+
+from app.utils.selenium_tools.download_tracker import CDPSession
+
+logger = logging.getLogger(__name__)
+
+# Типы ответов, в которых SPA получает данные (документы, скрипты и картинки не нужны)
+CAPTURED_RESOURCE_TYPES = ("XHR", "Fetch")
+
+
+class NetworkCapture:
+    """
+    Перехват ответов API страницы через домен Network CDP.
+
+    SPA MPStats заполняет таблицу результатов из JSON ответа API, и Excel
+    выгрузка строится из тех же данных. Захват подключается к вкладке
+    отдельной websocket сессией (Selenium умеет только отправлять команды),
+    запоминает XHR/fetch ответы с подходящим URL и по запросу забирает их тела
+    (Network.getResponseBody) в память - без файла и разбора Excel.
+
+    Захват нужно начать (start) до запроса, иначе тело ответа Chrome не сохранит.
+    """
+
+    def __init__(self, driver: webdriver.Chrome, url_patterns: List[str], max_body_bytes: int = 8 * 1024 * 1024,
+                 connect_timeout: float = 5):
+        """
+        Args:
+            driver: Драйвер вкладки (или TabDriver)
+            url_patterns: Шаблоны URL ответов (fnmatch, например "*/api/*keyword*")
+            max_body_bytes: Потолок тел ответов в памяти (и буфер ресурса в Chrome)
+            connect_timeout: Таймаут подключения к вкладке (секунды)
+        """
+        self.driver = driver
+        self.url_patterns = url_patterns
+        self.max_body_bytes = max_body_bytes
+        self.connect_timeout = connect_timeout
+        self._session: Optional[CDPSession] = None
+        self._condition = threading.Condition()
+        self._responses: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> bool:
+        """
+        Подключается к вкладке и включает домен Network
+
+        Returns:
+            True если захват работает, False если ответы придется брать иначе
+        """
+        try:
+            target_id = getattr(self.driver, "target_id", None) \
+                or self.driver.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+            self._session = CDPSession(self.driver, self.connect_timeout, target="page", target_id=target_id)
+            self._session.add_listener(self._on_event)
+            self._session.send("Network.enable", {
+                "maxResourceBufferSize": self.max_body_bytes,
+                "maxTotalBufferSize": self.max_body_bytes * 2,
+            })
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Захват ответов API недоступен: {e}")
+            self.stop()
+            return False
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def _matches(self, url: str) -> bool:
+        return any(fnmatch.fnmatch(url, pattern) for pattern in self.url_patterns)
+
+    def _on_event(self, method: str, params: Dict[str, Any]):
+        if method == "Network.responseReceived":
+            response = params.get("response", {})
+            if params.get("type") in CAPTURED_RESOURCE_TYPES and self._matches(response.get("url", "")):
+                with self._condition:
+                    self._responses[params["requestId"]] = {
+                        "url": response.get("url"),
+                        "status": response.get("status"),
+                        "mime_type": response.get("mimeType", ""),
+                        "state": "loading",
+                    }
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            with self._condition:
+                info = self._responses.get(params.get("requestId"))
+                if info:
+                    info["state"] = "finished" if method == "Network.loadingFinished" else "failed"
+                    info["size"] = params.get("encodedDataLength", 0)
+                    self._condition.notify_all()
+
+    def wait_for_responses(self, timeout: float = 10) -> List[Dict[str, Any]]:
+        """
+        Ждет завершенные подходящие ответы и забирает их тела
+
+        Returns:
+            [{"url", "status", "size", "payload"}] - JSON ответов в порядке получения
+            (пустой список, если за timeout ответа не было)
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                finished = [(request_id, info) for request_id, info in self._responses.items()
+                            if info["state"] == "finished"]
+                loading = any(info["state"] == "loading" for info in self._responses.values())
+                remaining = deadline - time.monotonic()
+                if (finished and not loading) or remaining <= 0:
+                    break
+                self._condition.wait(min(remaining, 0.5))
+
+        captured, total_bytes = [], 0
+        for request_id, info in finished:
+            if not 200 <= (info["status"] or 0) < 300:
+                continue
+            try:
+                body = self._session.send("Network.getResponseBody", {"requestId": request_id})
+            except Exception as e:
+                logger.debug(f"Тело ответа {info['url']} недоступно: {e}")
+                continue
+            content = body.get("body", "")
+            if body.get("base64Encoded"):
+                content = base64.b64decode(content).decode("utf-8", errors="replace")
+            total_bytes += len(content)
+            if total_bytes > self.max_body_bytes:
+                logger.warning(f"⚠️ Ответы API больше {self.max_body_bytes} байт, остальные пропущены")
+                break
+            try:
+                payload = json.loads(content)
+            except ValueError:
+                continue
+            captured.append({"url": info["url"], "status": info["status"], "size": len(content),
+                             "payload": payload})
+        return captured
+
+    def stop(self):
+        """Отключается от вкладки (буфер ответов освобождается)"""
+        if self._session:
+            self._session.close()
+            self._session = None
+        with self._condition:
+            self._responses.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,210 @@
+# app/utils/selenium_tools/network_profile.py
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+
+from app.utils.selenium_tools.download_tracker import CDPSession
+
+logger = logging.getLogger(__name__)
+
+
+# Медиа - блокировались и раньше (_configure_devtools)
+MEDIA_PATTERNS = [
+    '*.mp4', '*.webm', '*.ogg', '*.avi', '*.mov', '*.wmv',
+    '*.flv', '*.mkv', '*.m4v', '*.mpg', '*.mpeg',
+    '*.3gp', '*.swf', '*.flac', '*.wav', '*.mp3',
+    '*.aac', '*.m4a', '*.gif', '*.webp', '*.apng',
+    '*.mng',
+    '*.woff2', '*.ttf', '*.otf',
+]
+
+# Для таблицы запросов не нужны картинки и оставшиеся шрифты
+STATIC_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.ico', '*.bmp', '*.avif', '*.woff', '*.eot',
+]
+
+# Аналитика, пиксели, чаты поддержки
+TRACKER_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*mc.yandex.ru*', '*mc.yandex.com*', '*mc.webvisor.org*',
+    '*connect.facebook.net*', '*facebook.com/tr*', '*vk.com/rtrg*',
+    '*top-fwz1.mail.ru*', '*hotjar.com*', '*clarity.ms*',
+    '*jivosite.com*', '*jivo.ru*', '*carrotquest.io*', '*intercom.io*',
+    '*analytics.tiktok.com*', '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+]
+
+PROFILES = ("default", "lean", "strict")
+
+
+@dataclass
+class NetworkProfile:
+    """
+    Профиль сетевых блокировок страницы MPStats.
+
+    - default: только медиа (прежнее поведение), кэш браузера отключен
+    - lean: медиа, картинки, шрифты и трекеры через Network.setBlockedURLs;
+      кэш включен, чтобы бандлы SPA брались с диска профиля
+    - strict: lean + перехват запросов (Fetch) с allowlist хостов -
+      все, что не с разрешенных доменов, отклоняется
+    """
+    name: str = "lean"
+    allowed_hosts: List[str] = field(default_factory=lambda: ["mpstats.io"])
+
+    def __post_init__(self):
+        if self.name not in PROFILES:
+            logger.warning(f"⚠️ Неизвестный сетевой профиль '{self.name}', использую 'default'")
+            self.name = "default"
+
+    @property
+    def blocked_patterns(self) -> List[str]:
+        if self.name == "default":
+            return list(MEDIA_PATTERNS)
+        return MEDIA_PATTERNS + STATIC_PATTERNS + TRACKER_PATTERNS
+
+    @property
+    def cache_disabled(self) -> bool:
+        return self.name == "default"
+
+    def is_allowed_host(self, host: str) -> bool:
+        host = (host or "").lower()
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.allowed_hosts)
+
+    def apply(self, driver: webdriver.Chrome, allowlist: bool = True) -> Optional["RequestAllowlist"]:
+        """
+        Применяет профиль к драйверу (к активной вкладке)
+
+        Args:
+            allowlist: Для профиля strict поднять RequestAllowlist
+
+        Returns:
+            RequestAllowlist для профиля strict (держит CDP соединение), иначе None
+        """
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns})
+        driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': self.cache_disabled})
+        logger.info(f"🚦 Сетевой профиль '{self.name}': заблокировано шаблонов {len(self.blocked_patterns)}")
+
+        if self.name != "strict" or not allowlist:
+            return None
+
+        allowlist = RequestAllowlist(driver, self)
+        if not allowlist.start():
+            return None
+        return allowlist
+
+
+class RequestAllowlist:
+    """
+    Перехват запросов вкладки через Fetch.requestPaused:
+    запросы к разрешенным хостам продолжаются, остальные отклоняются.
+
+    setBlockedURLs умеет только denylist, поэтому allowlist
+    реализован перехватом на отдельном CDP соединении с вкладкой.
+    """
+
+    def __init__(self, driver: webdriver.Chrome, profile: NetworkProfile):
+        self.driver = driver
+        self.profile = profile
+        self._session: Optional[CDPSession] = None
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.blocked_hosts: Counter = Counter()
+
+    def start(self) -> bool:
+        try:
+            self._session = CDPSession(self.driver, target="page")
+            self._session.add_listener(self._on_event)
+            self._session.send("Fetch.enable", {"patterns": [{"urlPattern": "*", "requestStage": "Request"}]})
+            logger.info(f"🚦 Allowlist хостов: {self.profile.allowed_hosts}")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Перехват запросов недоступен ({e}), работаю только с блок-листом")
+            self.stop()
+            return False
+
+    def _on_event(self, method: str, params: Dict[str, Any]):
+        if method != "Fetch.requestPaused":
+            return
+        url = params.get("request", {}).get("url", "")
+        parts = urlsplit(url)
+        # data:, blob: и т.п. не уходят в сеть
+        if parts.scheme not in ("http", "https") or self.profile.is_allowed_host(parts.hostname):
+            with self._lock:
+                self.allowed += 1
+            self._session.post("Fetch.continueRequest", {"requestId": params["requestId"]})
+        else:
+            with self._lock:
+                self.blocked_hosts[parts.hostname] += 1
+            self._session.post("Fetch.failRequest", {
+                "requestId": params["requestId"],
+                "errorReason": "BlockedByClient",
+            })
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "blocked": sum(self.blocked_hosts.values()),
+                "blocked_hosts": dict(self.blocked_hosts.most_common(10)),
+            }
+
+    def stop(self):
+        if self._session:
+            self._session.close()
+            self._session = None
+
+
+# Время загрузки и объем переданных данных по Performance API страницы
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let transferred = nav ? nav.transferSize : 0;
+let decoded = nav ? nav.decodedBodySize : 0;
+for (const r of resources) { transferred += r.transferSize || 0; decoded += r.decodedBodySize || 0; }
+return {
+    load_ms: nav ? nav.loadEventEnd - nav.startTime : null,
+    dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+    requests: resources.length + (nav ? 1 : 0),
+    transferred_bytes: transferred,
+    decoded_bytes: decoded
+};
+"""
+
+
+def measure_page_load(driver: webdriver.Chrome, url: str, settle_timeout: float = 30) -> Dict[str, Any]:
+    """
+    Загружает страницу и возвращает метрики загрузки.
+
+    Для SPA дожидается, пока количество запросов перестанет расти,
+    чтобы учесть запросы данных после события load.
+    """
+    started = time.perf_counter()
+    driver.get(url)
+
+    deadline = time.monotonic() + settle_timeout
+    metrics = driver.execute_script(PAGE_METRICS_JS)
+    stable_rounds = 0
+    while time.monotonic() < deadline and stable_rounds < 4:
+        time.sleep(0.25)
+        current = driver.execute_script(PAGE_METRICS_JS)
+        stable_rounds = stable_rounds + 1 if current["requests"] == metrics["requests"] else 0
+        metrics = current
+
+    metrics["wall_s"] = time.perf_counter() - started - 0.25 * stable_rounds
+    return metrics
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Медианы метрик по нескольким прогонам"""
+    def median(key: str) -> Optional[float]:
+        values = sorted(r[key] for r in runs if r.get(key) is not None)
+        return values[len(values) // 2] if values else None
+
+    return {key: median(key) for key in ("wall_s", "load_ms", "requests", "transferred_bytes", "decoded_bytes")}
+
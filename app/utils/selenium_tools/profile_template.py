@@ -0,0 +1,207 @@
+# app/utils/selenium_tools/profile_template.py
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from typing import Dict, Any, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Файлы блокировки Chrome: в копии их быть не должно
+SINGLETON_FILES = {"SingletonLock", "SingletonCookie", "SingletonSocket"}
+
+# Корень user-data-dir: кэши шейдеров, краш-репорты, скачанные компоненты
+SKIP_ROOT = SINGLETON_FILES | {
+    "ShaderCache", "GrShaderCache", "GraphiteDawnCache", "Crashpad", "Crash Reports",
+    "component_crx_cache", "extensions_crx_cache", "BrowserMetrics", "Safe Browsing",
+    "OptimizationHints", "optimization_guide_model_store", "cookies.json",
+}
+
+# Профиль Default: сессия (куки, storage, настройки) и HTTP кэш бандлов SPA нужны,
+# остальное - кэши кода/GPU и история, которые Chrome пересоздаст сам
+SKIP_PROFILE = {
+    "Code Cache", "GPUCache", "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache",
+    "Service Worker", "blob_storage", "Download Service", "History", "History-journal",
+    "Visited Links", "Top Sites", "Top Sites-journal", "Favicons", "Favicons-journal",
+    "Shortcuts", "Shortcuts-journal", "Network Action Predictor", "Network Action Predictor-journal",
+}
+
+
+class ProfileTemplateManager:
+    """
+    Эталонный (авторизованный) профиль Chrome и его копии для драйверов.
+
+    Chrome блокирует user-data-dir, поэтому общий профиль не дает запускать
+    браузеры параллельно. Каждый драйвер получает свою копию эталона:
+    cp --reflink=auto (copy-on-write на btrfs/xfs, обычная копия на других ФС),
+    директорию копий можно вынести на tmpfs.
+
+    - promote(): копия после повторного логина (или просто более свежая)
+      становится новым эталоном - атомарной заменой директории
+    - копии, в которых не работает Chrome, удаляются release() или
+      очисткой устаревших (в том числе оставшихся от прошлого запуска)
+    """
+
+    def __init__(self, template_dir: str, clones_dir: str, stale_after: float = 7200):
+        """
+        Args:
+            template_dir: Эталонный профиль
+            clones_dir: Директория копий (например, на tmpfs)
+            stale_after: Через сколько секунд копия без работающего Chrome считается брошенной
+        """
+        self.template_dir = template_dir
+        self.clones_dir = clones_dir
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._active: Set[str] = set()
+        self._has_cp = shutil.which("cp") is not None
+        self.stats = {"clones": 0, "released": 0, "promoted": 0, "stale_removed": 0, "clone_ms_total": 0.0}
+
+        os.makedirs(self.template_dir, exist_ok=True)
+        os.makedirs(self.clones_dir, exist_ok=True)
+
+    @property
+    def template_age(self) -> Optional[float]:
+        """Возраст эталона в секундах (None - эталон еще не авторизовывался)"""
+        try:
+            return time.time() - os.path.getmtime(os.path.join(self.template_dir, "Default"))
+        except OSError:
+            return None
+
+    def clone(self) -> str:
+        """Создает копию эталона и возвращает путь к ней"""
+        self.cleanup_stale()
+
+        clone_dir = os.path.join(self.clones_dir, f"profile_{uuid.uuid4().hex[:12]}")
+        started = time.perf_counter()
+        with self._lock:
+            self._copy_profile(self.template_dir, clone_dir)
+            self._active.add(clone_dir)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["clones"] += 1
+        self.stats["clone_ms_total"] += elapsed_ms
+        logger.info(f"📋 Копия профиля Chrome за {elapsed_ms:.0f}мс: {clone_dir}")
+        return clone_dir
+
+    def release(self, clone_dir: str):
+        """Удаляет копию (Chrome в ней уже закрыт)"""
+        with self._lock:
+            self._active.discard(clone_dir)
+        shutil.rmtree(clone_dir, ignore_errors=True)
+        self.stats["released"] += 1
+
+    def promote(self, clone_dir: str):
+        """
+        Делает копию новым эталоном. Вызывается после закрытия Chrome:
+        до этого куки могут быть еще не сброшены на диск.
+        """
+        staging_dir = f"{self.template_dir}.new"
+        previous_dir = f"{self.template_dir}.old"
+        with self._lock:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            shutil.rmtree(previous_dir, ignore_errors=True)
+            self._copy_profile(clone_dir, staging_dir)
+            # cookies.json (куки для HTTP быстрого пути) живет в эталоне - переносим
+            cookies_file = os.path.join(self.template_dir, "cookies.json")
+            if os.path.exists(cookies_file):
+                shutil.copy2(cookies_file, staging_dir)
+            os.rename(self.template_dir, previous_dir)
+            os.rename(staging_dir, self.template_dir)
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        self.stats["promoted"] += 1
+        logger.info("🔄 Эталонный профиль Chrome обновлен")
+
+    def cleanup_stale(self) -> int:
+        """Удаляет брошенные копии: без работающего Chrome и старше stale_after"""
+        removed = 0
+        now = time.time()
+        try:
+            entries = os.listdir(self.clones_dir)
+        except OSError:
+            return 0
+
+        for entry in entries:
+            clone_dir = os.path.join(self.clones_dir, entry)
+            with self._lock:
+                if clone_dir in self._active:
+                    continue
+            try:
+                if now - os.path.getmtime(clone_dir) < self.stale_after or self._chrome_running(clone_dir):
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(clone_dir, ignore_errors=True)
+            removed += 1
+
+        if removed:
+            self.stats["stale_removed"] += removed
+            logger.info(f"🧹 Удалено брошенных копий профиля: {removed}")
+        return removed
+
+    @staticmethod
+    def _chrome_running(profile_dir: str) -> bool:
+        """SingletonLock - симлинк "хост-pid" работающего Chrome"""
+        try:
+            target = os.readlink(os.path.join(profile_dir, "SingletonLock"))
+        except OSError:
+            return False
+        host, _, pid = target.rpartition("-")
+        if host != socket.gethostname():
+            # Chrome другого хоста (общий том) - не трогаем
+            return True
+        try:
+            os.kill(int(pid), 0)
+            return True
+        except (ValueError, ProcessLookupError):
+            return False
+        except PermissionError:
+            return True
+
+    def _copy_profile(self, source_dir: str, target_dir: str):
+        os.makedirs(target_dir, exist_ok=True)
+        self._copy_entries(source_dir, target_dir, SKIP_ROOT | {"Default"})
+
+        source_profile = os.path.join(source_dir, "Default")
+        if os.path.isdir(source_profile):
+            target_profile = os.path.join(target_dir, "Default")
+            os.makedirs(target_profile, exist_ok=True)
+            self._copy_entries(source_profile, target_profile, SKIP_PROFILE)
+
+    def _copy_entries(self, source_dir: str, target_dir: str, skip: Iterable[str]):
+        skip = set(skip)
+        paths = [
+            os.path.join(source_dir, entry) for entry in os.listdir(source_dir)
+            if entry not in skip and not os.path.islink(os.path.join(source_dir, entry))
+        ]
+        if not paths:
+            return
+
+        if self._has_cp:
+            # Один вызов cp: reflink там, где ФС поддерживает, иначе обычная копия
+            result = subprocess.run(["cp", "-a", "--reflink=auto", *paths, target_dir],
+                                    capture_output=True, text=True)
+            if result.returncode == 0:
+                return
+            logger.warning(f"⚠️ cp не удался ({result.stderr.strip()}), копирую средствами Python")
+
+        for path in paths:
+            target = os.path.join(target_dir, os.path.basename(path))
+            if os.path.isdir(path):
+                shutil.copytree(path, target, symlinks=True, dirs_exist_ok=True)
+            else:
+                shutil.copy2(path, target)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = len(self._active)
+        age = self.template_age
+        return {
+            **self.stats,
+            "active": active,
+            "avg_clone_ms": self.stats["clone_ms_total"] / self.stats["clones"] if self.stats["clones"] else 0.0,
+            "template_age_h": round(age / 3600, 1) if age is not None else None,
+        }
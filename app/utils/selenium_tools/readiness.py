@@ -0,0 +1,158 @@
+# app/utils/selenium_tools/readiness.py
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Any, Optional
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+
+# Счетчик незавершенных fetch/XHR запросов страницы.
+# Ставится через CDP до загрузки документа, поэтому видит все запросы SPA.
+NETWORK_TRACKER_JS = """
+(function () {
+    if (window.__mpsNet) { return; }
+    const net = window.__mpsNet = {inflight: 0, last: Date.now()};
+    const start = () => { net.inflight += 1; net.last = Date.now(); };
+    const done = () => { net.inflight = Math.max(0, net.inflight - 1); net.last = Date.now(); };
+
+    const origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function () {
+            start();
+            return origFetch.apply(this, arguments).finally(done);
+        };
+    }
+
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        start();
+        this.addEventListener('loadend', done, {once: true});
+        return origSend.apply(this, arguments);
+    };
+})();
+"""
+
+
+class PageReadiness:
+    """
+    Ожидание готовности страницы по реальным сигналам вместо фиксированных пауз:
+    появление элементов, активность кнопок, отсутствие сетевых запросов.
+
+    Каждое ожидание имеет потолок (timeout) и записывает фактическую длительность.
+    """
+
+    def __init__(self, poll_interval: float = 0.25, network_idle_ms: int = 500, history: int = 200):
+        """
+        Args:
+            poll_interval: Период опроса условий (секунды)
+            network_idle_ms: Сколько миллисекунд без запросов считать "сеть простаивает"
+            history: Сколько последних замеров хранить для каждого ожидания
+        """
+        self.poll_interval = poll_interval
+        self.network_idle_ms = network_idle_ms
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: deque(maxlen=history))
+        self._timeouts = defaultdict(int)
+
+    # ---------- Сетевой трекер ----------
+
+    def install_network_tracker(self, driver: webdriver.Chrome):
+        """Ставит счетчик запросов на все будущие документы и на текущую страницу"""
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_TRACKER_JS})
+            driver.execute_script(NETWORK_TRACKER_JS)
+        except Exception as e:
+            logger.warning(f"Не удалось установить сетевой трекер: {e}")
+
+    def is_network_idle(self, driver: webdriver.Chrome) -> bool:
+        """Нет незавершенных запросов последние network_idle_ms миллисекунд"""
+        state = driver.execute_script(
+            "const n = window.__mpsNet;"
+            "return n ? [n.inflight, Date.now() - n.last] : null;"
+        )
+        if state is None:
+            # Трекер не установлен на этой странице - считаем по readyState
+            return driver.execute_script("return document.readyState") == "complete"
+        inflight, idle_for = state
+        return inflight == 0 and idle_for >= self.network_idle_ms
+
+    # ---------- Условия ----------
+
+    def network_idle(self) -> Callable:
+        """Условие: сеть простаивает"""
+        return self.is_network_idle
+
+    # ---------- Ожидание ----------
+
+    def wait_for(self, driver: webdriver.Chrome, name: str, condition: Callable, timeout: float) -> bool:
+        """
+        Ждет выполнения условия не дольше timeout секунд.
+
+        Args:
+            driver: Chrome WebDriver
+            name: Имя ожидания (для статистики)
+            condition: Функция driver -> bool
+            timeout: Потолок ожидания
+
+        Returns:
+            True если условие выполнено, False если вышел таймаут
+        """
+        started = time.perf_counter()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll_interval).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._durations[name].append(elapsed)
+            if not ready:
+                self._timeouts[name] += 1
+
+        if ready:
+            logger.info(f"⏱️ Ожидание '{name}': {elapsed:.2f}с")
+        else:
+            logger.warning(f"⏱️ Ожидание '{name}' вышло по таймауту ({timeout}с)")
+        return ready
+
+    def wait_for_any(self, driver: webdriver.Chrome, name: str, conditions: Dict[str, Callable],
+                     timeout: float) -> Optional[str]:
+        """
+        Ждет первого выполненного условия из нескольких.
+
+        Returns:
+            Имя сработавшего условия или None при таймауте
+        """
+        fired = {}
+
+        def any_ready(d):
+            for key, condition in conditions.items():
+                if condition(d):
+                    fired["name"] = key
+                    return True
+            return False
+
+        self.wait_for(driver, name, any_ready, timeout)
+        return fired.get("name")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Фактические длительности ожиданий по именам (секунды)"""
+        with self._lock:
+            stats = {}
+            for name, durations in self._durations.items():
+                values = sorted(durations)
+                stats[name] = {
+                    "count": len(values),
+                    "timeouts": self._timeouts[name],
+                    "p50": values[len(values) // 2],
+                    "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                    "max": values[-1],
+                }
+            return stats
@@ -0,0 +1,210 @@
+# app/utils/selenium_tools/selector_engine.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+logger = logging.getLogger(__name__)
+
+# Поиск по списку вариантов локатора за один вызов JS:
+# первый вариант, давший не меньше minCount (активных) элементов, побеждает
+RESOLVE_JS = """
+const variants = arguments[0], onlyEnabled = arguments[1], minCount = arguments[2], countOnly = arguments[3];
+const collect = (by, value) => {
+    let nodes = [];
+    try {
+        if (by === 'xpath') {
+            const snap = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let i = 0; i < snap.snapshotLength; i++) { nodes.push(snap.snapshotItem(i)); }
+        } else if (by === 'css selector') {
+            nodes = Array.from(document.querySelectorAll(value));
+        } else if (by === 'tag name') {
+            nodes = Array.from(document.getElementsByTagName(value));
+        } else if (by === 'name') {
+            nodes = Array.from(document.getElementsByName(value));
+        } else if (by === 'class name') {
+            nodes = Array.from(document.getElementsByClassName(value));
+        } else if (by === 'id') {
+            const el = document.getElementById(value);
+            nodes = el ? [el] : [];
+        } else if (by === 'link text' || by === 'partial link text') {
+            nodes = Array.from(document.querySelectorAll('a')).filter(a => by === 'link text'
+                ? a.textContent.trim() === value : a.textContent.includes(value));
+        }
+    } catch (e) {
+        return [];
+    }
+    if (onlyEnabled) {
+        nodes = nodes.filter(n => !n.disabled && n.getAttribute('aria-disabled') !== 'true'
+                                  && n.offsetParent !== null);
+    }
+    return nodes;
+};
+for (let i = 0; i < variants.length; i++) {
+    const nodes = collect(variants[i][0], variants[i][1]);
+    if (nodes.length >= minCount) {
+        return [i, countOnly ? nodes.length : nodes];
+    }
+}
+return [-1, countOnly ? 0 : []];
+"""
+
+
+class SelectorNotFound(TimeoutException):
+    """Ни один вариант локатора не нашел элемент за отведенное время"""
+
+
+class _SelectorStats:
+    def __init__(self):
+        self.lookups = 0
+        self.misses = 0
+        self.fallback_hits = 0
+        self.wait_total = 0.0
+
+
+class SelectorEngine:
+    """
+    Поиск элементов MPSTATS_UI_CONFIG с быстрым отказом.
+
+    Элемент конфига - {"by", "value"} и необязательные "fallbacks" (список
+    запасных {"by", "value"} по порядку) и "timeout" (потолок поиска, секунды).
+    Классы в DOM MPStats динамические, поэтому промахи основного локатора
+    обычны: все варианты проверяются одним вызовом JS за опрос, сработавший
+    вариант запоминается и пробуется первым в следующий раз.
+
+    Поиск не зависит от implicit wait драйвера: каждый промах стоит ровно
+    свой потолок, а не неявные секунды на каждом find_elements.
+    """
+
+    def __init__(self, ui_config: Dict[str, Any], default_timeout: float = 5, poll_interval: float = 0.25):
+        """
+        Args:
+            ui_config: MPSTATS_UI_CONFIG
+            default_timeout: Потолок поиска для элементов без своего "timeout"
+            poll_interval: Период опроса (секунды)
+        """
+        self.ui_config = ui_config
+        self.default_timeout = default_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._winners: Dict[str, int] = {}
+        self._stats: Dict[str, _SelectorStats] = defaultdict(_SelectorStats)
+
+    # ---------- Конфиг ----------
+
+    def entry(self, key: str) -> Dict[str, Any]:
+        """Элемент конфига по пути вида 'tabs.requests'"""
+        node = self.ui_config
+        for part in key.split("."):
+            node = node[part]
+        return node
+
+    def variants(self, key: str) -> List[Tuple[int, str, str]]:
+        """
+        Варианты локатора (номер в конфиге, by, value):
+        последний сработавший первым, остальные по порядку конфига
+        """
+        entry = self.entry(key)
+        locators = [entry] + list(entry.get("fallbacks", []))
+        variants = [(i, getattr(By, locator["by"]), locator["value"]) for i, locator in enumerate(locators)]
+
+        with self._lock:
+            winner = self._winners.get(key, 0)
+        if winner:
+            variants.insert(0, variants.pop(winner))
+        return variants
+
+    # ---------- Поиск ----------
+
+    def _resolve(self, driver: webdriver.Chrome, key: str, min_count: int, only_enabled: bool,
+                 count_only: bool):
+        variants = self.variants(key)
+        position, found = driver.execute_script(RESOLVE_JS, [[by, value] for _, by, value in variants],
+                                                only_enabled, max(1, min_count), count_only)
+        if position < 0:
+            return None, found
+
+        variant, _, value = variants[position]
+        with self._lock:
+            previous = self._winners.get(key, 0)
+            self._winners[key] = variant
+        if variant != previous:
+            logger.warning(f"🎯 Селектор '{key}': сработал вариант #{variant} {value!r} вместо #{previous}")
+        return variant, found
+
+    def find_all(self, driver: webdriver.Chrome, key: str, min_count: int = 1, only_enabled: bool = False,
+                 timeout: Optional[float] = None) -> List[WebElement]:
+        """
+        Ждет, пока хотя бы один вариант локатора найдет не меньше min_count элементов
+
+        Returns:
+            Элементы сработавшего варианта или пустой список по таймауту
+        """
+        if timeout is None:
+            timeout = self.entry(key).get("timeout", self.default_timeout)
+        started = time.perf_counter()
+        deadline = started + timeout
+        variant, elements = None, []
+        while True:
+            variant, elements = self._resolve(driver, key, min_count, only_enabled, count_only=False)
+            if variant is not None or time.perf_counter() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats[key]
+            stats.lookups += 1
+            stats.wait_total += elapsed
+            if variant is None:
+                stats.misses += 1
+            elif variant > 0:
+                stats.fallback_hits += 1
+
+        if variant is None:
+            logger.warning(f"🎯 Элемент '{key}' не найден ни одним вариантом за {timeout}с")
+            return []
+        return elements
+
+    def find(self, driver: webdriver.Chrome, key: str, index: int = 0, only_enabled: bool = False,
+             timeout: Optional[float] = None) -> WebElement:
+        """
+        Элемент с номером index (если элементов меньше - последний найденный)
+
+        Raises:
+            SelectorNotFound: Ни один вариант не нашел элемент за потолок
+        """
+        elements = self.find_all(driver, key, only_enabled=only_enabled, timeout=timeout)
+        if not elements:
+            raise SelectorNotFound(f"Элемент '{key}' не найден")
+        return elements[min(index, len(elements) - 1)]
+
+    def count(self, driver: webdriver.Chrome, key: str, only_enabled: bool = False) -> int:
+        """Количество элементов первого сработавшего варианта (без ожидания)"""
+        _, found = self._resolve(driver, key, 1, only_enabled, count_only=True)
+        return int(found or 0)
+
+    def at_least(self, key: str, count: int, only_enabled: bool = False) -> Callable:
+        """Условие для PageReadiness: какой-либо вариант нашел не меньше count элементов"""
+        return lambda d: self._resolve(d, key, count, only_enabled, count_only=True)[0] is not None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Промахи по элементам: miss_rate - доля поисков, не нашедших элемент"""
+        with self._lock:
+            return {
+                key: {
+                    "lookups": stats.lookups,
+                    "misses": stats.misses,
+                    "miss_rate": stats.misses / stats.lookups if stats.lookups else 0.0,
+                    "fallback_hits": stats.fallback_hits,
+                    "avg_wait": stats.wait_total / stats.lookups if stats.lookups else 0.0,
+                    "variant": self._winners.get(key, 0),
+                }
+                for key, stats in sorted(self._stats.items())
+            }
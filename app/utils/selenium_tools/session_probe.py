@@ -0,0 +1,124 @@
+# app/utils/selenium_tools/session_probe.py
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Any, List, Optional
+
+import requests
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+
+class SessionProbe:
+    """
+    Быстрая проверка авторизации драйвера без навигации браузера.
+
+    1. Куки сайта берутся через CDP (Network.getAllCookies работает
+       на любой странице, даже about:blank) и проверяются на срок жизни.
+    2. С этими куками делается легкий HTTP запрос: редирект на логин
+       или 401/403 означает, что сессия недействительна.
+
+    Исходы: valid, no_cookies, expired, rejected, error.
+    При error результат неизвестен - вызывающий делает полную проверку.
+    """
+
+    OUTCOMES = ("valid", "no_cookies", "expired", "rejected", "error")
+
+    def __init__(self, probe_url: str, cookie_domain: str, auth_cookie_names: Optional[List[str]] = None,
+                 timeout: float = 5, min_ttl: float = 60, history: int = 200):
+        """
+        Args:
+            probe_url: URL, требующий авторизации
+            cookie_domain: Хост сайта, куки которого проверяются (например mpstats.io)
+            auth_cookie_names: Имена кук сессии (пусто - достаточно любой живой куки сайта)
+            timeout: Таймаут HTTP запроса (секунды)
+            min_ttl: Кука, которая истекает раньше чем через min_ttl секунд, считается истекшей
+            history: Сколько последних замеров хранить
+        """
+        self.probe_url = probe_url
+        self.cookie_domain = cookie_domain.lower()
+        self.auth_cookie_names = set(auth_cookie_names or [])
+        self.timeout = timeout
+        self.min_ttl = min_ttl
+        self._lock = threading.Lock()
+        self._outcomes: Counter = Counter()
+        self._latencies = deque(maxlen=history)
+
+    def check(self, driver: webdriver.Chrome) -> str:
+        """
+        Проверяет сессию драйвера
+
+        Returns:
+            Исход проверки (см. OUTCOMES)
+        """
+        started = time.perf_counter()
+        try:
+            outcome = self._check(driver)
+        except Exception as e:
+            logger.warning(f"⚠️ Проверка сессии не удалась: {e}")
+            outcome = "error"
+
+        elapsed = time.perf_counter() - started
+        self.record(outcome, elapsed)
+        logger.info(f"🔐 Проверка сессии: {outcome} за {elapsed * 1000:.0f}мс")
+        return outcome
+
+    def _check(self, driver: webdriver.Chrome) -> str:
+        cookies = [
+            c for c in driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+            if self._is_site_cookie(c.get('domain', ''))
+        ]
+        if not cookies:
+            return "no_cookies"
+
+        deadline = time.time() + self.min_ttl
+        # expires = -1 у сессионных кук
+        live = [c for c in cookies if c.get('session') or c.get('expires', -1) <= 0 or c['expires'] > deadline]
+        live_names = {c['name'] for c in live}
+        if not live or (self.auth_cookie_names and not self.auth_cookie_names <= live_names):
+            return "expired"
+
+        user_agent = driver.execute_script("return navigator.userAgent")
+        response = requests.get(
+            self.probe_url,
+            cookies={c['name']: c['value'] for c in live},
+            headers={"User-Agent": user_agent},
+            allow_redirects=False,
+            timeout=self.timeout
+        )
+        location = response.headers.get("Location", "")
+        if response.status_code in (401, 403) or (response.is_redirect and "login" in location):
+            return "rejected"
+        if response.ok:
+            return "valid"
+        return "error"
+
+    def _is_site_cookie(self, domain: str) -> bool:
+        """Кука выставлена для хоста сайта, его поддомена или родительского домена"""
+        domain = domain.lstrip('.').lower()
+        if not domain:
+            return False
+        host = self.cookie_domain
+        return host == domain or host.endswith("." + domain) or domain.endswith("." + host)
+
+    def record(self, outcome: str, elapsed: float):
+        with self._lock:
+            self._outcomes[outcome] += 1
+            self._latencies.append(elapsed)
+
+    def record_false_positive(self):
+        """Проверка сказала valid, но браузер все равно попал на логин"""
+        with self._lock:
+            self._outcomes["false_positive"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats: Dict[str, Any] = {name: self._outcomes.get(name, 0) for name in self.OUTCOMES}
+            stats["false_positive"] = self._outcomes.get("false_positive", 0)
+            if latencies:
+                stats["p50_ms"] = latencies[len(latencies) // 2] * 1000
+                stats["p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            return stats
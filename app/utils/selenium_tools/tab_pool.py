@@ -0,0 +1,505 @@
+# app/utils/selenium_tools/tab_pool.py
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from app.utils.selenium_tools.download_tracker import CDPDownloadTracker
+from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+from app.utils.selenium_tools.driver_pool import DriverPoolTimeout
+
+logger = logging.getLogger(__name__)
+
+# Атрибуты драйвера, которые не зависят от активной вкладки
+_UNFOCUSED_ATTRIBUTES = {"capabilities", "service", "session_id", "command_executor"}
+
+
+class TabElement:
+    """WebElement вкладки: каждая команда выполняется, когда активна своя вкладка"""
+
+    def __init__(self, tab: "TabDriver", element: WebElement):
+        self._tab = tab
+        self.wrapped_element = element
+
+    def __getattr__(self, name):
+        with self._tab.focused():
+            attribute = getattr(self.wrapped_element, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            with self._tab.focused():
+                return self._tab.wrap(attribute(*self._tab.unwrap(args), **self._tab.unwrap(kwargs)))
+        return call
+
+    def __eq__(self, other):
+        return isinstance(other, TabElement) and self.wrapped_element == other.wrapped_element
+
+    def __hash__(self):
+        return hash(self.wrapped_element)
+
+
+class TabDriver:
+    """
+    Вкладка (окно) общего браузера с интерфейсом WebDriver.
+
+    У сессии WebDriver одна активная вкладка, поэтому каждая команда выполняется
+    под блокировкой браузера, а перед ней при необходимости переключается окно.
+    Паузы и ожидания между командами идут без блокировки - пока одна вкладка
+    ждет ответа MPStats, другие работают. Команды CDP (execute_cdp_cmd)
+    chromedriver отправляет активной вкладке, поэтому они тоже вкладочные.
+    """
+
+    def __init__(self, browser: "TabBrowser", handle: str, index: int):
+        self.browser = browser
+        self.handle = handle
+        self.index = index
+        self.target_id: Optional[str] = None
+        self.uses = 0
+
+    @contextmanager
+    def focused(self):
+        with self.browser.focus(self.handle):
+            yield
+
+    def __getattr__(self, name):
+        if name in _UNFOCUSED_ATTRIBUTES:
+            return getattr(self.browser.driver, name)
+        with self.focused():
+            attribute = getattr(self.browser.driver, name)
+        if not callable(attribute):
+            return self.wrap(attribute)
+
+        def call(*args, **kwargs):
+            with self.focused():
+                return self.wrap(attribute(*self.unwrap(args), **self.unwrap(kwargs)))
+        return call
+
+    def quit(self):
+        """Закрывает только вкладку: браузер общий"""
+        self.browser.close_tab(self)
+
+    def wrap(self, value):
+        if isinstance(value, WebElement):
+            return TabElement(self, value)
+        if isinstance(value, list):
+            return [self.wrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.wrap(item) for key, item in value.items()}
+        return value
+
+    def unwrap(self, value):
+        if isinstance(value, TabElement):
+            return value.wrapped_element
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.unwrap(item) for item in value)
+        if isinstance(value, dict):
+            return {key: self.unwrap(item) for key, item in value.items()}
+        return value
+
+    def __repr__(self):
+        return f"<TabDriver #{self.index} {self.handle}>"
+
+
+class TabBrowser:
+    """
+    Один авторизованный Chrome с несколькими окнами-вкладками.
+
+    Каждая вкладка - отдельное окно, а не вкладка в фоне: Chrome замедляет
+    таймеры фоновых вкладок, а окна в headless режиме все "видимы".
+    Скачивания всех вкладок идут в общую директорию браузера и
+    отслеживаются одним CDP трекером; файл относится к вкладке по frameId.
+    """
+
+    def __init__(self, driver: webdriver.Chrome, downloads_dir: str,
+                 tab_setup: Optional[Callable[[TabDriver], None]] = None):
+        """
+        Args:
+            driver: Готовый (авторизованный) драйвер
+            downloads_dir: Общая директория скачиваний браузера (удаляется при закрытии)
+            tab_setup: Настройка новой вкладки (stealth, сетевой профиль, трекер сети)
+        """
+        self.driver = driver
+        self.downloads_dir = downloads_dir
+        self.tab_setup = tab_setup
+        self.created_at = time.time()
+        self.uses = 0
+        self.alive = True
+
+        self._lock = threading.RLock()
+        self._current = driver.current_window_handle
+        self.downloads = CDPDownloadTracker(driver, downloads_dir)
+        self.downloads.start()
+
+    @contextmanager
+    def focus(self, handle: str):
+        """Блокировка браузера с активной вкладкой handle"""
+        with self._lock:
+            if self._current != handle:
+                self.driver.switch_to.window(handle)
+                self._current = handle
+            yield
+
+    def first_tab(self) -> TabDriver:
+        """Вкладка, открытая при запуске браузера (уже настроена и авторизована)"""
+        tab = TabDriver(self, self._current, 0)
+        tab.target_id = self._target_id(tab)
+        return tab
+
+    def open_tab(self, index: int) -> TabDriver:
+        """Открывает новое окно и настраивает его"""
+        with self._lock:
+            self.driver.switch_to.new_window("window")
+            self._current = self.driver.current_window_handle
+            tab = TabDriver(self, self._current, index)
+        tab.target_id = self._target_id(tab)
+        if self.tab_setup:
+            self.tab_setup(tab)
+        logger.info(f"🗂️ Открыта вкладка #{index}")
+        return tab
+
+    def close_tab(self, tab: TabDriver):
+        """Закрывает вкладку, не трогая остальные"""
+        with self._lock:
+            try:
+                self.driver.switch_to.window(tab.handle)
+                if len(self.driver.window_handles) <= 1:
+                    # Последнее окно закрыло бы браузер - оставляем пустую страницу
+                    self.driver.get("about:blank")
+                else:
+                    self.driver.close()
+            except Exception as e:
+                logger.debug(f"Не удалось закрыть вкладку #{tab.index}: {e}")
+            finally:
+                self._current = None
+
+    def is_tab_healthy(self, tab: TabDriver, health_check: Optional[Callable] = None) -> bool:
+        """Отвечает ли вкладка (упавшая вкладка не трогает остальные)"""
+        try:
+            with self.focus(tab.handle):
+                _ = self.driver.current_url
+        except Exception as e:
+            logger.warning(f"⚠️ Вкладка #{tab.index} не отвечает: {e}")
+            self._check_alive()
+            return False
+        if health_check:
+            try:
+                return bool(health_check(tab))
+            except Exception as e:
+                logger.warning(f"⚠️ Проверка сессии вкладки #{tab.index} упала: {e}")
+                return False
+        return True
+
+    def _check_alive(self):
+        """Упала вкладка или весь браузер"""
+        try:
+            with self._lock:
+                _ = self.driver.window_handles
+        except Exception:
+            self.alive = False
+
+    def _target_id(self, tab: TabDriver) -> Optional[str]:
+        """id CDP target вкладки - он же frameId главного фрейма в событиях скачивания"""
+        try:
+            return tab.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+        except Exception as e:
+            logger.debug(f"Target.getTargetInfo недоступен ({e}), использую handle окна")
+            return tab.handle
+
+    def quit(self):
+        self.alive = False
+        self.downloads.stop()
+        try:
+            self.driver.quit()
+        except Exception:
+            logger.warning("⚠️ Не удалось закрыть браузер вкладок")
+        shutil.rmtree(self.downloads_dir, ignore_errors=True)
+
+
+class TabPool:
+    """
+    Пул вкладок одного авторизованного Chrome - альтернатива ChromeDriverPool,
+    где каждый параллельный запрос стоит целого браузера со своим логином.
+
+    Интерфейс как у ChromeDriverPool: acquire() выдает TabDriver,
+    release() возвращает его. Упавшая вкладка закрывается и открывается
+    заново, остальные продолжают работу. Браузер пересоздается, когда
+    умер, исчерпал max_uses или превысил max_memory_mb - после того,
+    как все вкладки вернулись.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[int], webdriver.Chrome],
+            downloads_dir: str,
+            tabs: int = 3,
+            tab_setup: Optional[Callable[[TabDriver], None]] = None,
+            health_check: Optional[Callable[[TabDriver], bool]] = None,
+            max_uses: int = 100,
+            max_memory_mb: int = 3000,
+            on_close: Optional[Callable[[webdriver.Chrome], None]] = None
+    ):
+        """
+        Args:
+            factory: Функция создания готового (авторизованного) драйвера
+            downloads_dir: Родительская директория для скачиваний браузеров пула
+            tabs: Количество вкладок (одновременных запросов)
+            tab_setup: Настройка новой вкладки
+            health_check: Проверка сессии вкладки (True - можно использовать)
+            max_uses: Пересоздавать браузер после стольких запросов всех вкладок
+            max_memory_mb: Пересоздавать браузер при превышении памяти (RSS дерева процессов)
+            on_close: Вызывается с драйвером браузера после его закрытия пулом
+        """
+        self.factory = factory
+        self.on_close = on_close
+        self.downloads_dir = downloads_dir
+        self.tabs = max(1, tabs)
+        self.tab_setup = tab_setup
+        self.health_check = health_check
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+
+        self._condition = threading.Condition()
+        self._create_lock = threading.Lock()
+        self._browser: Optional[TabBrowser] = None
+        self._retiring: List[TabBrowser] = []
+        self._idle = deque()
+        self._leased: Dict[int, TabDriver] = {}
+        self._opened = 0
+        self._closed = False
+
+        self._wait_times = deque(maxlen=500)
+        self._stats = {
+            "browsers_created": 0,
+            "create_failed": 0,
+            "browsers_recycled": 0,
+            "tabs_opened": 0,
+            "tabs_failed": 0,
+            "acquired": 0,
+            "timeouts": 0,
+        }
+
+    # ---------- Жизненный цикл ----------
+
+    def warm_up(self, background: bool = True):
+        """Запускает браузер и открывает все вкладки (по умолчанию в фоновом потоке)"""
+        if background:
+            threading.Thread(target=self._warm_up, name="tab-pool-warmup", daemon=True).start()
+        else:
+            self._warm_up()
+
+    def _warm_up(self):
+        try:
+            tabs = [self.acquire(timeout=600) for _ in range(self.tabs)]
+        except Exception as e:
+            logger.error(f"❌ Не удалось прогреть пул вкладок: {e}")
+            return
+        for tab in tabs:
+            self.release(tab)
+        logger.info(f"✅ Пул вкладок прогрет: {len(tabs)} вкладок")
+
+    def _ensure_browser(self) -> TabBrowser:
+        """Текущий браузер или новый (создание - вне блокировки пула)"""
+        with self._create_lock:
+            with self._condition:
+                browser = self._browser
+            if browser and browser.alive:
+                return browser
+
+            started = time.perf_counter()
+            try:
+                driver = self.factory(0)
+            except Exception as e:
+                with self._condition:
+                    self._stats["create_failed"] += 1
+                raise RuntimeError(f"Не удалось запустить браузер вкладок: {e}")
+            downloads_dir = os.path.join(self.downloads_dir, f"tabs_{int(time.time() * 1000)}")
+            os.makedirs(downloads_dir, exist_ok=True)
+            browser = TabBrowser(driver, downloads_dir, self.tab_setup)
+            logger.info(f"✅ Браузер вкладок запущен за {time.perf_counter() - started:.1f}с")
+
+            with self._condition:
+                self._browser = browser
+                self._idle.append(browser.first_tab())
+                self._opened = 1
+                self._stats["browsers_created"] += 1
+                self._condition.notify()
+            return browser
+
+    def close(self):
+        """Закрывает браузер пула"""
+        with self._condition:
+            self._closed = True
+            browsers = [b for b in [self._browser] + self._retiring if b]
+            self._browser = None
+            self._retiring.clear()
+            self._idle.clear()
+            self._leased.clear()
+            self._condition.notify_all()
+        for browser in browsers:
+            self._quit_browser(browser)
+        logger.info("Пул вкладок закрыт")
+
+    # ---------- Аренда ----------
+
+    def acquire(self, timeout: float = 300) -> TabDriver:
+        """
+        Выдает свободную вкладку. Если свободных нет, но вкладок меньше tabs -
+        открывает новую, иначе ждет возврата.
+
+        Raises:
+            DriverPoolTimeout: если вкладка не освободилась за timeout секунд
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+
+        while True:
+            browser = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Пул вкладок закрыт")
+                    browser = self._browser
+                    if browser is None or not browser.alive or self._idle or self._opened < self.tabs:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise DriverPoolTimeout(f"Нет свободной вкладки за {timeout}с")
+                    self._condition.wait(remaining)
+
+                tab = self._idle.popleft() if browser and browser.alive and self._idle else None
+                open_index = None
+                if tab is None and browser and browser.alive:
+                    open_index = self._opened
+                    self._opened += 1
+
+            if browser is None or not browser.alive:
+                self._retire_dead()
+                self._ensure_browser()
+                continue
+
+            if tab is None:
+                try:
+                    tab = browser.open_tab(open_index)
+                except Exception as e:
+                    logger.error(f"❌ Не удалось открыть вкладку #{open_index}: {e}")
+                    with self._condition:
+                        self._opened -= 1
+                        self._stats["tabs_failed"] += 1
+                        self._condition.notify()
+                    browser._check_alive()
+                    if time.monotonic() >= deadline:
+                        raise
+                    continue
+                with self._condition:
+                    self._stats["tabs_opened"] += 1
+
+            with self._condition:
+                tab.uses += 1
+                browser.uses += 1
+                self._leased[id(tab)] = tab
+                self._stats["acquired"] += 1
+                self._wait_times.append(time.perf_counter() - started)
+
+            logger.info(f"🗂️ Вкладка #{tab.index} выдана (использование #{tab.uses})")
+            return tab
+
+    def release(self, tab: TabDriver):
+        """Возвращает вкладку (упавшую закрывает, браузер пересоздает, если пора)"""
+        with self._condition:
+            if self._leased.pop(id(tab), None) is None:
+                logger.warning("⚠️ Возвращена вкладка, не принадлежащая пулу")
+                return
+        browser = tab.browser
+
+        healthy = browser.alive and browser.is_tab_healthy(tab, self.health_check)
+        if not healthy and browser.alive:
+            logger.info(f"♻️ Закрываю вкладку #{tab.index}: проверка не пройдена")
+            browser.close_tab(tab)
+
+        reason = self._recycle_reason(browser) if browser is self._browser else None
+        with self._condition:
+            if reason and self._browser is browser:
+                logger.info(f"♻️ Пересоздаю браузер вкладок: {reason}")
+                self._stats["browsers_recycled"] += 1
+                self._retiring.append(browser)
+                self._browser = None
+                self._idle.clear()
+                self._opened = 0
+            elif browser is self._browser:
+                if healthy:
+                    self._idle.append(tab)
+                else:
+                    self._opened -= 1
+                    self._stats["tabs_failed"] += 1
+            self._condition.notify()
+        self._retire_dead()
+
+    def owns(self, driver) -> bool:
+        """Принадлежит ли вкладка пулу"""
+        with self._condition:
+            return id(driver) in self._leased
+
+    # ---------- Проверки ----------
+
+    def _recycle_reason(self, browser: TabBrowser) -> Optional[str]:
+        if not browser.alive:
+            return "браузер не отвечает"
+        if self.max_uses and browser.uses >= self.max_uses:
+            return f"достигнут лимит запросов ({browser.uses})"
+        if self.max_memory_mb:
+            memory_mb = ChromeDriverManager.get_driver_memory_mb(browser.driver)
+            if memory_mb and memory_mb > self.max_memory_mb:
+                return f"память {memory_mb:.0f}MB > {self.max_memory_mb}MB"
+        return None
+
+    def _retire_dead(self):
+        """Закрывает выведенные и умершие браузеры, когда их вкладки вернулись"""
+        with self._condition:
+            if self._browser and not self._browser.alive:
+                self._retiring.append(self._browser)
+                self._browser = None
+                self._idle.clear()
+                self._opened = 0
+            leased_browsers = {id(tab.browser) for tab in self._leased.values()}
+            done = [b for b in self._retiring if id(b) not in leased_browsers]
+            self._retiring = [b for b in self._retiring if id(b) in leased_browsers]
+        for browser in done:
+            self._quit_browser(browser)
+
+    def _quit_browser(self, browser: TabBrowser):
+        browser.quit()
+        if self.on_close:
+            try:
+                self.on_close(browser.driver)
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка после закрытия браузера вкладок: {e}")
+
+    # ---------- Метрики ----------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Вкладки, занятость и время ожидания вкладки"""
+        with self._condition:
+            waits = sorted(self._wait_times)
+            stats = dict(self._stats)
+            stats.update({
+                "tabs": self.tabs,
+                "opened": self._opened,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "browser_uses": self._browser.uses if self._browser else 0,
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            })
+        stats["memory_mb"] = ChromeDriverManager.get_driver_memory_mb(self._browser.driver) \
+            if self._browser else None
+        return stats
@@ -0,0 +1,72 @@
+# app/utils/single_flight.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов в один.
+
+    Пока задача по ключу выполняется, все новые вызовы с тем же ключом
+    ждут ее результат вместо запуска своей. Исключение получают все
+    ожидающие. Отмена одного из ожидающих не отменяет общую задачу;
+    с cancel_abandoned она отменяется, когда отменены все ожидающие.
+    """
+
+    def __init__(self, name: str = "single-flight", cancel_abandoned: bool = False):
+        """
+        Args:
+            name: Имя для логов и имен задач
+            cancel_abandoned: Отменять общую задачу, если ее больше никто не ждет
+        """
+        self.name = name
+        self.cancel_abandoned = cancel_abandoned
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "abandoned": 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет func() один раз на ключ среди одновременных вызовов
+
+        Args:
+            key: Ключ объединения
+            func: Фабрика корутины (вызывается только у первого вызывающего)
+        """
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.create_task(func(), name=f"{self.name}:{key}")
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"🔗 {self.name}: присоединяюсь к уже выполняющемуся запросу")
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.cancel_abandoned and self._waiters[task] == 1 and not task.done():
+                self.stats["abandoned"] += 1
+                logger.info(f"⏹️ {self.name}: запрос больше никто не ждет, отменяю")
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Забираем исключение, если всех ожидающих отменили, чтобы не было "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "inflight": len(self._inflight)}
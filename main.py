@@ -34,6 +34,9 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Драйвер берется из локального кэша, сеть нужна только для фоновой проверки обновлений
     updater = ChromeDriverUpdater()
     driver_path = updater.update_once()
+    if config.scraper.driver_background_refresh:
+        updater.start_background_refresh()
     asyncio.run(main())
\ No newline at end of file
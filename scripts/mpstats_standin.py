@@ -0,0 +1,361 @@
+# scripts/mpstats_standin.py
+# !/usr/bin/env python3
+"""
+Локальная копия MPStats для офлайн бенчмарков скрапера.
+
+Отдает страницы с теми же элементами, что описаны в MPSTATS_UI_CONFIG
+(форма логина, вкладки, textarea, "Подобрать запросы", кнопки скачивания),
+и xlsx выгрузку в формате MPStats. Задержки ответа настраиваются.
+Порядок элементов повторяет то, что ожидает скрапер: он кликает по индексам
+(вкладка #1, кнопки скачивания #0 и #2).
+
+Адрес по умолчанию - 127.0.0.1: его резолвят и Chrome, и Python (быстрая проверка
+сессии SessionProbe ходит на сайт через requests). Имена *.localhost Chrome
+направляет на 127.0.0.1 сам, а getaddrinfo их может не знать.
+
+Пример:
+    python scripts/mpstats_standin.py --port 8765 --results-latency 3 --export-latency 1
+    MPSTATS_SITE_URL=http://127.0.0.1:8765 python main.py
+"""
+import argparse
+import html
+import io
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, parse_qs, quote
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+
+from app.config.mpstats_ui_config import MPSTATS_UI_CONFIG
+
+KEYWORDS_PATH = "/seo/keywords/expanding"
+SESSION_COOKIE = "mpstats_session"
+
+TAB_CLASS = "tYj44tFk"
+BUTTON_CLASS = MPSTATS_UI_CONFIG["download"]["download_btn"]["value"].replace(".", " ").strip()
+
+# Слова, из которых собираются "поисковые запросы" выгрузки
+MODIFIERS = [
+    "купить", "для кухни", "для ванной", "самоклеящиеся", "влагостойкие", "белые", "под дерево",
+    "под камень", "3д", "в рулоне", "для стен", "пвх", "на кухню фартук", "недорого", "декоративные",
+    "мягкие", "в спальню", "в гостиную", "под кирпич", "под мрамор", "набор", "с рисунком",
+]
+
+LOGIN_PAGE = """<!doctype html>
+<html lang="ru"><head><meta charset="utf-8"><title>MPStats - вход</title></head>
+<body>
+<form method="post" action="/login" name="login">
+  <input type="email" name="mpstats-login-form-name" autocomplete="username">
+  <input type="password" name="mpstats-login-form-password" autocomplete="current-password">
+  <button type="submit">Войти</button>
+</form>
+</body></html>
+"""
+
+# SPA страницы "Расширение запросов": результаты приходят fetch-запросом,
+# после ответа панель вкладок и кнопок перерисовывается (как у MPStats).
+# Таблица как в AG Grid: aria-rowcount - всего строк, отрисовано не больше
+# grid_rows (остальные - виртуальная прокрутка)
+KEYWORDS_PAGE = """<!doctype html>
+<html lang="ru"><head><meta charset="utf-8"><title>MPStats - SEO</title>
+<style>.hidden {{ display: none; }} [role=row] {{ display: flex; gap: 12px; }}</style></head>
+<body>
+<div id="tabs"><div class="{tab}">Расширение</div><div class="{tab}">Запросы</div></div>
+<textarea id="query" rows="4" cols="80"></textarea>
+<div id="toolbar"><button class="{button}" id="find" disabled>Подобрать запросы</button></div>
+<div id="results"></div>
+<script>
+const TAB = "{tab}", BUTTON = "{button}", GRID_ROWS = {grid_rows};
+let lastQuery = "";
+const query = document.getElementById("query");
+const find = document.getElementById("find");
+query.addEventListener("input", () => {{ find.disabled = !query.value.trim(); }});
+
+function button(text, onClick, hidden) {{
+  const b = document.createElement("button");
+  b.className = BUTTON + (hidden ? " hidden" : "");
+  b.textContent = text;
+  b.addEventListener("click", onClick);
+  return b;
+}}
+
+function showWords() {{
+  const toolbar = document.getElementById("toolbar");
+  toolbar.innerHTML = "";
+  const xlsx = button("XLSX", () => {{
+    window.location.href = "/export.xlsx?q=" + encodeURIComponent(lastQuery);
+  }}, true);
+  const csv = button("CSV", () => {{}}, true);
+  toolbar.append(
+    button("Экспорт", () => {{ xlsx.classList.remove("hidden"); csv.classList.remove("hidden"); }}),
+    button("Колонки", () => {{}}),
+    xlsx, csv
+  );
+}}
+
+find.addEventListener("click", async () => {{
+  lastQuery = query.value.trim();
+  const response = await fetch("/api/keywords", {{
+    method: "POST", headers: {{"Content-Type": "application/json"}},
+    body: JSON.stringify({{query: lastQuery}})
+  }});
+  const data = await response.json();
+  const tabs = document.getElementById("tabs");
+  tabs.innerHTML = "";
+  ["Запросы", "Слова"].forEach((name, i) => {{
+    const tab = document.createElement("div");
+    tab.className = TAB;
+    tab.textContent = name;
+    if (i === 1) {{ tab.addEventListener("click", showWords); }}
+    tabs.append(tab);
+  }});
+  document.getElementById("toolbar").append(button("Экспорт", () => {{}}));
+  const grid = document.createElement("div");
+  grid.setAttribute("role", "grid");
+  grid.setAttribute("aria-rowcount", data.rows.length + 1);
+  const line = (values, role, index) => {{
+    const row = document.createElement("div");
+    row.setAttribute("role", "row");
+    row.setAttribute("aria-rowindex", index);
+    values.forEach(value => {{
+      const cell = document.createElement("span");
+      cell.setAttribute("role", role);
+      cell.textContent = value;
+      row.append(cell);
+    }});
+    return row;
+  }};
+  grid.append(line(["Запрос", "Частота WB"], "columnheader", 1));
+  data.rows.slice(0, GRID_ROWS).forEach((row, i) => {{
+    grid.append(line([row.word, row.frequency.toLocaleString("ru-RU")], "gridcell", i + 2));
+  }});
+  document.getElementById("results").replaceChildren(grid);
+}});
+</script>
+</body></html>
+"""
+
+
+def generate_rows(query: str, count: int) -> List[Dict[str, Any]]:
+    """Запросы выгрузки: слова запроса + модификаторы, частоты по убыванию (детерминированно)"""
+    rng = random.Random(query)
+    base = [word for word in query.lower().replace(",", " ").split() if len(word) > 2] or ["панели"]
+    rows, seen = [], set()
+    frequency = rng.randint(20000, 90000)
+    for _ in range(count * 5):
+        if len(rows) >= count:
+            break
+        phrase = " ".join(rng.sample(base, k=min(len(base), rng.randint(1, 2))) + [rng.choice(MODIFIERS)])
+        if phrase in seen:
+            continue
+        seen.add(phrase)
+        frequency = max(10, int(frequency * rng.uniform(0.9, 0.99)))
+        rows.append({
+            "word": phrase,
+            "frequency": frequency,
+            "change": round(rng.uniform(-40, 60), 1),
+            "products": rng.randint(50, 20000),
+        })
+    return rows
+
+
+def build_xlsx(rows: List[Dict[str, Any]]) -> bytes:
+    """xlsx в формате выгрузки MPStats: первый столбец - запрос"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Слова"
+    sheet.append(["Запрос", "Частота WB", "Изменение, %", "Товаров"])
+    for row in rows:
+        sheet.append([row["word"], row["frequency"], row["change"], row["products"]])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class MPStatsStandIn:
+    """
+    Локальный HTTP сервер, изображающий MPStats.
+
+    Задержки (секунды) - page_latency на каждую страницу, results_latency на
+    "Подобрать запросы", export_latency на выгрузку; jitter - разброс в долях.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, hostname: str = "127.0.0.1",
+                 page_latency: float = 0.05, results_latency: float = 2.0, export_latency: float = 1.0,
+                 jitter: float = 0.2, rows: int = 300, grid_rows: int = 50, email: str = "", password: str = ""):
+        self.host = host
+        self.hostname = hostname
+        self.page_latency = page_latency
+        self.results_latency = results_latency
+        self.export_latency = export_latency
+        self.jitter = jitter
+        self.rows = rows
+        self.grid_rows = grid_rows
+        self.email = email
+        self.password = password
+        self.sessions = set()
+        self.stats = {"logins": 0, "pages": 0, "queries": 0, "exports": 0, "rejected": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.hostname}:{self.port}"
+
+    def start(self) -> "MPStatsStandIn":
+        """Запускает сервер в фоновом потоке"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mpstats-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def delay(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _session(self) -> Optional[str]:
+                for part in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == SESSION_COOKIE and value in standin.sessions:
+                        return value
+                return None
+
+            def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8",
+                      headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None):
+                self._send(302, headers={"Location": location, **(headers or {})})
+
+            def do_GET(self):
+                parts = urlparse(self.path)
+                standin.delay(standin.page_latency)
+                if parts.path == "/login":
+                    standin.count("pages")
+                    self._send(200, LOGIN_PAGE.encode())
+                elif parts.path == KEYWORDS_PATH:
+                    if not self._session():
+                        standin.count("rejected")
+                        self._redirect("/login")
+                        return
+                    standin.count("pages")
+                    page = KEYWORDS_PAGE.format(tab=TAB_CLASS, button=html.escape(BUTTON_CLASS),
+                                                grid_rows=standin.grid_rows)
+                    self._send(200, page.encode())
+                elif parts.path == "/export.xlsx":
+                    if not self._session():
+                        self._send(401)
+                        return
+                    standin.count("exports")
+                    standin.delay(standin.export_latency)
+                    query = parse_qs(parts.query).get("q", [""])[0]
+                    body = build_xlsx(generate_rows(query, standin.rows))
+                    filename = quote(f"mpstats_keywords_{int(time.time())}.xlsx")
+                    self._send(200, body, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                               {"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"})
+                elif parts.path == "/":
+                    self._redirect(KEYWORDS_PATH)
+                else:
+                    self._send(404)
+
+            def do_POST(self):
+                parts = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if parts.path == "/login":
+                    form = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+                    standin.delay(standin.page_latency)
+                    if ((standin.email and form.get("mpstats-login-form-name") != standin.email)
+                            or (standin.password and form.get("mpstats-login-form-password") != standin.password)):
+                        self._redirect("/login")
+                        return
+                    token = secrets.token_hex(16)
+                    standin.sessions.add(token)
+                    standin.count("logins")
+                    self._redirect(KEYWORDS_PATH, {
+                        "Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; Max-Age=2592000; HttpOnly"
+                    })
+                elif parts.path == "/api/keywords":
+                    if not self._session():
+                        self._send(401, b"{}", "application/json")
+                        return
+                    standin.count("queries")
+                    standin.delay(standin.results_latency)
+                    query = json.loads(body or b"{}").get("query", "")
+                    payload = {"rows": generate_rows(query, standin.rows)}
+                    self._send(200, json.dumps(payload, ensure_ascii=False).encode(), "application/json")
+                else:
+                    self._send(404)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная копия MPStats для бенчмарков скрапера")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--hostname", default="127.0.0.1", help="Имя хоста в URL для скрапера")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="Задержка страниц (с)")
+    parser.add_argument("--results-latency", type=float, default=2.0, help="Задержка 'Подобрать запросы' (с)")
+    parser.add_argument("--export-latency", type=float, default=1.0, help="Задержка выгрузки xlsx (с)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Разброс задержек (доля)")
+    parser.add_argument("--rows", type=int, default=300, help="Строк в выгрузке")
+    parser.add_argument("--grid-rows", type=int, default=50, help="Строк, отрисованных в таблице на странице")
+    args = parser.parse_args()
+
+    standin = MPStatsStandIn(
+        host=args.host, port=args.port, hostname=args.hostname, page_latency=args.page_latency,
+        results_latency=args.results_latency, export_latency=args.export_latency,
+        jitter=args.jitter, rows=args.rows, grid_rows=args.grid_rows
+    )
+    print(f"🧪 MPStats stand-in: {standin.url}{KEYWORDS_PATH}")
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {standin.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/network_profile_benchmark.py
+# !/usr/bin/env python3
+"""
+Сравнение сетевых профилей Chrome на странице MPStats:
+время загрузки и объем переданных данных с блокировками и без.
+
+Каждый профиль получает свою временную директорию Chrome, поэтому первый
+прогон - холодный кэш, остальные - теплый.
+
+Пример:
+    python scripts/network_profile_benchmark.py --runs 5 --profiles default,lean,strict --login
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.config import config, SeleniumConfig
+from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+from app.utils.selenium_tools.network_profile import NetworkProfile, measure_page_load, summarize_runs
+
+KEYWORDS_URL = "https://mpstats.io/seo/keywords/expanding"
+
+
+def run_profile(profile_name: str, url: str, runs: int, login: bool) -> dict:
+    """Прогоны одного профиля: первый холодный, остальные с теплым кэшем"""
+    profile = NetworkProfile(name=profile_name, allowed_hosts=config.scraper.network_allowed_hosts)
+    user_data_dir = tempfile.mkdtemp(prefix=f"bench_{profile_name}_")
+    results = []
+    try:
+        for run in range(runs):
+            manager = ChromeDriverManager(headless=SeleniumConfig.headless, use_stealth=SeleniumConfig.stealth_mode)
+            driver = manager.create_driver(profile_dir=user_data_dir, network_profile=profile)
+            try:
+                if login and run == 0:
+                    from app.services.mpstats_scraper_service import MPStatsScraperService
+                    scraper = MPStatsScraperService(config)
+                    scraper.profile_dir = user_data_dir
+                    scraper._login_to_mpstats(driver)
+
+                metrics = measure_page_load(driver, url)
+                if manager.request_allowlist:
+                    metrics["blocked_by_allowlist"] = manager.request_allowlist.get_stats()["blocked"]
+                results.append(metrics)
+                print(f"  [{profile_name}] прогон {run + 1}: {metrics['wall_s']:.2f}с, "
+                      f"load {metrics['load_ms'] or 0:.0f}мс, "
+                      f"{metrics['requests']} запросов, {metrics['transferred_bytes'] / 1024:.0f} КБ")
+            finally:
+                driver.quit()
+    finally:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+    return {
+        "cold": results[0] if results else {},
+        "warm": summarize_runs(results[1:]) if len(results) > 1 else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сетевых профилей Chrome для MPStats")
+    parser.add_argument("--url", default=KEYWORDS_URL)
+    parser.add_argument("--runs", type=int, default=3, help="Прогонов на профиль (первый - холодный)")
+    parser.add_argument("--profiles", default="default,lean,strict")
+    parser.add_argument("--login", action="store_true", help="Авторизоваться перед замерами")
+    args = parser.parse_args()
+
+    summary = {}
+    for profile_name in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        print(f"\n🚦 Профиль: {profile_name}")
+        summary[profile_name] = run_profile(profile_name, args.url, args.runs, args.login)
+
+    print("\n" + "=" * 78)
+    print(f"{'профиль':<10}{'кэш':<7}{'wall, с':>10}{'load, мс':>12}{'запросов':>11}{'передано, КБ':>16}")
+    print("-" * 78)
+    for profile_name, result in summary.items():
+        for phase in ("cold", "warm"):
+            m = result.get(phase) or {}
+            if not m:
+                continue
+            print(f"{profile_name:<10}{phase:<7}{m.get('wall_s') or 0:>10.2f}{m.get('load_ms') or 0:>12.0f}"
+                  f"{m.get('requests') or 0:>11.0f}{(m.get('transferred_bytes') or 0) / 1024:>16.0f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
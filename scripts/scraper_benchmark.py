@@ -0,0 +1,407 @@
+# scripts/scraper_benchmark.py
+# !/usr/bin/env python3
+"""
+Офлайн бенчмарк скрапера: настоящий MPStatsScraperService против
+локальной копии MPStats (scripts/mpstats_standin.py).
+
+Фазы:
+- cold: первая задача с пустым профилем (запуск Chrome + логин + скрапинг)
+- warm: последовательные задачи с авторизованным профилем
+- load: --jobs задач по --concurrency одновременно (пропускная способность)
+
+Для каждой фазы - задержка задачи (p50/p95/max), медианы фаз конвейера
+(timings) и пиковая память Chrome за задачу. Для фазы load - пиковая память
+всех браузеров вместе и пропускная способность на GB памяти.
+
+Модели параллельности: браузер на задачу (по умолчанию, --pool - пул браузеров)
+или вкладки одного браузера (--tabs N). --compare прогоняет обе модели.
+
+--sources N: после warm еще N пар задач, чередуя источник результатов задачи:
+скачивание xlsx с разбором и захват ответа API через CDP Network. Для каждого
+источника - задержка, получение и разбор результатов, память Python (tracemalloc)
+и пиковая память Chrome.
+
+Пример:
+    python scripts/scraper_benchmark.py --warm 5 --jobs 6 --concurrency 2 --results-latency 3
+    python scripts/scraper_benchmark.py --pool --json logs/scraper_benchmark.json
+    python scripts/scraper_benchmark.py --compare --jobs 9 --concurrency 3 --warm 1
+    python scripts/scraper_benchmark.py --warm 1 --jobs 0 --sources 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.config import config
+from app.services.mpstats_scraper_service import MPStatsScraperService
+from app.utils.job_timing import timings
+from app.utils.keywords_processor import KeywordsProcessor
+from app.utils.selenium_tools.driver_manager import ChromeDriverManager
+from app.utils.selenium_tools.profile_template import ProfileTemplateManager
+from app.utils.selenium_tools.session_probe import SessionProbe
+
+from scripts.mpstats_standin import MPStatsStandIn, KEYWORDS_PATH
+
+KEYWORDS_PROCESSOR = KeywordsProcessor(target_column="Слова")
+
+
+class TotalMemorySampler:
+    """Пиковый суммарный RSS всех дочерних процессов (chromedriver + Chrome всех браузеров)"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="benchmark-memory", daemon=True)
+
+    def _run(self):
+        own_pid = os.getpid()
+        while not self._stop_event.is_set():
+            total_kb = 0
+            for pid in ChromeDriverManager.get_process_tree_pids(own_pid):
+                if pid == own_pid:
+                    continue
+                try:
+                    with open(f"/proc/{pid}/status") as f:
+                        total_kb += next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), 0)
+                except (OSError, ValueError):
+                    continue
+            self.peak_mb = max(self.peak_mb, total_kb / 1024)
+            self._stop_event.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop_event.set()
+        self._thread.join()
+
+
+def configure(site_url: str, hostname: str, work_dir: str, pool: bool, concurrency: int, tabs: int = 0,
+              grid: bool = False, network_profile: Optional[str] = None):
+    """Направляет скрапер на локальную копию и изолирует профиль Chrome бенчмарка"""
+    scraper_config = config.scraper
+    scraper_config.site_url = site_url
+    if network_profile:
+        scraper_config.network_profile = network_profile
+    scraper_config.network_allowed_hosts = [hostname]
+    scraper_config.http_fast_path_enabled = False
+    scraper_config.grid_extraction_enabled = grid
+    scraper_config.driver_pool_enabled = pool
+    if pool:
+        scraper_config.driver_pool_size = max(scraper_config.driver_pool_size, concurrency)
+    scraper_config.tab_workers = tabs
+    # Поток на каждую одновременную задачу, иначе бенчмарк измерит очередь потоков, а не скрапинг
+    scraper_config.executor_workers = max(scraper_config.executor_workers, concurrency, tabs + 1)
+    scraper_config.profile_clones_dir = os.path.join(work_dir, "clones")
+    config.api.mpstats_email = config.api.mpstats_email or "benchmark@example.com"
+    config.api.mpstats_pswd = config.api.mpstats_pswd or "benchmark"
+    # Замеры бенчмарка не смешиваем с рабочими
+    timings.records_file = None
+
+    scraper = MPStatsScraperService(config)
+    scraper.profile_dir = os.path.join(work_dir, "chrome_profile")
+    if scraper.profile_templates:
+        scraper.profile_templates = ProfileTemplateManager(
+            template_dir=scraper.profile_dir,
+            clones_dir=scraper_config.profile_clones_dir,
+            stale_after=scraper_config.profile_clone_stale_minutes * 60
+        )
+    return scraper
+
+
+async def run_job(scraper: MPStatsScraperService, params: Dict[str, Any], parse: bool = False) -> Dict[str, Any]:
+    """
+    Одна задача как в DataCollectionService: форма, результаты (ответ API,
+    таблица или скачивание), освобождение драйвера. parse - еще и разбор
+    результатов в ключевые слова (xlsx через pandas, строки - фильтром)
+    """
+    started = time.perf_counter()
+    ok = False
+    driver = None
+    source = None
+    py_peak_mb = None
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    with timings.job("benchmark", category=params["category"]) as job:
+        try:
+            result = await scraper.scrape_categories(params)
+            if result["status"] != "success":
+                raise RuntimeError(result.get("message"))
+            driver = result["driver"]
+            with timings.span("download"):
+                results = await scraper.collect_results(driver, params)
+            source = results["source"]
+            if source in ("network", "grid"):
+                ok = bool(results["rows"])
+                if parse:
+                    with timings.span("parse"):
+                        ok = bool(KEYWORDS_PROCESSOR.filter_keywords([row["word"] for row in results["rows"]],
+                                                                     limit=200))
+            else:
+                excel_file = results["file"]
+                ok = bool(excel_file and os.path.getsize(excel_file) > 0)
+                if ok and parse:
+                    with timings.span("parse"):
+                        ok = bool(await asyncio.to_thread(KEYWORDS_PROCESSOR.extract_keywords_from_excel,
+                                                          excel_file))
+                shutil.rmtree(os.path.dirname(excel_file), ignore_errors=True)
+            if tracemalloc.is_tracing():
+                py_peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        except Exception as e:
+            print(f"  ❌ {e}")
+            job.status = "error"
+        finally:
+            if driver:
+                with timings.span("driver_release"):
+                    await scraper.release_driver(driver)
+
+    return {
+        "ok": ok,
+        "source": source,
+        "wall_s": time.perf_counter() - started,
+        "peak_mb": job.metrics.get("chrome_peak_rss_mb"),
+        "py_peak_mb": py_peak_mb,
+        "spans": {span["name"]: span["duration"] for span in job.spans},
+    }
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float = None) -> Dict[str, Any]:
+    """Задержки, фазы и память по задачам фазы"""
+    walls = sorted(r["wall_s"] for r in results if r["ok"])
+    peaks = sorted(r["peak_mb"] for r in results if r["peak_mb"])
+    spans = defaultdict(list)
+    for result in results:
+        for name, duration in result["spans"].items():
+            spans[name].append(duration)
+
+    summary = {
+        "jobs": len(results),
+        "errors": sum(1 for r in results if not r["ok"]),
+        "p50_s": walls[len(walls) // 2] if walls else None,
+        "p95_s": walls[min(len(walls) - 1, int(len(walls) * 0.95))] if walls else None,
+        "max_s": walls[-1] if walls else None,
+        "peak_mb_p50": peaks[len(peaks) // 2] if peaks else None,
+        "peak_mb_max": peaks[-1] if peaks else None,
+        "spans_p50": {name: statistics.median(values) for name, values in spans.items()},
+    }
+    if elapsed:
+        summary["elapsed_s"] = elapsed
+        summary["jobs_per_min"] = (len(results) - summary["errors"]) / elapsed * 60
+    return summary
+
+
+async def compare_sources(scraper: MPStatsScraperService, params: Dict[str, Any],
+                          rounds: int) -> Dict[str, Dict[str, Any]]:
+    """Источник результатов выбирается в каждой задаче: xlsx и захват ответа API по очереди"""
+    print(f"\n🛰️ sources: {rounds} пар задач xlsx / захват ответа API")
+    by_source = defaultdict(list)
+    tracemalloc.start()
+    try:
+        for i in range(rounds):
+            for name, capture in (("xlsx", False), ("network", True)):
+                result = await run_job(scraper, dict(params, network_capture=capture), parse=True)
+                if capture and result["source"] != "network":
+                    print(f"  ⚠️ захват не сработал, результат из {result['source']}")
+                by_source[name].append(result)
+                print(f"  {name} {i + 1}: {result['wall_s']:.2f}с")
+    finally:
+        tracemalloc.stop()
+
+    summary = {}
+    for name, results in by_source.items():
+        summary[name] = summarize(results)
+        py_peaks = sorted(r["py_peak_mb"] for r in results if r["py_peak_mb"] is not None)
+        summary[name]["py_peak_mb_p50"] = py_peaks[len(py_peaks) // 2] if py_peaks else None
+    return summary
+
+
+async def benchmark(scraper: MPStatsScraperService, params: Dict[str, Any], warm: int, jobs: int,
+                    concurrency: int, sources: int = 0) -> Dict[str, Dict[str, Any]]:
+    if scraper.driver_pool or scraper.tab_pool:
+        scraper.start_driver_pool()
+
+    print("\n🧊 cold: пустой профиль")
+    cold = [await run_job(scraper, params)]
+    print(f"  {cold[0]['wall_s']:.2f}с")
+
+    print(f"\n🔥 warm: {warm} задач подряд")
+    warm_results = []
+    for i in range(warm):
+        warm_results.append(await run_job(scraper, params))
+        print(f"  задача {i + 1}: {warm_results[-1]['wall_s']:.2f}с")
+
+    load_results, elapsed = [], None
+    if jobs:
+        print(f"\n🚚 load: {jobs} задач, по {concurrency} одновременно")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with semaphore:
+                return await run_job(scraper, params)
+
+        started = time.perf_counter()
+        with TotalMemorySampler() as memory:
+            load_results = await asyncio.gather(*(limited() for _ in range(jobs)))
+        elapsed = time.perf_counter() - started
+
+    summary = {"cold": summarize(cold), "warm": summarize(warm_results) if warm_results else {}}
+    if sources:
+        summary["sources"] = await compare_sources(scraper, params, sources)
+    if load_results:
+        summary["load"] = summarize(load_results, elapsed)
+        # Браузеры всех параллельных задач вместе: главный показатель для модели вкладок
+        summary["load"]["total_peak_mb"] = memory.peak_mb or None
+        if memory.peak_mb:
+            summary["load"]["jobs_per_min_per_gb"] = summary["load"]["jobs_per_min"] / (memory.peak_mb / 1024)
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict[str, Any]], standin_stats: Dict[str, int], scraper_stats: Dict[str, Any]):
+    def fmt(value, spec=".2f"):
+        return format(value, spec) if value is not None else "-"
+
+    print("\n" + "=" * 78)
+    print(f"{'фаза':<7}{'задач':>7}{'ошибок':>8}{'p50, с':>9}{'p95, с':>9}{'max, с':>9}"
+          f"{'Chrome p50/max, MB':>21}{'задач/мин':>11}")
+    print("-" * 78)
+    for phase, s in summary.items():
+        if not s or phase == "sources":
+            continue
+        print(f"{phase:<7}{s['jobs']:>7}{s['errors']:>8}{fmt(s['p50_s']):>9}{fmt(s['p95_s']):>9}"
+              f"{fmt(s['max_s']):>9}{fmt(s['peak_mb_p50'], '.0f') + '/' + fmt(s['peak_mb_max'], '.0f'):>21}"
+              f"{fmt(s.get('jobs_per_min'), '.1f'):>11}")
+    print("=" * 78)
+
+    for phase in ("cold", "warm"):
+        spans = (summary.get(phase) or {}).get("spans_p50") or {}
+        if spans:
+            print(f"\n⏱️ {phase}, медианы фаз (с): " + ", ".join(
+                f"{name}={duration:.2f}" for name, duration in sorted(spans.items(), key=lambda i: -i[1])
+            ))
+
+    load = summary.get("load") or {}
+    if load.get("total_peak_mb"):
+        print(f"\n💾 load: пик памяти всех Chrome {load['total_peak_mb']:.0f} MB, "
+              f"{load['jobs_per_min_per_gb']:.2f} задач/мин на GB")
+
+    sources = summary.get("sources")
+    if sources:
+        print(f"\n{'источник':<10}{'p50, с':>9}{'результаты, с':>15}{'разбор, с':>11}"
+              f"{'Python пик, MB':>16}{'Chrome max, MB':>16}{'ош':>5}")
+        for name, s in sources.items():
+            spans = s.get("spans_p50") or {}
+            print(f"{name:<10}{fmt(s['p50_s']):>9}{fmt(spans.get('download')):>15}{fmt(spans.get('parse'), '.3f'):>11}"
+                  f"{fmt(s['py_peak_mb_p50'], '.1f'):>16}{fmt(s['peak_mb_max'], '.0f'):>16}{s['errors']:>5}")
+
+    selectors = {key: s for key, s in scraper_stats.get("selectors", {}).items() if s["misses"] or s["fallback_hits"]}
+    if selectors:
+        print(f"\n🎯 Промахи селекторов: {selectors}")
+    if scraper_stats.get("grid"):
+        print(f"\n📋 Таблица из DOM: {scraper_stats['grid']}")
+    probe = scraper_stats.get("session_probe")
+    if probe:
+        print(f"\n🔐 Быстрая проверка сессии: {probe}")
+        if probe["error"] and not any(probe[outcome] for outcome in SessionProbe.OUTCOMES if outcome != "error"):
+            print("  ⚠️ Все проверки сессии закончились ошибкой: warm измеряет полный логин, "
+                  "а не быстрый путь (проверьте, что --hostname резолвится в Python)")
+    print(f"\n🧪 Stand-in: {standin_stats}")
+
+
+def run_model(name: str, standin: MPStatsStandIn, args, tabs: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Полный прогон одной модели параллельности в своем профиле"""
+    work_dir = tempfile.mkdtemp(prefix="scraper_bench_")
+    scraper = configure(standin.url, args.hostname, work_dir, args.pool and not tabs, args.concurrency, tabs,
+                        grid=args.grid, network_profile=args.network_profile)
+    print(f"\n🧪 Модель '{name}', MPStats stand-in: {standin.url}, профиль: {work_dir}, "
+          f"сетевой профиль: {config.scraper.network_profile}")
+    try:
+        summary = asyncio.run(benchmark(scraper, params, args.warm, args.jobs, args.concurrency, args.sources))
+        print_summary(summary, standin.stats, scraper.get_runtime_stats())
+        return summary
+    finally:
+        scraper.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def print_comparison(results: Dict[str, Dict[str, Any]]):
+    """Фаза load моделей рядом: пропускная способность и память"""
+    def fmt(value, spec=".2f"):
+        return format(value, spec) if value is not None else "-"
+
+    print("\n" + "=" * 70)
+    print(f"{'модель':<12}{'задач/мин':>11}{'p50, с':>9}{'пик RAM, MB':>14}{'задач/мин на GB':>18}{'ош':>6}")
+    print("-" * 70)
+    for name, summary in results.items():
+        load = summary.get("load") or {}
+        print(f"{name:<12}{fmt(load.get('jobs_per_min'), '.1f'):>11}{fmt(load.get('p50_s')):>9}"
+              f"{fmt(load.get('total_peak_mb'), '.0f'):>14}{fmt(load.get('jobs_per_min_per_gb')):>18}"
+              f"{load.get('errors', '-'):>6}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн бенчмарк скрапера MPStats на локальной копии сайта")
+    parser.add_argument("--warm", type=int, default=3, help="Последовательных задач с теплым профилем")
+    parser.add_argument("--jobs", type=int, default=4, help="Задач в фазе нагрузки (0 - пропустить)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Одновременных задач в фазе нагрузки")
+    parser.add_argument("--pool", action="store_true", help="Использовать пул прогретых драйверов")
+    parser.add_argument("--tabs", type=int, default=0, help="Вкладок одного браузера вместо браузера на задачу")
+    parser.add_argument("--compare", action="store_true",
+                        help="Сравнить браузер на задачу и вкладки (--concurrency вкладок)")
+    parser.add_argument("--hostname", default="127.0.0.1",
+                        help="Имя хоста stand-in (должно резолвиться и в Python, и в Chrome)")
+    parser.add_argument("--results-latency", type=float, default=2.0, help="Задержка 'Подобрать запросы' (с)")
+    parser.add_argument("--export-latency", type=float, default=1.0, help="Задержка выгрузки xlsx (с)")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="Задержка страниц (с)")
+    parser.add_argument("--rows", type=int, default=300, help="Строк в выгрузке")
+    parser.add_argument("--grid", action="store_true", help="Читать результаты из таблицы на странице")
+    parser.add_argument("--grid-rows", type=int, default=50,
+                        help="Строк, отрисованных в таблице (меньше --rows - откат на скачивание)")
+    parser.add_argument("--sources", type=int, default=0,
+                        help="Пар задач для сравнения источников результатов: xlsx и захват ответа API")
+    parser.add_argument("--network-profile", choices=("default", "lean", "strict"),
+                        help="Сетевой профиль страницы (по умолчанию SCRAPER_NETWORK_PROFILE)")
+    parser.add_argument("--query", default="стеновые панели ПВХ", help="Описание категории для запроса")
+    parser.add_argument("--json", help="Сохранить итог в JSON файл")
+    args = parser.parse_args()
+
+    if args.compare:
+        models = {"pool" if args.pool else "drivers": 0, "tabs": args.tabs or args.concurrency}
+    else:
+        models = {"tabs" if args.tabs else "pool" if args.pool else "drivers": args.tabs}
+
+    standin = MPStatsStandIn(
+        hostname=args.hostname, page_latency=args.page_latency, results_latency=args.results_latency,
+        export_latency=args.export_latency, rows=args.rows, grid_rows=args.grid_rows
+    ).start()
+    params = {"category": "benchmark", "purpose": "кухня", "category_description": args.query,
+              "additional_params": []}
+
+    try:
+        results = {name: run_model(name, standin, args, tabs, params) for name, tabs in models.items()}
+        if len(results) > 1:
+            print_comparison(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(args), "summary": results, "standin": standin.stats},
+                          f, ensure_ascii=False, indent=2)
+            print(f"💾 Итог сохранен: {args.json}")
+    finally:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()